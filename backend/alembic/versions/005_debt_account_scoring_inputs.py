@@ -0,0 +1,30 @@
+"""005 – Debt account scoring inputs.
+
+Persist utilization and payment_history on debt_accounts so health
+scores can be recomputed from stored rows (portfolio re-scoring).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "005_debt_account_scoring_inputs"
+down_revision = "004_model_field_additions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "debt_accounts",
+        sa.Column("utilization", sa.Float, nullable=True),
+    )
+    op.add_column(
+        "debt_accounts",
+        sa.Column("payment_history", sa.Float, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("debt_accounts", "payment_history")
+    op.drop_column("debt_accounts", "utilization")
@@ -0,0 +1,39 @@
+"""006 – Health score aggregates.
+
+Link each health score to the CIBIL report it was computed from and store
+the report totals on the score row, so reading a health check no longer
+re-aggregates debt accounts.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = "006_health_score_aggregates"
+down_revision = "005_debt_account_scoring_inputs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "health_scores",
+        sa.Column("report_id", UUID(as_uuid=True), sa.ForeignKey("cibil_reports.id"), nullable=True),
+    )
+    op.add_column(
+        "health_scores",
+        sa.Column("total_outstanding", sa.Float, nullable=True),
+    )
+    op.add_column(
+        "health_scores",
+        sa.Column("total_emi", sa.Float, nullable=True),
+    )
+    op.create_index("ix_health_scores_report_id", "health_scores", ["report_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_health_scores_report_id", table_name="health_scores")
+    op.drop_column("health_scores", "total_emi")
+    op.drop_column("health_scores", "total_outstanding")
+    op.drop_column("health_scores", "report_id")
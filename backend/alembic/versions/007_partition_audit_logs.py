@@ -0,0 +1,109 @@
+"""007 – Partition audit_logs by month.
+
+Recreates audit_logs as a native range-partitioned table on created_at
+with one partition per calendar month (audit_logs_yYYYYmMM) plus a
+default partition as a safety net. The primary key becomes
+(id, created_at) because a partitioned table's unique constraints must
+include the partition key.
+
+Existing rows are copied into the new table. Future partitions are
+created and expired ones dropped by app/jobs/audit_partitions.py.
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "007_partition_audit_logs"
+down_revision = "006_health_score_aggregates"
+branch_labels = None
+depends_on = None
+
+# Months created ahead of today by this migration; the job keeps this topped up.
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER INDEX ix_audit_logs_event_type RENAME TO ix_audit_logs_unpartitioned_event_type")
+    op.execute("ALTER INDEX ix_audit_logs_user_id RENAME TO ix_audit_logs_unpartitioned_user_id")
+    op.execute("ALTER INDEX ix_audit_logs_created_at RENAME TO ix_audit_logs_unpartitioned_created_at")
+
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id UUID NOT NULL,
+            event_type VARCHAR(50) NOT NULL,
+            user_id UUID,
+            phone VARCHAR(15),
+            ip_address VARCHAR(45),
+            metadata_json JSON,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    # Partitioned indexes: cascaded to every partition, current and future
+    op.execute("CREATE INDEX ix_audit_logs_event_type ON audit_logs (event_type)")
+    op.execute("CREATE INDEX ix_audit_logs_user_id ON audit_logs (user_id)")
+    op.execute("CREATE INDEX ix_audit_logs_created_at ON audit_logs (created_at)")
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    # One partition per month from the oldest existing row through MONTHS_AHEAD
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month_start DATE := date_trunc(
+                'month', COALESCE((SELECT min(created_at) FROM audit_logs_unpartitioned), now())
+            );
+            last_month DATE := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    'audit_logs_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$;
+        """
+    )
+
+    op.execute(
+        """
+        INSERT INTO audit_logs (id, event_type, user_id, phone, ip_address, metadata_json, created_at)
+        SELECT id, event_type, user_id, phone, ip_address, metadata_json, created_at
+        FROM audit_logs_unpartitioned
+        """
+    )
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id UUID PRIMARY KEY,
+            event_type VARCHAR(50) NOT NULL,
+            user_id UUID,
+            phone VARCHAR(15),
+            ip_address VARCHAR(45),
+            metadata_json JSON,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO audit_logs (id, event_type, user_id, phone, ip_address, metadata_json, created_at)
+        SELECT id, event_type, user_id, phone, ip_address, metadata_json, created_at
+        FROM audit_logs_partitioned
+        """
+    )
+    op.execute("DROP TABLE audit_logs_partitioned")  # drops every partition and partitioned index
+    op.create_index("ix_audit_logs_event_type", "audit_logs", ["event_type"])
+    op.create_index("ix_audit_logs_user_id", "audit_logs", ["user_id"])
+    op.create_index("ix_audit_logs_created_at", "audit_logs", ["created_at"])
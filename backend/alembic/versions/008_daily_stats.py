@@ -0,0 +1,70 @@
+"""008 – daily_stats materialized view.
+
+Pre-aggregates the admin dashboard counters per calendar day so
+/api/internal/stats/overview reads a handful of rows instead of scanning
+users, health_scores and callbacks. The unique index on day allows
+REFRESH MATERIALIZED VIEW CONCURRENTLY (readers are never blocked); the
+app refreshes it on a schedule (STATS_REFRESH_INTERVAL_SECONDS).
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "008_daily_stats"
+down_revision = "007_partition_audit_logs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW daily_stats AS
+        WITH u AS (
+            SELECT created_at::date AS day, count(*) AS users
+            FROM users
+            WHERE pan_hash <> 'DELETED'
+            GROUP BY 1
+        ),
+        h AS (
+            SELECT calculated_at::date AS day,
+                   count(*) AS health_checks,
+                   sum(score) AS score_sum,
+                   sum(savings_est) AS savings_sum
+            FROM health_scores
+            GROUP BY 1
+        ),
+        c AS (
+            SELECT created_at::date AS day,
+                   count(*) AS callbacks,
+                   count(*) FILTER (WHERE status = 'pending') AS callbacks_pending,
+                   count(*) FILTER (WHERE status = 'confirmed') AS callbacks_confirmed,
+                   count(*) FILTER (WHERE status = 'completed') AS callbacks_completed,
+                   count(*) FILTER (WHERE status = 'cancelled') AS callbacks_cancelled
+            FROM callbacks
+            GROUP BY 1
+        ),
+        days AS (
+            SELECT day FROM u UNION SELECT day FROM h UNION SELECT day FROM c
+        )
+        SELECT days.day,
+               coalesce(u.users, 0) AS users,
+               coalesce(h.health_checks, 0) AS health_checks,
+               coalesce(h.score_sum, 0) AS score_sum,
+               h.savings_sum AS savings_sum,
+               coalesce(c.callbacks, 0) AS callbacks,
+               coalesce(c.callbacks_pending, 0) AS callbacks_pending,
+               coalesce(c.callbacks_confirmed, 0) AS callbacks_confirmed,
+               coalesce(c.callbacks_completed, 0) AS callbacks_completed,
+               coalesce(c.callbacks_cancelled, 0) AS callbacks_cancelled
+        FROM days
+        LEFT JOIN u ON u.day = days.day
+        LEFT JOIN h ON h.day = days.day
+        LEFT JOIN c ON c.day = days.day
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX ix_daily_stats_day ON daily_stats (day)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW daily_stats")
@@ -0,0 +1,25 @@
+"""009 – Keyset pagination indexes.
+
+Composite (timestamp, id) indexes matching the newest-first order of the
+admin list endpoints, so cursor pagination is an index range scan.
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "009_keyset_pagination_indexes"
+down_revision = "008_daily_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+    op.create_index("ix_callbacks_created_at_id", "callbacks", ["created_at", "id"])
+    op.create_index("ix_health_scores_calculated_at_id", "health_scores", ["calculated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_health_scores_calculated_at_id", table_name="health_scores")
+    op.drop_index("ix_callbacks_created_at_id", table_name="callbacks")
+    op.drop_index("ix_users_created_at_id", table_name="users")
@@ -0,0 +1,55 @@
+"""010 – Index-backed phone search on users.
+
+Adds users.phone_normalized (digits only, without +91 / leading 0; the
+app keeps it in sync through User's phone validator) and two indexes on it:
+
+- a pg_trgm GIN index, so substring search (LIKE '%98765%') no longer
+  scans the whole table;
+- a varchar_pattern_ops B-tree for prefix search (LIKE '98765%') and
+  exact matches.
+
+Indexes are built CONCURRENTLY so the users table stays writable.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "010_users_phone_search"
+down_revision = "009_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column("users", sa.Column("phone_normalized", sa.String(15), nullable=True))
+
+    # Same rules as app.utils.phone.normalize_phone
+    op.execute(
+        """
+        UPDATE users SET phone_normalized = CASE
+            WHEN d ~ '^91[0-9]{10}$' THEN substr(d, 3)
+            WHEN d ~ '^0[0-9]{10}$' THEN substr(d, 2)
+            ELSE d
+        END
+        FROM (SELECT id AS uid, regexp_replace(phone, '[^0-9]', '', 'g') AS d FROM users) AS digits
+        WHERE users.id = digits.uid
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_phone_normalized_trgm "
+            "ON users USING gin (phone_normalized gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_phone_normalized_prefix "
+            "ON users (phone_normalized varchar_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_phone_normalized_prefix", table_name="users")
+    op.drop_index("ix_users_phone_normalized_trgm", table_name="users")
+    op.drop_column("users", "phone_normalized")
@@ -0,0 +1,37 @@
+"""011 – Persisted AA consent state.
+
+Consents are now stored when they are created, before the phone
+necessarily belongs to a user, so user_id becomes nullable and the phone
+is kept. updated_at records the last status change; next_poll_at and
+poll_attempts schedule the backoff poll of Setu used when a webhook is
+missed.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "011_aa_consent_state"
+down_revision = "010_users_phone_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column("aa_consents", "user_id", nullable=True)
+    op.add_column("aa_consents", sa.Column("phone", sa.String(15), nullable=True))
+    op.add_column("aa_consents", sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()))
+    op.add_column("aa_consents", sa.Column("next_poll_at", sa.DateTime, nullable=True))
+    op.add_column(
+        "aa_consents",
+        sa.Column("poll_attempts", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("aa_consents", "poll_attempts")
+    op.drop_column("aa_consents", "next_poll_at")
+    op.drop_column("aa_consents", "updated_at")
+    op.drop_column("aa_consents", "phone")
+    op.execute("DELETE FROM aa_consents WHERE user_id IS NULL")
+    op.alter_column("aa_consents", "user_id", nullable=False)
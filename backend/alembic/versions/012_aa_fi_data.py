@@ -0,0 +1,51 @@
+"""012 – Account Aggregator FI data.
+
+Debt accounts can now come from an AA data fetch as well as a CIBIL
+report: debt_accounts gains source ('cibil' | 'aa') and consent_id, and
+report_id becomes nullable. aa_consents gains the fetch state (fi_status,
+fi_session_id, fi_error, fi_fetched_at) and fi_result, the cached parsed
+accounts and score.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = "012_aa_fi_data"
+down_revision = "011_aa_consent_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "debt_accounts",
+        sa.Column("source", sa.String(10), nullable=False, server_default="cibil"),
+    )
+    op.add_column(
+        "debt_accounts",
+        sa.Column("consent_id", UUID(as_uuid=True), sa.ForeignKey("aa_consents.id"), nullable=True),
+    )
+    op.create_index("ix_debt_accounts_consent_id", "debt_accounts", ["consent_id"])
+    op.alter_column("debt_accounts", "report_id", nullable=True)
+
+    op.add_column("aa_consents", sa.Column("fi_status", sa.String(20), nullable=True))
+    op.add_column("aa_consents", sa.Column("fi_session_id", sa.String, nullable=True))
+    op.add_column("aa_consents", sa.Column("fi_result", sa.JSON, nullable=True))
+    op.add_column("aa_consents", sa.Column("fi_error", sa.String, nullable=True))
+    op.add_column("aa_consents", sa.Column("fi_fetched_at", sa.DateTime, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("aa_consents", "fi_fetched_at")
+    op.drop_column("aa_consents", "fi_error")
+    op.drop_column("aa_consents", "fi_result")
+    op.drop_column("aa_consents", "fi_session_id")
+    op.drop_column("aa_consents", "fi_status")
+
+    op.execute("DELETE FROM debt_accounts WHERE report_id IS NULL")
+    op.alter_column("debt_accounts", "report_id", nullable=False)
+    op.drop_index("ix_debt_accounts_consent_id", table_name="debt_accounts")
+    op.drop_column("debt_accounts", "consent_id")
+    op.drop_column("debt_accounts", "source")
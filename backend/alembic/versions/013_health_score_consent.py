@@ -0,0 +1,30 @@
+"""013 – Link AA-derived health scores to their consent.
+
+Scores computed from Account Aggregator data have no CIBIL report. Without
+a link they looked like pre-report_id scores and were read back against
+the user's latest CIBIL report; consent_id marks them and points at the
+accounts they were computed from.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = "013_health_score_consent"
+down_revision = "012_aa_fi_data"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "health_scores",
+        sa.Column("consent_id", UUID(as_uuid=True), sa.ForeignKey("aa_consents.id"), nullable=True),
+    )
+    op.create_index("ix_health_scores_consent_id", "health_scores", ["consent_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_health_scores_consent_id", table_name="health_scores")
+    op.drop_column("health_scores", "consent_id")
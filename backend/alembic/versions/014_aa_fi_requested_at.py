@@ -0,0 +1,24 @@
+"""014 – Staleness clock for AA FI fetches.
+
+fi_requested_at records when the consent's current fetch step was queued,
+so a fetch stuck in REQUESTED or FETCHING (missed FI_DATA_READY webhook,
+job lost in a restart) can be re-queued after AA_FI_STALE_SECONDS.
+updated_at cannot serve: the fallback consent poll keeps moving it.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "014_aa_fi_requested_at"
+down_revision = "013_health_score_consent"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("aa_consents", sa.Column("fi_requested_at", sa.DateTime, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("aa_consents", "fi_requested_at")
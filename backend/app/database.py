@@ -1,14 +1,29 @@
-"""Database engine, session factory, and dependency."""
+"""Database engines, session factories, and dependencies.
+
+The async engine (asyncpg) serves all request handlers through
+``get_async_db``. The sync engine stays available for Alembic, CLI jobs
+and scripts.
+"""
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.config import get_settings
 
 
 settings = get_settings()
 
+
+def _async_database_url(url: str) -> str:
+    """Map a sync PostgreSQL URL onto the asyncpg driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -18,6 +33,17 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 class Base(DeclarativeBase):
     """Declarative base for all models."""
@@ -25,9 +51,20 @@ class Base(DeclarativeBase):
 
 
 def get_db() -> Generator[Session, None, None]:
-    """FastAPI dependency that yields a database session."""
+    """Yield a sync database session (scripts and jobs)."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency that yields an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_engine() -> AsyncEngine:
+    """FastAPI dependency for handlers that manage their own connection (e.g. streaming)."""
+    return async_engine
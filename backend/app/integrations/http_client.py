@@ -0,0 +1,219 @@
+"""Shared, pooled httpx clients for outbound integrations.
+
+One ``httpx.AsyncClient`` per provider is kept for the lifetime of the app,
+so Setu / Zoho calls reuse keep-alive (and, where the server supports it,
+HTTP/2) connections instead of paying a TCP + TLS handshake per request.
+
+Each client's transport is wrapped in a ``MeteredTransport`` that tracks
+in-flight requests against the pool size. ``registry.stats()`` exposes the
+numbers (served at GET /api/internal/http-pools) for sizing the pools.
+
+Usage:
+    client = get_http_client("setu_aa")
+    resp = await client.get(url)
+
+The registry is opened and closed in the ``lifespan`` hook in app/main.py;
+clients are also created lazily so scripts and tests work without it.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Pool configuration ─────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection limits and timeouts for one provider's client."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    timeout: float = 15.0
+    connect_timeout: float = 5.0
+
+
+# Per-provider pools. Unknown providers get PoolConfig() defaults.
+DEFAULT_POOLS: Dict[str, PoolConfig] = {
+    "setu_auth": PoolConfig(max_connections=5, max_keepalive_connections=2),
+    "setu_aa": PoolConfig(max_connections=20, max_keepalive_connections=10, timeout=30.0),
+    "setu_pan": PoolConfig(max_connections=50, max_keepalive_connections=20, timeout=30.0),
+    "setu_upi": PoolConfig(max_connections=10, max_keepalive_connections=5),
+    "zoho": PoolConfig(max_connections=10, max_keepalive_connections=5, timeout=15.0),
+}
+
+
+# ─── Metering ───────────────────────────────────────────────────────────────
+
+@dataclass
+class PoolStats:
+    """Counters for one provider's pool."""
+    max_connections: int
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    requests_total: int = 0
+    saturated_total: int = 0  # requests started while the pool was full
+    pool_timeouts: int = 0
+    errors_total: int = 0
+    last_saturated_at: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "max_connections": self.max_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "utilization": round(self.in_flight / self.max_connections, 3),
+            "requests_total": self.requests_total,
+            "saturated_total": self.saturated_total,
+            "pool_timeouts": self.pool_timeouts,
+            "errors_total": self.errors_total,
+            "last_saturated_at": self.last_saturated_at,
+        }
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """Response body wrapper that releases the in-flight slot on close."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Counts requests holding a pooled connection, from send until the body is closed.
+
+    With HTTP/2 several requests can share one connection, so ``in_flight``
+    above ``max_connections`` means multiplexing, not necessarily queueing.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: PoolStats):
+        self._transport = transport
+        self.stats = stats
+
+    def _release(self) -> None:
+        self.stats.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self.stats
+        stats.requests_total += 1
+        if stats.in_flight >= stats.max_connections:
+            stats.saturated_total += 1
+            stats.last_saturated_at = time.time()
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            stats.pool_timeouts += 1
+            self._release()
+            raise
+        except Exception:
+            stats.errors_total += 1
+            self._release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_MeteredStream(response.stream, self._release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# ─── Registry ───────────────────────────────────────────────────────────────
+
+class HTTPClientRegistry:
+    """App-scoped map of provider name → pooled ``httpx.AsyncClient``."""
+
+    def __init__(
+        self,
+        pools: Optional[Dict[str, PoolConfig]] = None,
+        transport_factory: Optional[Callable[[PoolConfig], httpx.AsyncBaseTransport]] = None,
+    ):
+        self._pools = dict(DEFAULT_POOLS if pools is None else pools)
+        self._transport_factory = transport_factory or self._default_transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, PoolStats] = {}
+
+    @staticmethod
+    def _default_transport(config: PoolConfig) -> httpx.AsyncBaseTransport:
+        settings = get_settings()
+        return httpx.AsyncHTTPTransport(
+            http2=settings.HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Return the provider's client, creating it on first use."""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            config = self._pools.get(provider, PoolConfig())
+            stats = PoolStats(max_connections=config.max_connections)
+            client = httpx.AsyncClient(
+                transport=MeteredTransport(self._transport_factory(config), stats),
+                timeout=httpx.Timeout(
+                    config.timeout,
+                    connect=config.connect_timeout,
+                    pool=get_settings().HTTP_POOL_TIMEOUT_SECONDS,
+                ),
+            )
+            self._clients[provider] = client
+            self._stats[provider] = stats
+        return client
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: s.as_dict() for name, s in self._stats.items()}
+
+    async def aclose(self) -> None:
+        """Close every client and its connections."""
+        for name, client in self._clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"[HTTP] Failed to close {name} client: {e}")
+        self._clients.clear()
+
+
+_registry = HTTPClientRegistry()
+
+
+def get_http_registry() -> HTTPClientRegistry:
+    return _registry
+
+
+def set_http_registry(registry: HTTPClientRegistry) -> None:
+    """Swap the registry (for testing)."""
+    global _registry
+    _registry = registry
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """Shared pooled client for ``provider`` (e.g. "setu_aa", "zoho")."""
+    return _registry.get(provider)
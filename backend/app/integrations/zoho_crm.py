@@ -4,13 +4,13 @@ Uses refresh token flow to maintain access. Falls back gracefully
 if credentials are not configured.
 """
 
-import httpx
 import logging
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Tuple
 
 from app.integrations.base import CRMServiceBase
 from app.config import get_settings
+from app.integrations.http_client import get_http_client
+from app.utils.token_cache import TokenCache, TokenStore
 
 logger = logging.getLogger(__name__)
 
@@ -18,52 +18,49 @@ logger = logging.getLogger(__name__)
 class ZohoCRMService(CRMServiceBase):
     """Real Zoho CRM integration with OAuth2 token management."""
 
-    def __init__(self):
+    def __init__(self, token_store: Optional[TokenStore] = None):
         self._settings = get_settings()
-        self._access_token: Optional[str] = None
-        self._token_expires_at: Optional[datetime] = None
-
-    async def _refresh_access_token(self) -> bool:
-        """Refresh the OAuth2 access token using the refresh token."""
+        # Zoho tokens last an hour: never use one in its last minute, and
+        # refresh in the background from five minutes out.
+        self._tokens = TokenCache(
+            "zoho_crm",
+            fetch=self._fetch_access_token,
+            store=token_store,
+            refresh_margin=60,
+            proactive_margin=300,
+        )
+
+    async def _fetch_access_token(self) -> Tuple[str, float]:
+        """Exchange the refresh token for an access token."""
         settings = self._settings
+        client = get_http_client("zoho")
+        response = await client.post(
+            settings.ZOHO_ACCOUNTS_URL,
+            data={
+                "refresh_token": settings.ZOHO_REFRESH_TOKEN,
+                "client_id": settings.ZOHO_CLIENT_ID,
+                "client_secret": settings.ZOHO_CLIENT_SECRET,
+                "redirect_uri": settings.ZOHO_REDIRECT_URI,
+                "grant_type": "refresh_token",
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        if not data.get("access_token"):
+            raise ValueError(f"No access_token in response: {data.get('error', 'unknown error')}")
+        return data["access_token"], data.get("expires_in", 3600)
 
-        if not settings.ZOHO_REFRESH_TOKEN:
+    async def _get_token(self) -> Optional[str]:
+        """Get a valid access token; concurrent callers share one refresh."""
+        if not self._settings.ZOHO_REFRESH_TOKEN:
             logger.warning("[ZOHO CRM] No refresh token configured. Skipping.")
-            return False
+            return None
 
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.post(
-                    settings.ZOHO_ACCOUNTS_URL,
-                    data={
-                        "refresh_token": settings.ZOHO_REFRESH_TOKEN,
-                        "client_id": settings.ZOHO_CLIENT_ID,
-                        "client_secret": settings.ZOHO_CLIENT_SECRET,
-                        "redirect_uri": settings.ZOHO_REDIRECT_URI,
-                        "grant_type": "refresh_token",
-                    },
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                self._access_token = data.get("access_token")
-                expires_in = data.get("expires_in", 3600)
-                self._token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in - 60)
-
-                logger.info("[ZOHO CRM] Access token refreshed successfully.")
-                return True
-
+            return await self._tokens.get()
         except Exception as e:
             logger.error(f"[ZOHO CRM] Token refresh failed: {e}")
-            return False
-
-    async def _get_token(self) -> Optional[str]:
-        """Get a valid access token, refreshing if needed."""
-        if self._access_token and self._token_expires_at and datetime.utcnow() < self._token_expires_at:
-            return self._access_token
-
-        success = await self._refresh_access_token()
-        return self._access_token if success else None
+            return None
 
     def _headers(self, token: str) -> Dict[str, str]:
         return {
@@ -103,31 +100,31 @@ class ZohoCRMService(CRMServiceBase):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.post(
-                    f"{self._settings.ZOHO_CRM_URL}/Leads",
-                    json=zoho_lead,
-                    headers=self._headers(token),
-                )
-
-                # Retry once on 401 (token may have expired)
-                if response.status_code == 401:
-                    logger.info("[ZOHO CRM] Token expired mid-request. Refreshing...")
-                    await self._refresh_access_token()
-                    token = self._access_token
-                    if token:
-                        response = await client.post(
-                            f"{self._settings.ZOHO_CRM_URL}/Leads",
-                            json=zoho_lead,
-                            headers=self._headers(token),
-                        )
-
-                response.raise_for_status()
-                result = response.json()
-
-                lead_id = result.get("data", [{}])[0].get("details", {}).get("id")
-                logger.info(f"[ZOHO CRM] Lead created: {lead_id}")
-                return lead_id
+            client = get_http_client("zoho")
+            response = await client.post(
+                f"{self._settings.ZOHO_CRM_URL}/Leads",
+                json=zoho_lead,
+                headers=self._headers(token),
+            )
+
+            # Retry once on 401 (token may have expired)
+            if response.status_code == 401:
+                logger.info("[ZOHO CRM] Token expired mid-request. Refreshing...")
+                await self._tokens.invalidate()
+                token = await self._get_token()
+                if token:
+                    response = await client.post(
+                        f"{self._settings.ZOHO_CRM_URL}/Leads",
+                        json=zoho_lead,
+                        headers=self._headers(token),
+                    )
+
+            response.raise_for_status()
+            result = response.json()
+
+            lead_id = result.get("data", [{}])[0].get("details", {}).get("id")
+            logger.info(f"[ZOHO CRM] Lead created: {lead_id}")
+            return lead_id
 
         except Exception as e:
             logger.error(f"[ZOHO CRM] Failed to create lead: {e}")
@@ -142,15 +139,15 @@ class ZohoCRMService(CRMServiceBase):
         zoho_data = {"data": [data]}
 
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.put(
-                    f"{self._settings.ZOHO_CRM_URL}/Leads/{lead_id}",
-                    json=zoho_data,
-                    headers=self._headers(token),
-                )
-                response.raise_for_status()
-                logger.info(f"[ZOHO CRM] Lead updated: {lead_id}")
-                return True
+            client = get_http_client("zoho")
+            response = await client.put(
+                f"{self._settings.ZOHO_CRM_URL}/Leads/{lead_id}",
+                json=zoho_data,
+                headers=self._headers(token),
+            )
+            response.raise_for_status()
+            logger.info(f"[ZOHO CRM] Lead updated: {lead_id}")
+            return True
 
         except Exception as e:
             logger.error(f"[ZOHO CRM] Failed to update lead {lead_id}: {e}")
@@ -163,14 +160,14 @@ class ZohoCRMService(CRMServiceBase):
             return None
 
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(
-                    f"{self._settings.ZOHO_CRM_URL}/Leads/{lead_id}",
-                    headers=self._headers(token),
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result.get("data", [None])[0]
+            client = get_http_client("zoho")
+            response = await client.get(
+                f"{self._settings.ZOHO_CRM_URL}/Leads/{lead_id}",
+                headers=self._headers(token),
+            )
+            response.raise_for_status()
+            result = response.json()
+            return result.get("data", [None])[0]
 
         except Exception as e:
             logger.error(f"[ZOHO CRM] Failed to get lead {lead_id}: {e}")
@@ -0,0 +1,170 @@
+"""Audit log partition maintenance.
+
+audit_logs is range-partitioned by month (migration 007). This job:
+
+- creates the partitions for the current month and the next
+  AUDIT_PARTITIONS_AHEAD months, so inserts never land in the default
+  partition;
+- drops whole partitions older than AUDIT_RETENTION_MONTHS. That is a
+  metadata-only operation, so there is no DELETE, no vacuum debt and no
+  index bloat.
+
+Run it daily (cron / k8s CronJob); it is idempotent.
+
+Usage:
+    python -m app.jobs.audit_partitions
+    python -m app.jobs.audit_partitions --retention-months 12 --ahead 6
+    python -m app.jobs.audit_partitions --dry-run
+"""
+
+import argparse
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "audit_logs"
+_PARTITION_RE = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+
+
+# ─── Month arithmetic ───────────────────────────────────────────────────────
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month covered by a monthly partition name, or None for other partitions."""
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def months_to_create(today: date, ahead: int) -> List[date]:
+    start = month_start(today)
+    return [add_months(start, i) for i in range(ahead + 1)]
+
+
+def expired_partitions(names: Iterable[str], today: date, retention_months: int) -> List[str]:
+    """Monthly partitions whose whole range is older than the retention window."""
+    cutoff = add_months(month_start(today), -retention_months)
+    expired = []
+    for name in names:
+        month = partition_month(name)
+        if month is not None and add_months(month, 1) <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+# ─── Maintenance ────────────────────────────────────────────────────────────
+
+@dataclass
+class MaintenanceResult:
+    created: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    rows = conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return [row[0] for row in rows]
+
+
+def ensure_partitions(conn: Connection, today: date, ahead: int, dry_run: bool = False) -> List[str]:
+    """Create missing monthly partitions from this month through ``ahead`` months."""
+    existing = set(list_partitions(conn))
+    created = []
+    for month in months_to_create(today, ahead):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        if not dry_run:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+        created.append(name)
+    return created
+
+
+def drop_expired_partitions(
+    conn: Connection, today: date, retention_months: int, dry_run: bool = False,
+) -> List[str]:
+    """Detach and drop monthly partitions past retention."""
+    expired = expired_partitions(list_partitions(conn), today, retention_months)
+    if not dry_run:
+        for name in expired:
+            conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+            conn.execute(text(f'DROP TABLE "{name}"'))
+    return expired
+
+
+def maintain_partitions(
+    retention_months: Optional[int] = None,
+    ahead: Optional[int] = None,
+    today: Optional[date] = None,
+    dry_run: bool = False,
+) -> MaintenanceResult:
+    """Create upcoming partitions and drop expired ones in one transaction."""
+    from app.database import engine
+
+    settings = get_settings()
+    retention_months = settings.AUDIT_RETENTION_MONTHS if retention_months is None else retention_months
+    ahead = settings.AUDIT_PARTITIONS_AHEAD if ahead is None else ahead
+    today = today or date.today()
+
+    result = MaintenanceResult()
+    with engine.begin() as conn:
+        result.created = ensure_partitions(conn, today, ahead, dry_run)
+        result.dropped = drop_expired_partitions(conn, today, retention_months, dry_run)
+
+    verb = "Would" if dry_run else "Did"
+    logger.info(f"[AUDIT PARTITIONS] {verb} create {result.created or 'none'}; drop {result.dropped or 'none'}")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired audit_logs partitions.")
+    parser.add_argument("--retention-months", type=int, default=None, help="Default: AUDIT_RETENTION_MONTHS")
+    parser.add_argument("--ahead", type=int, default=None, help="Months to pre-create (default: AUDIT_PARTITIONS_AHEAD)")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without applying them")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    maintain_partitions(
+        retention_months=args.retention_months,
+        ahead=args.ahead,
+        dry_run=args.dry_run,
+    )
+
+
+if __name__ == "__main__":
+    main()
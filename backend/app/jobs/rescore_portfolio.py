@@ -0,0 +1,315 @@
+"""Portfolio re-scoring job.
+
+Recomputes a HealthScore row for every user's latest CIBIL report, e.g. after
+the weights in app/services/health_score.py change.
+
+The report/account join is streamed with a server-side cursor (``yield_per``)
+and grouped into chunks of whole reports. Chunks are scored with the
+vectorised batch calculator, optionally across a process pool, and written
+back with one bulk INSERT per chunk. After every committed chunk the last
+report ID is written to a checkpoint file so an interrupted run resumes
+where it stopped. The checkpoint also records when the run started; a
+resumed run skips reports already scored since then, so a crash between
+a chunk's commit and its checkpoint write does not score that chunk twice.
+
+Usage:
+    python -m app.jobs.rescore_portfolio
+    python -m app.jobs.rescore_portfolio --workers 8 --chunk-size 5000
+    python -m app.jobs.rescore_portfolio --checkpoint /var/run/rescore.json
+    python -m app.jobs.rescore_portfolio --restart   # ignore checkpoint
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.cibil_report import CibilReport
+from app.models.debt_account import DebtAccount
+from app.models.health_score import HealthScore
+# Remaining models must be imported so the User relationships can be configured.
+from app.models.user import User  # noqa: F401
+from app.models.aa_consent import AAConsent  # noqa: F401
+from app.models.callback import Callback  # noqa: F401
+from app.models.advisory_plan import AdvisoryPlan  # noqa: F401
+from app.models.subscription import Subscription  # noqa: F401
+from app.models.service_request import ServiceRequest  # noqa: F401
+from app.models.settlement_case import SettlementCase  # noqa: F401
+from app.models.shield_consent import ShieldConsent  # noqa: F401
+from app.services.health_score import AccountBatch, calculate_health_scores_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = ".rescore_checkpoint.json"
+
+# Columns selected per (report, account) row — order matters for _group_reports.
+_ACCOUNT_FIELDS = (
+    "lender_name",
+    "account_type",
+    "outstanding",
+    "interest_rate",
+    "emi_amount",
+    "status",
+    "utilization",
+    "payment_history",
+)
+
+
+# ─── Checkpoint ─────────────────────────────────────────────────────────────
+
+@dataclass
+class Checkpoint:
+    """Resume marker persisted as JSON after every committed chunk."""
+    path: str
+    last_report_id: Optional[str] = None
+    reports_done: int = 0
+    started_at: Optional[datetime] = None
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        if not os.path.exists(path):
+            return cls(path=path)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        started_at = data.get("started_at")
+        return cls(
+            path=path,
+            last_report_id=data.get("last_report_id"),
+            reports_done=data.get("reports_done", 0),
+            started_at=datetime.fromisoformat(started_at) if started_at else None,
+        )
+
+    def start(self) -> None:
+        """Stamp a fresh run's start time and persist it before any chunk is written."""
+        self.started_at = datetime.utcnow()
+        self.save()
+
+    def advance(self, last_report_id: str, reports: int) -> None:
+        """Record progress and write the file."""
+        self.last_report_id = last_report_id
+        self.reports_done += reports
+        self.save()
+
+    def save(self) -> None:
+        """Write the file atomically."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "last_report_id": self.last_report_id,
+                "reports_done": self.reports_done,
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "updated_at": datetime.utcnow().isoformat(),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ─── Streaming ──────────────────────────────────────────────────────────────
+
+@dataclass
+class ReportChunk:
+    """A group of whole reports: parallel lists of IDs and account dicts."""
+    report_ids: List[str] = field(default_factory=list)
+    user_ids: List[str] = field(default_factory=list)
+    accounts: List[List[Dict[str, Any]]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.report_ids)
+
+
+def _latest_reports_stmt(after_report_id: Optional[str] = None, scored_since: Optional[datetime] = None):
+    """Latest report per user joined to its accounts, ordered by report ID.
+
+    Reports pulled at the same instant are tie-broken by ID, so each user
+    contributes exactly one report. With ``scored_since``, reports that
+    already have a score calculated at or after it are left out.
+    """
+    ranked = select(
+        CibilReport.id,
+        func.row_number().over(
+            partition_by=CibilReport.user_id,
+            order_by=(CibilReport.pulled_at.desc(), CibilReport.id.desc()),
+        ).label("rank"),
+    ).subquery()
+    latest = select(ranked.c.id).where(ranked.c.rank == 1).subquery()
+    stmt = (
+        select(
+            CibilReport.id,
+            CibilReport.user_id,
+            *(getattr(DebtAccount, name) for name in _ACCOUNT_FIELDS),
+        )
+        .join(latest, latest.c.id == CibilReport.id)
+        .outerjoin(DebtAccount, DebtAccount.report_id == CibilReport.id)
+        .order_by(CibilReport.id)
+    )
+    if after_report_id:
+        stmt = stmt.where(CibilReport.id > UUID(after_report_id))
+    if scored_since is not None:
+        stmt = stmt.where(~exists().where(
+            HealthScore.report_id == CibilReport.id,
+            HealthScore.calculated_at >= scored_since,
+        ))
+    return stmt
+
+
+def _group_reports(rows: Iterable[Tuple], chunk_size: int) -> Iterator[ReportChunk]:
+    """Fold ordered (report_id, user_id, *account_fields) rows into chunks.
+
+    Rows of one report are contiguous; a chunk is only cut between reports.
+    Reports without accounts arrive as one row of NULL account fields.
+    """
+    chunk = ReportChunk()
+    current_id = None
+
+    for row in rows:
+        report_id, user_id, values = str(row[0]), str(row[1]), row[2:]
+        if report_id != current_id:
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = ReportChunk()
+            chunk.report_ids.append(report_id)
+            chunk.user_ids.append(user_id)
+            chunk.accounts.append([])
+            current_id = report_id
+        if values[0] is not None:  # lender_name is NOT NULL on real accounts
+            chunk.accounts[-1].append(dict(zip(_ACCOUNT_FIELDS, values)))
+
+    if len(chunk):
+        yield chunk
+
+
+# ─── Scoring & Writing ──────────────────────────────────────────────────────
+
+def score_chunk(chunk: ReportChunk) -> List[Dict[str, Any]]:
+    """Score a chunk and return HealthScore insert rows. Runs in worker processes."""
+    results = calculate_health_scores_batch(AccountBatch.from_accounts(chunk.accounts))
+    now = datetime.utcnow()
+    return [
+        {
+            "user_id": UUID(user_id),
+            "report_id": UUID(report_id),
+            "score": result.score,
+            "dti_ratio": result.dti_ratio,
+            "avg_rate": result.avg_rate,
+            "savings_est": result.savings_est,
+            "total_outstanding": result.total_outstanding,
+            "total_emi": result.total_emi,
+            "calculated_at": now,
+        }
+        for report_id, user_id, result in zip(chunk.report_ids, chunk.user_ids, results)
+    ]
+
+
+def _write_chunk(db: Session, chunk: ReportChunk, rows: List[Dict[str, Any]], checkpoint: Checkpoint) -> None:
+    if rows:
+        db.execute(insert(HealthScore), rows)
+    db.commit()
+    checkpoint.advance(chunk.report_ids[-1], len(chunk))
+    logger.info(
+        f"[RESCORE] Committed {len(chunk)} reports "
+        f"(total {checkpoint.reports_done}, last {checkpoint.last_report_id})"
+    )
+
+
+def rescore_portfolio(
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+    restart: bool = False,
+) -> int:
+    """
+    Re-score every user's latest CIBIL report.
+
+    Args:
+        workers: Scoring processes; 0 or 1 scores inline. Defaults to RESCORE_WORKERS.
+        chunk_size: Reports per scoring/INSERT batch. Defaults to RESCORE_CHUNK_SIZE.
+        checkpoint_path: JSON file used to resume an interrupted run.
+        restart: Ignore any existing checkpoint and start from the beginning.
+
+    Returns:
+        Number of reports re-scored in this run.
+    """
+    settings = get_settings()
+    workers = settings.RESCORE_WORKERS if workers is None else workers
+    chunk_size = chunk_size or settings.RESCORE_CHUNK_SIZE
+
+    checkpoint = Checkpoint(path=checkpoint_path) if restart else Checkpoint.load(checkpoint_path)
+    already_done = checkpoint.reports_done
+    # A run that wrote its start time may have committed a chunk it never checkpointed
+    scored_since = checkpoint.started_at
+    if scored_since is None:
+        checkpoint.start()
+    else:
+        logger.info(f"[RESCORE] Resuming run started {scored_since.isoformat()} "
+                    f"after report {checkpoint.last_report_id}")
+
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    executor: Optional[Executor] = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending: Deque[Tuple[ReportChunk, Future]] = deque()
+
+    try:
+        rows = read_db.execute(
+            _latest_reports_stmt(checkpoint.last_report_id, scored_since),
+            execution_options={"yield_per": chunk_size},
+        )
+        for chunk in _group_reports(rows, chunk_size):
+            if executor is None:
+                _write_chunk(write_db, chunk, score_chunk(chunk), checkpoint)
+                continue
+
+            pending.append((chunk, executor.submit(score_chunk, chunk)))
+            # Bound in-flight chunks so memory stays flat; commit in stream order
+            # so the checkpoint never skips past an unwritten chunk.
+            while len(pending) > workers * 2:
+                done_chunk, future = pending.popleft()
+                _write_chunk(write_db, done_chunk, future.result(), checkpoint)
+
+        while pending:
+            done_chunk, future = pending.popleft()
+            _write_chunk(write_db, done_chunk, future.result(), checkpoint)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        read_db.close()
+        write_db.close()
+
+    processed = checkpoint.reports_done - already_done
+    logger.info(f"[RESCORE] Done. {processed} reports re-scored.")
+    checkpoint.clear()
+    return processed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute health scores for all users.")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: RESCORE_WORKERS)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Reports per batch (default: RESCORE_CHUNK_SIZE)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="Checkpoint file for resuming")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    rescore_portfolio(
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,13 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.config import get_settings
+from app.database import async_engine
+from app.integrations.http_client import get_http_registry
+from app.services import aa_data_service, health_check_service
+from app.services.stats_service import stats_refresher
+from app.utils import crypto
+from app.utils.audit import audit_writer
+from app.utils.job_queue import get_job_queue
 from app.routers import otp, health_check, callback, advisory, user, internal
 from app.routers import subscription, settlement, service_request
 from app.routers import pan, setu_aa, payment
@@ -29,8 +36,21 @@ async def lifespan(app: FastAPI):
     print(f"   Setu PAN Provider: {settings.SETU_PAN_PROVIDER}")
     print(f"   Setu AA Provider: {settings.SETU_AA_PROVIDER}")
     print(f"   Setu UPI Provider: {settings.SETU_UPI_PROVIDER}")
+    http_registry = get_http_registry()
+    await audit_writer.start()
+    await stats_refresher.start()
+    job_queue = get_job_queue()
+    health_check_service.register_jobs(job_queue)
+    aa_data_service.register_jobs(job_queue)
+    await job_queue.start()
     yield
     print("🛑 ExitDebt API shutting down...")
+    await job_queue.stop()
+    await stats_refresher.stop()
+    await audit_writer.stop()
+    crypto.shutdown_pool()
+    await http_registry.aclose()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -1,29 +1,96 @@
-"""AA Consent model — tracks Setu Account Aggregator consent requests."""
+"""AA Consent model — tracks Setu Account Aggregator consent requests.
+
+Status is a state machine driven by Setu webhooks (see ``transition``);
+status reads are served from this table. ``next_poll_at`` and
+``poll_attempts`` schedule the fallback poll of Setu's consent API, with
+exponential backoff, for when a webhook is late or lost.
+
+The ``fi_*`` columns track the background FI data fetch
+(app/services/aa_data_service.py); ``fi_result`` caches the parsed
+accounts and score while the consent is usable.
+"""
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, ARRAY
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, JSON, ARRAY
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+PENDING = "PENDING"
+APPROVED = "APPROVED"  # approved in mock mode
+ACTIVE = "ACTIVE"  # approved on Setu
+PAUSED = "PAUSED"
+REJECTED = "REJECTED"
+REVOKED = "REVOKED"
+EXPIRED = "EXPIRED"
+
+# FI data fetch (fi_status)
+FI_REQUESTED = "REQUESTED"  # data session created; waiting for FI_DATA_READY
+FI_FETCHING = "FETCHING"
+FI_READY = "READY"
+FI_FAILED = "FAILED"
+
+APPROVED_STATUSES = frozenset({APPROVED, ACTIVE})
+TERMINAL_STATUSES = frozenset({REJECTED, REVOKED, EXPIRED})
+
+# Allowed moves; anything else (late or replayed webhooks) is ignored
+TRANSITIONS = {
+    PENDING: {APPROVED, ACTIVE, REJECTED, EXPIRED},
+    APPROVED: {ACTIVE, PAUSED, REVOKED, EXPIRED},
+    ACTIVE: {PAUSED, REVOKED, EXPIRED},
+    PAUSED: {ACTIVE, REVOKED, EXPIRED},
+}
+
 
 class AAConsent(Base):
     __tablename__ = "aa_consents"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # None until the phone has a user
+    phone = Column(String(15), nullable=True)
     setu_consent_id = Column(String, unique=True, nullable=False, index=True)
-    status = Column(String, default="PENDING")  # PENDING → APPROVED → ACTIVE → REVOKED
+    status = Column(String, default=PENDING)  # PENDING → APPROVED/ACTIVE → PAUSED/REVOKED/EXPIRED
     redirect_url = Column(String, nullable=True)
-    fi_types = Column(ARRAY(String), default=["DEPOSIT", "CREDIT_CARD"])
+    fi_types = Column(ARRAY(String).with_variant(JSON(), "sqlite"), default=["DEPOSIT", "CREDIT_CARD"])
     data_range_from = Column(DateTime, nullable=True)
     data_range_to = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     approved_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    next_poll_at = Column(DateTime, nullable=True)  # None once terminal
+    poll_attempts = Column(Integer, nullable=False, default=0)
+    fi_status = Column(String(20), nullable=True)  # None until data is requested
+    fi_session_id = Column(String, nullable=True)
+    fi_requested_at = Column(DateTime, nullable=True)  # when the current fetch step was queued
+    fi_result = Column(JSON, nullable=True)  # {"accounts", "health_score", "raw_fi_count"}
+    fi_error = Column(String, nullable=True)
+    fi_fetched_at = Column(DateTime, nullable=True)
 
     # Relationships
     user = relationship("User", backref="aa_consents")
+    debt_accounts = relationship("DebtAccount", back_populates="consent")
+
+    @property
+    def is_approved(self) -> bool:
+        return self.status in APPROVED_STATUSES
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def transition(self, status: str) -> bool:
+        """Move to ``status`` if allowed from the current one; returns whether it changed."""
+        if status not in TRANSITIONS.get(self.status, ()):
+            return False
+        self.status = status
+        if status in APPROVED_STATUSES and self.approved_at is None:
+            self.approved_at = datetime.utcnow()
+        if status in TERMINAL_STATUSES:
+            # Financial data may only be used while the consent stands
+            self.fi_result = None
+            self.fi_status = None
+        return True
 
     def __repr__(self):
         return f"<AAConsent {self.setu_consent_id} status={self.status}>"
@@ -9,7 +9,14 @@ from app.database import Base
 
 
 class AuditLog(Base):
+    """Range-partitioned by month on created_at (see migration 007).
+
+    created_at is part of the primary key because unique constraints on a
+    partitioned table must include the partition key. Filter on created_at
+    so queries only touch the partitions they need.
+    """
     __tablename__ = "audit_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     event_type = Column(String(50), nullable=False, index=True)  # otp_attempt, cibil_pull, callback_request, etc.
@@ -17,4 +24,4 @@ class AuditLog(Base):
     phone = Column(String(15), nullable=True)
     ip_address = Column(String(45), nullable=True)
     metadata_json = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True, nullable=False, index=True)
@@ -9,17 +9,25 @@ from app.database import Base
 
 
 class DebtAccount(Base):
+    """A debt from a CIBIL report (``source="cibil"``, with report_id) or an
+    Account Aggregator fetch (``source="aa"``, with consent_id)."""
+
     __tablename__ = "debt_accounts"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    report_id = Column(UUID(as_uuid=True), ForeignKey("cibil_reports.id"), nullable=False, index=True)
+    report_id = Column(UUID(as_uuid=True), ForeignKey("cibil_reports.id"), nullable=True, index=True)
+    consent_id = Column(UUID(as_uuid=True), ForeignKey("aa_consents.id"), nullable=True, index=True)
+    source = Column(String(10), nullable=False, default="cibil")  # cibil | aa
     lender_name = Column(String(255), nullable=False)
     account_type = Column(String(50), nullable=False)  # personal_loan, credit_card, home_loan, etc.
     outstanding = Column(Float, nullable=False, default=0.0)
     interest_rate = Column(Float, nullable=True)
     emi_amount = Column(Float, nullable=True)
     due_date = Column(Integer, nullable=True)  # Day of month (1-31)
+    utilization = Column(Float, nullable=True)  # 0-1 for revolving credit
+    payment_history = Column(Float, nullable=True)  # 0-1 score
     status = Column(String(30), nullable=False, default="active")  # active, closed, overdue, written_off
 
     # Relationships
     report = relationship("CibilReport", back_populates="debt_accounts")
+    consent = relationship("AAConsent", back_populates="debt_accounts")
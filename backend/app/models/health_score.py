@@ -2,7 +2,7 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Float, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Index, Float, Integer, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -11,14 +11,24 @@ from app.database import Base
 
 class HealthScore(Base):
     __tablename__ = "health_scores"
+    __table_args__ = (
+        # Keyset pagination order (see app/utils/pagination.py)
+        Index("ix_health_scores_calculated_at_id", "calculated_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    report_id = Column(UUID(as_uuid=True), ForeignKey("cibil_reports.id"), nullable=True, index=True)
+    consent_id = Column(UUID(as_uuid=True), ForeignKey("aa_consents.id"), nullable=True, index=True)  # AA-derived scores
     score = Column(Integer, nullable=False)
     dti_ratio = Column(Float, nullable=True)
     avg_rate = Column(Float, nullable=True)
     savings_est = Column(Float, nullable=True)
+    total_outstanding = Column(Float, nullable=True)  # Precomputed from the report's accounts
+    total_emi = Column(Float, nullable=True)
     calculated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="health_scores")
+    report = relationship("CibilReport")
+    consent = relationship("AAConsent")
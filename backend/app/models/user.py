@@ -2,19 +2,34 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, Index, String, DateTime
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from app.database import Base
+from app.utils.phone import normalize_phone
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination order (see app/utils/pagination.py)
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Admin phone search (migration 010): substring via trigrams, prefix via pattern ops
+        Index(
+            "ix_users_phone_normalized_trgm", "phone_normalized",
+            postgresql_using="gin", postgresql_ops={"phone_normalized": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_phone_normalized_prefix", "phone_normalized",
+            postgresql_ops={"phone_normalized": "varchar_pattern_ops"},
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     pan_hash = Column(String(64), nullable=False, index=True)  # SHA-256 hex digest
     phone = Column(String(15), nullable=False, index=True)
+    phone_normalized = Column(String(15), nullable=True)  # digits only, set from phone
     name = Column(String(255), nullable=False)
     role = Column(String(20), nullable=False, default="user")  # user | sales | admin
     consent_ts = Column(DateTime, nullable=False)
@@ -31,3 +46,7 @@ class User(Base):
     settlement_cases = relationship("SettlementCase", back_populates="user", cascade="all, delete-orphan")
     shield_consents = relationship("ShieldConsent", back_populates="user", cascade="all, delete-orphan")
 
+    @validates("phone")
+    def _set_phone_normalized(self, key, phone):
+        self.phone_normalized = normalize_phone(phone)
+        return phone
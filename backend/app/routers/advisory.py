@@ -3,9 +3,9 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Request, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.advisory import AdvisoryPurchaseRequest, AdvisoryResponse
 from app.models.advisory_plan import AdvisoryPlan
 from app.models.user import User
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/api/advisory", tags=["Advisory"])
 async def purchase_advisory(
     payload: AdvisoryPurchaseRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Initiate an advisory plan purchase via UPI."""
     client_ip = request.client.host if request.client else None
@@ -30,7 +30,7 @@ async def purchase_advisory(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == user_uuid).first()
+    user = await db.get(User, user_uuid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
@@ -66,11 +66,10 @@ async def purchase_advisory(
         },
     )
     db.add(plan)
-    db.commit()
-    db.refresh(plan)
+    await db.commit()
 
     # Audit log
-    log_event(
+    await log_event(
         db=db,
         event_type="advisory_purchase",
         user_id=user.id,
@@ -92,14 +91,14 @@ async def purchase_advisory(
 
 
 @router.get("/{advisory_id}", response_model=AdvisoryResponse)
-async def get_advisory(advisory_id: str, db: Session = Depends(get_db)):
+async def get_advisory(advisory_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get advisory plan details."""
     try:
         plan_uuid = UUID(advisory_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid advisory ID format.")
 
-    plan = db.query(AdvisoryPlan).filter(AdvisoryPlan.id == plan_uuid).first()
+    plan = await db.get(AdvisoryPlan, plan_uuid)
     if not plan:
         raise HTTPException(status_code=404, detail="Advisory plan not found.")
 
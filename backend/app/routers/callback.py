@@ -4,9 +4,10 @@ from datetime import datetime
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Request, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.callback import CallbackRequest, CallbackResponse
 from app.models.callback import Callback
 from app.models.user import User
@@ -21,7 +22,7 @@ router = APIRouter(prefix="/api/callback", tags=["Callback"])
 async def create_callback(
     payload: CallbackRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Schedule a callback and create a lead in CRM."""
     client_ip = request.client.host if request.client else None
@@ -32,7 +33,7 @@ async def create_callback(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == user_uuid).first()
+    user = await db.get(User, user_uuid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
@@ -47,15 +48,14 @@ async def create_callback(
         status="pending",
     )
     db.add(callback)
-    db.commit()
-    db.refresh(callback)
+    await db.commit()
 
     # Get latest health score for CRM lead data
-    latest_score = (
-        db.query(HealthScore)
-        .filter(HealthScore.user_id == user.id)
+    latest_score = await db.scalar(
+        select(HealthScore)
+        .where(HealthScore.user_id == user.id)
         .order_by(HealthScore.calculated_at.desc())
-        .first()
+        .limit(1)
     )
 
     # Push lead to CRM
@@ -73,7 +73,7 @@ async def create_callback(
         pass  # CRM failure should not block callback creation
 
     # Audit log
-    log_event(
+    await log_event(
         db=db,
         event_type="callback_request",
         user_id=user.id,
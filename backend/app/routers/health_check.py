@@ -1,50 +1,61 @@
 """Health check endpoints — trigger CIBIL pull and compute debt health score."""
 
-import json
-from datetime import datetime
+import asyncio
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_async_db
 from app.schemas.health_check import (
     HealthCheckRequest,
     HealthCheckResponse,
+    HealthCheckJob,
     DebtAccountResponse,
     FlaggedAccount,
 )
-from app.models.user import User
+from app.models.aa_consent import AAConsent
 from app.models.cibil_report import CibilReport
-from app.models.debt_account import DebtAccount
 from app.models.health_score import HealthScore as HealthScoreModel
-from app.services.health_score import calculate_health_score
-from app.integrations.mock_providers import MockCIBILService, MockWhatsAppService
-from app.utils.security import hash_pan, encrypt_data, mask_pan
-from app.utils.rate_limiter import rate_limiter
-from app.utils.audit import log_event
+from app.services.aa_data_service import AA_SOURCE
+from app.services.health_check_service import (
+    HEALTH_CHECK_JOB,
+    HealthCheckError,
+    run_health_check,
+)
+from app.services.score_cache import account_dicts, score_cached
+from app.integrations.mock_providers import MockWhatsAppService
+from app.utils.job_queue import Job, get_job_queue
 
 router = APIRouter(prefix="/api/health-check", tags=["Health Check"])
 
-# Service instances (use DI pattern for production)
-_cibil_service = MockCIBILService()
 _whatsapp_service = MockWhatsAppService()
 
 
-@router.post("", response_model=HealthCheckResponse)
+@router.post(
+    "",
+    response_model=HealthCheckResponse,
+    responses={202: {"model": HealthCheckJob, "description": "Accepted in job mode"}},
+)
 async def create_health_check(
     payload: HealthCheckRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    mode: Literal["sync", "job"] = Query(
+        "sync", description="'job' returns 202 with a job to poll or follow over SSE"
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Run a full health check:
-    1. Validate PAN & consent
-    2. Rate limit check
-    3. Create/find user
-    4. Pull CIBIL report
-    5. Compute health score
-    6. Return results
+    Run a full health check (see health_check_service.run_health_check).
+
+    In job mode the request is validated, queued and answered with 202;
+    the pull → encrypt → persist → score pipeline runs in a background
+    worker and its result is served by GET /jobs/{job_id} (or /events).
     """
     client_ip = request.client.host if request.client else "unknown"
 
@@ -55,189 +66,148 @@ async def create_health_check(
     if not payload.consent:
         raise HTTPException(status_code=400, detail="Consent is required to perform a credit check.")
 
-    # Rate limiting
-    if not rate_limiter.is_allowed(payload.phone):
-        log_event(
-            db=db,
-            event_type="cibil_pull_rate_limited",
-            phone=payload.phone,
-            ip_address=client_ip,
+    if mode == "job":
+        job = await get_job_queue().submit(
+            HEALTH_CHECK_JOB,
+            {"request": payload.model_dump(), "client_ip": client_ip},
         )
-        remaining = rate_limiter.remaining(payload.phone)
-        raise HTTPException(
-            status_code=429,
-            detail=f"Rate limit exceeded. Maximum 3 credit checks per 24 hours. Remaining: {remaining}",
+        return JSONResponse(
+            status_code=202,
+            content=_job_status(job).model_dump(mode="json"),
+            headers={"Location": f"{router.prefix}/jobs/{job.id}"},
         )
 
-    # Hash PAN — never store raw
-    pan_hashed = hash_pan(payload.pan)
-
-    # Create or find user
-    user = db.query(User).filter(User.pan_hash == pan_hashed, User.phone == payload.phone).first()
-    if not user:
-        user = User(
-            pan_hash=pan_hashed,
-            phone=payload.phone,
-            name=payload.name,
-            consent_ts=datetime.utcnow(),
-            consent_ip=client_ip,
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-
-    # Pull CIBIL report
     try:
-        cibil_data = await _cibil_service.pull_report(
-            pan=payload.pan,
-            name=payload.name,
-            phone=payload.phone,
-        )
-    except Exception as e:
-        log_event(
-            db=db,
-            event_type="cibil_pull",
-            user_id=user.id,
-            phone=payload.phone,
-            ip_address=client_ip,
-            metadata={"status": "error", "error": str(e)},
-        )
-        raise HTTPException(status_code=502, detail="Failed to fetch credit report. Please try again later.")
+        return await run_health_check(db, payload, client_ip)
+    except HealthCheckError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    # Record rate limit
-    rate_limiter.record(payload.phone)
 
-    # Encrypt and store raw CIBIL data
-    encrypted_raw = encrypt_data(cibil_data.get("raw_data", "{}"))
-    report = CibilReport(
-        user_id=user.id,
-        raw_encrypted=encrypted_raw,
-        credit_score=cibil_data.get("credit_score"),
-    )
-    db.add(report)
-    db.commit()
-    db.refresh(report)
-
-    # Store debt accounts
-    accounts_data = cibil_data.get("accounts", [])
-    for acc in accounts_data:
-        debt_account = DebtAccount(
-            report_id=report.id,
-            lender_name=acc["lender_name"],
-            account_type=acc["account_type"],
-            outstanding=acc["outstanding"],
-            interest_rate=acc.get("interest_rate"),
-            emi_amount=acc.get("emi_amount"),
-            status=acc.get("status", "active"),
-        )
-        db.add(debt_account)
-    db.commit()
-
-    # Calculate health score
-    score_result = calculate_health_score(accounts_data)
-
-    # Store health score
-    health_score = HealthScoreModel(
-        user_id=user.id,
-        score=score_result.score,
-        dti_ratio=score_result.dti_ratio,
-        avg_rate=score_result.avg_rate,
-        savings_est=score_result.savings_est,
-    )
-    db.add(health_score)
-    db.commit()
-    db.refresh(health_score)
-
-    # Audit log
-    log_event(
-        db=db,
-        event_type="cibil_pull",
-        user_id=user.id,
-        phone=payload.phone,
-        ip_address=client_ip,
-        metadata={"status": "success", "score": score_result.score},
-    )
+# ─── Jobs ─────────────────────────────────────────────────────────────────────
 
-    # WhatsApp share link
-    share_text = (
-        f"I checked my Debt Health Score on ExitDebt — scored {score_result.score}/100 "
-        f"({score_result.category}). Check yours: https://exitdebt.in/check"
-    )
-    share_link = _whatsapp_service.generate_share_link(share_text)
 
-    # Build response
-    debt_responses = [
-        DebtAccountResponse(
-            id=str(da.id),
-            lender_name=da.lender_name,
-            account_type=da.account_type,
-            outstanding=da.outstanding,
-            interest_rate=da.interest_rate,
-            emi_amount=da.emi_amount,
-            status=da.status,
-        )
-        for da in db.query(DebtAccount).filter(DebtAccount.report_id == report.id).all()
-    ]
+def _job_status(job: Job) -> HealthCheckJob:
+    return HealthCheckJob(
+        job_id=job.id,
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
 
-    flagged_responses = [
-        FlaggedAccount(**f) for f in score_result.flagged_accounts
-    ]
 
-    return HealthCheckResponse(
-        id=str(health_score.id),
-        score=score_result.score,
-        category=score_result.category,
-        credit_score=cibil_data.get("credit_score"),
-        total_outstanding=score_result.total_outstanding,
-        total_emi=score_result.total_emi,
-        avg_rate=score_result.avg_rate,
-        dti_ratio=score_result.dti_ratio,
-        savings_est=score_result.savings_est,
-        debt_accounts=debt_responses,
-        flagged_accounts=flagged_responses,
-        whatsapp_share_link=share_link,
+async def _get_job(job_id: str) -> Job:
+    job = await get_job_queue().store.get(job_id)
+    if job is None or job.kind != HEALTH_CHECK_JOB:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=HealthCheckJob)
+async def get_health_check_job(job_id: str):
+    """Poll a job-mode health check."""
+    return _job_status(await _get_job(job_id))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_health_check_job(job_id: str, request: Request):
+    """Server-Sent Events: one event per status change, ending with succeeded or failed."""
+    job = await _get_job(job_id)
+    settings = get_settings()
+    store = get_job_queue().store
+
+    async def events():
+        current: Optional[Job] = job
+        last_status = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.JOB_EVENTS_TIMEOUT_SECONDS
+        while current is not None:
+            if current.status != last_status:
+                last_status = current.status
+                data = _job_status(current).model_dump_json()
+                yield f"event: {current.status}\ndata: {data}\n\n"
+            if current.done:
+                return
+            if loop.time() >= deadline or await request.is_disconnected():
+                yield ": timeout\n\n"  # client may reconnect or poll
+                return
+            await asyncio.sleep(settings.JOB_EVENTS_POLL_SECONDS)
+            current = await store.get(job_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/{health_check_id}", response_model=HealthCheckResponse)
-async def get_health_check(health_check_id: str, db: Session = Depends(get_db)):
-    """Retrieve an existing health check result by ID."""
+async def get_health_check(health_check_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Retrieve an existing health check result by ID.
+
+    Loads the score, its user and its report (or, for a score computed from
+    Account Aggregator data, its consent) in one joined query and their
+    debt accounts in one batched SELECT, so the number of round trips does
+    not depend on how many accounts there are.
+    """
     try:
         check_uuid = UUID(health_check_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid health check ID format.")
 
-    health_score = db.query(HealthScoreModel).filter(HealthScoreModel.id == check_uuid).first()
+    health_score = await db.scalar(
+        select(HealthScoreModel)
+        .options(
+            joinedload(HealthScoreModel.user),
+            joinedload(HealthScoreModel.report).selectinload(CibilReport.debt_accounts),
+            joinedload(HealthScoreModel.consent).selectinload(AAConsent.debt_accounts),
+        )
+        .where(HealthScoreModel.id == check_uuid)
+    )
     if not health_score:
         raise HTTPException(status_code=404, detail="Health check not found.")
 
-    # Get user
-    user = db.query(User).filter(User.id == health_score.user_id).first()
-    if not user:
+    if not health_score.user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    # Get latest CIBIL report
-    report = (
-        db.query(CibilReport)
-        .filter(CibilReport.user_id == user.id)
-        .order_by(CibilReport.pulled_at.desc())
-        .first()
-    )
-
-    debt_accounts = []
-    if report:
-        debt_accounts = [
-            DebtAccountResponse(
-                id=str(da.id),
-                lender_name=da.lender_name,
-                account_type=da.account_type,
-                outstanding=da.outstanding,
-                interest_rate=da.interest_rate,
-                emi_amount=da.emi_amount,
-                status=da.status,
+    report = health_score.report
+    if health_score.consent is not None:
+        # Scored from AA data: the consent's accounts, and no bureau report
+        accounts = [da for da in health_score.consent.debt_accounts if da.source == AA_SOURCE]
+    else:
+        if report is None:
+            # Scores written before report_id existed: fall back to the user's latest report
+            report = await db.scalar(
+                select(CibilReport)
+                .options(selectinload(CibilReport.debt_accounts))
+                .where(CibilReport.user_id == health_score.user_id)
+                .order_by(CibilReport.pulled_at.desc())
+                .limit(1)
             )
-            for da in db.query(DebtAccount).filter(DebtAccount.report_id == report.id).all()
-        ]
+        accounts = report.debt_accounts if report else []
+
+    # Flags are not stored; the content-addressed cache usually has them from the POST
+    score_result = await score_cached(account_dicts(accounts))
+    debt_accounts = [
+        DebtAccountResponse(
+            id=str(da.id),
+            lender_name=da.lender_name,
+            account_type=da.account_type,
+            outstanding=da.outstanding,
+            interest_rate=da.interest_rate,
+            emi_amount=da.emi_amount,
+            status=da.status,
+        )
+        for da in accounts
+    ]
+
+    total_outstanding = health_score.total_outstanding
+    if total_outstanding is None:
+        total_outstanding = sum(da.outstanding for da in accounts)
+    total_emi = health_score.total_emi
+    if total_emi is None:
+        total_emi = sum(da.emi_amount or 0 for da in accounts)
 
     # WhatsApp share link
     share_text = (
@@ -256,12 +226,12 @@ async def get_health_check(health_check_id: str, db: Session = Depends(get_db)):
             else "Critical"
         ),
         credit_score=report.credit_score if report else None,
-        total_outstanding=sum(da.outstanding for da in (db.query(DebtAccount).filter(DebtAccount.report_id == report.id).all() if report else [])),
-        total_emi=sum(da.emi_amount or 0 for da in (db.query(DebtAccount).filter(DebtAccount.report_id == report.id).all() if report else [])),
+        total_outstanding=total_outstanding,
+        total_emi=total_emi,
         avg_rate=health_score.avg_rate or 0,
         dti_ratio=health_score.dti_ratio,
         savings_est=health_score.savings_est or 0,
         debt_accounts=debt_accounts,
-        flagged_accounts=[],
+        flagged_accounts=[FlaggedAccount(**f) for f in score_result.flagged_accounts],
         whatsapp_share_link=share_link,
     )
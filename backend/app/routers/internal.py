@@ -4,19 +4,27 @@ All endpoints require X-API-Key authentication.
 Provides read access to users, health checks, callbacks, and dashboard stats.
 """
 
-import math
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, get_async_engine
+from app.utils.audit import log_event
 from app.utils.auth import require_api_key
+from app.integrations.http_client import get_http_registry
+from app.services import export_service, stats_service
+from app.services.user_summary_service import get_user_summaries
+from app.utils.pagination import InvalidCursor, PageResult, paginate
+from app.utils.phone import NATIONAL_LENGTH, normalize_phone
 from app.models.user import User
 from app.models.health_score import HealthScore
 from app.models.callback import Callback
+from app.models.audit_log import AuditLog
 from app.schemas.internal import (
     UserSummary,
     UserDetail,
@@ -26,6 +34,7 @@ from app.schemas.internal import (
     CallbackDetail,
     CallbackStatusUpdate,
     StatsOverview,
+    AuditLogEntry,
     PaginatedResponse,
 )
 
@@ -36,6 +45,22 @@ router = APIRouter(
 )
 
 
+PaginationMode = Literal["page", "cursor"]
+PhoneMatch = Literal["auto", "prefix", "contains"]
+
+PAGINATION_DESCRIPTION = (
+    "'page' (default): page numbers with an exact total. "
+    "'cursor': keyset pagination; follow next_cursor, total is estimated or omitted."
+)
+
+
+async def _paginate(db: AsyncSession, query, ts_col, id_col, **kwargs) -> PageResult:
+    try:
+        return await paginate(db, query, ts_col, id_col, **kwargs)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ─── Users ─────────────────────────────────────────────────────────────────
 
 
@@ -44,64 +69,79 @@ async def list_users(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None, description="Search by phone number"),
-    db: Session = Depends(get_db),
+    match: PhoneMatch = Query(
+        "auto",
+        description="'prefix' or 'contains'; 'auto' matches a full number exactly, otherwise by substring",
+    ),
+    pagination: PaginationMode = Query("page", description=PAGINATION_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """List all users with pagination and optional phone search."""
-    query = db.query(User).filter(User.pan_hash != "DELETED")
+    """List all users with pagination and optional phone search.
+
+    Search runs on phone_normalized, so "+91 98765-43210" and "9876543210"
+    match the same user; substring matches use the trigram index and
+    prefix/exact matches the pattern-ops B-tree.
+    """
+    query = select(User).where(User.pan_hash != "DELETED")
 
     if search:
-        query = query.filter(User.phone.contains(search))
-
-    total = query.count()
-    users = (
-        query.order_by(User.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
+        digits = normalize_phone(search)
+        if not digits:
+            raise HTTPException(status_code=400, detail="Search must contain digits.")
+        if match == "prefix":
+            query = query.where(User.phone_normalized.startswith(digits))
+        elif match == "auto" and len(digits) == NATIONAL_LENGTH:
+            query = query.where(User.phone_normalized == digits)
+        else:
+            query = query.where(User.phone_normalized.contains(digits))
+
+    result = await _paginate(
+        db, query, User.created_at, User.id,
+        page_size=page_size, mode=pagination, page=page, cursor=cursor,
+        estimate_table=None if search else "users",
     )
 
-    return PaginatedResponse(
-        items=[
+    return result.response(
+        [
             UserSummary(
                 id=str(u.id),
                 name=u.name,
                 phone=u.phone,
                 created_at=u.created_at,
             ).model_dump()
-            for u in users
-        ],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=math.ceil(total / page_size) if total > 0 else 0,
+            for u in result.rows
+        ]
     )
 
 
 @router.get("/users/{user_id}", response_model=UserDetail)
-async def get_user(user_id: str, db: Session = Depends(get_db)):
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get detailed user info including health scores and callbacks."""
     try:
         uid = UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == uid).first()
+    user = await db.get(User, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
     scores = (
-        db.query(HealthScore)
-        .filter(HealthScore.user_id == uid)
-        .order_by(HealthScore.calculated_at.desc())
-        .all()
-    )
+        await db.scalars(
+            select(HealthScore)
+            .where(HealthScore.user_id == uid)
+            .order_by(HealthScore.calculated_at.desc())
+        )
+    ).all()
 
     callbacks = (
-        db.query(Callback)
-        .filter(Callback.user_id == uid)
-        .order_by(Callback.created_at.desc())
-        .all()
-    )
+        await db.scalars(
+            select(Callback)
+            .where(Callback.user_id == uid)
+            .order_by(Callback.created_at.desc())
+        )
+    ).all()
 
     return UserDetail(
         id=str(user.id),
@@ -141,51 +181,46 @@ async def list_callbacks(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db),
+    pagination: PaginationMode = Query("page", description=PAGINATION_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all callbacks with optional status filter."""
-    query = db.query(Callback)
+    query = select(Callback)
 
     if status:
-        query = query.filter(Callback.status == status)
+        query = query.where(Callback.status == status)
 
-    total = query.count()
-    callbacks = (
-        query.order_by(Callback.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
+    result = await _paginate(
+        db, query, Callback.created_at, Callback.id,
+        page_size=page_size, mode=pagination, page=page, cursor=cursor,
+        estimate_table=None if status else "callbacks",
     )
 
+    users = await get_user_summaries(db, (c.user_id for c in result.rows))
     items = []
-    for c in callbacks:
-        user = db.query(User).filter(User.id == c.user_id).first()
+    for c in result.rows:
+        user = users[c.user_id]
         items.append(
             CallbackDetail(
                 id=str(c.id),
                 user_id=str(c.user_id),
-                user_name=user.name if user else "Unknown",
-                user_phone=user.phone if user else "Unknown",
+                user_name=user.name,
+                user_phone=user.phone,
                 preferred_time=c.preferred_time,
                 status=c.status,
                 created_at=c.created_at,
             ).model_dump()
         )
 
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=math.ceil(total / page_size) if total > 0 else 0,
-    )
+    return result.response(items)
 
 
 @router.patch("/callbacks/{callback_id}/status")
 async def update_callback_status(
     callback_id: str,
     payload: CallbackStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update callback status (pending → confirmed → completed / cancelled)."""
     try:
@@ -193,12 +228,12 @@ async def update_callback_status(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid callback ID format.")
 
-    callback = db.query(Callback).filter(Callback.id == cid).first()
+    callback = await db.get(Callback, cid)
     if not callback:
         raise HTTPException(status_code=404, detail="Callback not found.")
 
     callback.status = payload.status
-    db.commit()
+    await db.commit()
 
     return {"id": str(callback.id), "status": callback.status, "updated": True}
 
@@ -210,27 +245,27 @@ async def update_callback_status(
 async def list_health_checks(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    pagination: PaginationMode = Query("page", description=PAGINATION_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all health checks with pagination."""
-    total = db.query(HealthScore).count()
-    scores = (
-        db.query(HealthScore)
-        .order_by(HealthScore.calculated_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
+    result = await _paginate(
+        db, select(HealthScore), HealthScore.calculated_at, HealthScore.id,
+        page_size=page_size, mode=pagination, page=page, cursor=cursor,
+        estimate_table="health_scores",
     )
 
+    users = await get_user_summaries(db, (s.user_id for s in result.rows))
     items = []
-    for s in scores:
-        user = db.query(User).filter(User.id == s.user_id).first()
+    for s in result.rows:
+        user = users[s.user_id]
         items.append(
             HealthCheckDetail(
                 id=str(s.id),
                 user_id=str(s.user_id),
-                user_name=user.name if user else "Unknown",
-                user_phone=user.phone if user else "Unknown",
+                user_name=user.name,
+                user_phone=user.phone,
                 score=s.score,
                 avg_rate=s.avg_rate,
                 dti_ratio=s.dti_ratio,
@@ -239,34 +274,28 @@ async def list_health_checks(
             ).model_dump()
         )
 
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=math.ceil(total / page_size) if total > 0 else 0,
-    )
+    return result.response(items)
 
 
 @router.get("/health-checks/{check_id}", response_model=HealthCheckDetail)
-async def get_health_check(check_id: str, db: Session = Depends(get_db)):
+async def get_health_check(check_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a single health check detail."""
     try:
         cid = UUID(check_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid health check ID format.")
 
-    score = db.query(HealthScore).filter(HealthScore.id == cid).first()
+    score = await db.get(HealthScore, cid)
     if not score:
         raise HTTPException(status_code=404, detail="Health check not found.")
 
-    user = db.query(User).filter(User.id == score.user_id).first()
+    user = (await get_user_summaries(db, [score.user_id]))[score.user_id]
 
     return HealthCheckDetail(
         id=str(score.id),
         user_id=str(score.user_id),
-        user_name=user.name if user else "Unknown",
-        user_phone=user.phone if user else "Unknown",
+        user_name=user.name,
+        user_phone=user.phone,
         score=score.score,
         avg_rate=score.avg_rate,
         dti_ratio=score.dti_ratio,
@@ -275,31 +304,121 @@ async def get_health_check(check_id: str, db: Session = Depends(get_db)):
     )
 
 
+# ─── Audit Logs ────────────────────────────────────────────────────────────
+
+AUDIT_LOG_MAX_RANGE = timedelta(days=93)
+
+
+@router.get("/audit-logs", response_model=PaginatedResponse)
+async def list_audit_logs(
+    start: datetime = Query(..., description="Inclusive lower bound on created_at"),
+    end: datetime = Query(..., description="Exclusive upper bound on created_at"),
+    event_type: Optional[str] = Query(None),
+    user_id: Optional[str] = Query(None),
+    phone: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    pagination: PaginationMode = Query("page", description=PAGINATION_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List audit events in a time range.
+
+    The range is required (and capped) so Postgres only scans the monthly
+    partitions that overlap it.
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start.")
+    if end - start > AUDIT_LOG_MAX_RANGE:
+        raise HTTPException(status_code=400, detail="Range may not exceed 93 days.")
+
+    query = select(AuditLog).where(AuditLog.created_at >= start, AuditLog.created_at < end)
+    if event_type:
+        query = query.where(AuditLog.event_type == event_type)
+    if user_id:
+        try:
+            query = query.where(AuditLog.user_id == UUID(user_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid user ID format.")
+    if phone:
+        query = query.where(AuditLog.phone == phone)
+
+    result = await _paginate(
+        db, query, AuditLog.created_at, AuditLog.id,
+        page_size=page_size, mode=pagination, page=page, cursor=cursor,
+    )
+
+    return result.response(
+        [
+            AuditLogEntry(
+                id=str(e.id),
+                event_type=e.event_type,
+                user_id=str(e.user_id) if e.user_id else None,
+                phone=e.phone,
+                ip_address=e.ip_address,
+                metadata=e.metadata_json,
+                created_at=e.created_at,
+            ).model_dump()
+            for e in result.rows
+        ]
+    )
+
+
+# ─── Exports ───────────────────────────────────────────────────────────────
+
+
+@router.get("/exports/{dataset}")
+async def export_dataset(
+    dataset: Literal["users", "health-checks", "callbacks", "settlement-cases"],
+    request: Request,
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    gzip: bool = Query(False, description="Compress the download (.gz)"),
+    db: AsyncSession = Depends(get_async_db),
+    engine: AsyncEngine = Depends(get_async_engine),
+):
+    """Stream a full export from one consistent snapshot in constant memory."""
+    await log_event(
+        db=db,
+        event_type="admin_export",
+        ip_address=request.client.host if request.client else None,
+        metadata={"dataset": dataset, "format": fmt, "gzip": gzip},
+    )
+
+    body = export_service.stream_export(engine, dataset, fmt)
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d%H%M%S}.{fmt}"
+    media_type = export_service.MEDIA_TYPES[fmt]
+    if gzip:
+        body = export_service.gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ─── Stats ─────────────────────────────────────────────────────────────────
 
 
 @router.get("/stats/overview", response_model=StatsOverview)
-async def get_stats(db: Session = Depends(get_db)):
-    """Dashboard stats overview."""
-    total_users = db.query(User).filter(User.pan_hash != "DELETED").count()
-    total_checks = db.query(HealthScore).count()
-    total_callbacks = db.query(Callback).count()
-
-    avg_score = db.query(func.avg(HealthScore.score)).scalar()
-    total_savings = db.query(func.sum(HealthScore.savings_est)).scalar()
-
-    callback_counts = {}
-    for s in ["pending", "confirmed", "completed", "cancelled"]:
-        callback_counts[s] = db.query(Callback).filter(Callback.status == s).count()
-
-    return StatsOverview(
-        total_users=total_users,
-        total_health_checks=total_checks,
-        total_callbacks=total_callbacks,
-        avg_health_score=round(avg_score, 1) if avg_score else None,
-        total_savings_found=round(total_savings, 0) if total_savings else None,
-        callbacks_pending=callback_counts.get("pending", 0),
-        callbacks_confirmed=callback_counts.get("confirmed", 0),
-        callbacks_completed=callback_counts.get("completed", 0),
-        callbacks_cancelled=callback_counts.get("cancelled", 0),
-    )
+async def get_stats(
+    start: Optional[date] = Query(None, description="First day to include (inclusive)"),
+    end: Optional[date] = Query(None, description="Last day to include (inclusive)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Dashboard stats overview, optionally limited to a date range.
+
+    Served from the daily_stats materialized view in one query; figures
+    lag writes by up to STATS_REFRESH_INTERVAL_SECONDS.
+    """
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start.")
+    return await stats_service.get_overview(db, start=start, end=end)
+
+
+@router.get("/http-pools")
+async def get_http_pool_stats():
+    """Outbound connection pool usage per provider (for pool sizing)."""
+    return get_http_registry().stats()
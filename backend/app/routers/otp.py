@@ -1,9 +1,9 @@
 """OTP endpoints — send and verify OTP codes."""
 
 from fastapi import APIRouter, Depends, Request, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.otp import OTPSendRequest, OTPVerifyRequest, OTPResponse
 from app.services.otp_service import get_otp_service
 from app.utils.audit import log_event
@@ -13,14 +13,14 @@ router = APIRouter(prefix="/api/otp", tags=["OTP"])
 
 
 @router.post("/send", response_model=OTPResponse)
-async def send_otp(payload: OTPSendRequest, request: Request, db: Session = Depends(get_db)):
+async def send_otp(payload: OTPSendRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Send OTP to the provided phone number."""
     # Validate phone format
     if not payload.validate_phone():
         raise HTTPException(status_code=400, detail="Invalid phone number. Must be a 10-digit Indian mobile number.")
 
     # Log audit event
-    log_event(
+    await log_event(
         db=db,
         event_type="otp_send",
         phone=payload.phone,
@@ -38,7 +38,7 @@ async def send_otp(payload: OTPSendRequest, request: Request, db: Session = Depe
 
 
 @router.post("/verify", response_model=OTPResponse)
-async def verify_otp(payload: OTPVerifyRequest, request: Request, db: Session = Depends(get_db)):
+async def verify_otp(payload: OTPVerifyRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Verify OTP code and return a session token."""
     otp_service = get_otp_service()
     is_valid = await otp_service.verify_otp(payload.phone, payload.otp_code)
@@ -46,7 +46,7 @@ async def verify_otp(payload: OTPVerifyRequest, request: Request, db: Session =
     client_ip = request.client.host if request.client else None
 
     if not is_valid:
-        log_event(
+        await log_event(
             db=db,
             event_type="otp_verify_fail",
             phone=payload.phone,
@@ -55,7 +55,7 @@ async def verify_otp(payload: OTPVerifyRequest, request: Request, db: Session =
         raise HTTPException(status_code=400, detail="Invalid or expired OTP code.")
 
     # Log success
-    log_event(
+    await log_event(
         db=db,
         event_type="otp_verify_success",
         phone=payload.phone,
@@ -1,15 +1,20 @@
 """PAN Verification router.
 
 Endpoints:
-  POST /api/pan/verify  – Verify a PAN card number via Setu
+  POST /api/pan/verify       – Verify a PAN card number via Setu
+  POST /api/pan/verify/bulk  – Verify many PANs, streamed back as NDJSON (X-API-Key)
 """
 
+import json
 import logging
 import re
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import List, Optional
+from app.config import get_settings
 from app.services import setu_pan_service
+from app.utils.auth import require_api_key
 
 logger = logging.getLogger(__name__)
 
@@ -20,19 +25,10 @@ PAN_REGEX = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]$")
 
 # ── Schemas ──────────────────────────────────────────────────────────
 
-class PANVerifyRequest(BaseModel):
-    pan: str
+class PANConsent(BaseModel):
     consent: str = "Y"
     reason: str = "Debt health check for ExitDebt user"
 
-    @field_validator("pan")
-    @classmethod
-    def validate_pan_format(cls, v: str) -> str:
-        v = v.upper().strip()
-        if not PAN_REGEX.match(v):
-            raise ValueError("Invalid PAN format. Expected: ABCDE1234F")
-        return v
-
     @field_validator("consent")
     @classmethod
     def validate_consent(cls, v: str) -> str:
@@ -48,6 +44,33 @@ class PANVerifyRequest(BaseModel):
         return v.strip()
 
 
+class PANVerifyRequest(PANConsent):
+    pan: str
+
+    @field_validator("pan")
+    @classmethod
+    def validate_pan_format(cls, v: str) -> str:
+        v = v.upper().strip()
+        if not PAN_REGEX.match(v):
+            raise ValueError("Invalid PAN format. Expected: ABCDE1234F")
+        return v
+
+
+class PANBulkVerifyRequest(PANConsent):
+    # Malformed entries are reported per line rather than rejecting the batch
+    pans: List[str]
+
+    @field_validator("pans")
+    @classmethod
+    def validate_batch_size(cls, v: List[str]) -> List[str]:
+        limit = get_settings().PAN_BULK_MAX_ITEMS
+        if not v:
+            raise ValueError("At least one PAN is required")
+        if len(v) > limit:
+            raise ValueError(f"At most {limit} PANs per request")
+        return v
+
+
 class PANVerifyData(BaseModel):
     full_name: str = ""
     first_name: Optional[str] = None
@@ -105,3 +128,20 @@ async def verify_pan(req: PANVerifyRequest):
     except Exception as e:
         logger.error(f"PAN verification failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/verify/bulk", dependencies=[Depends(require_api_key)])
+async def verify_pan_bulk(req: PANBulkVerifyRequest):
+    """Verify a batch of PANs for partner onboarding.
+
+    Streams one NDJSON line per input PAN as results arrive (not in input
+    order): ``{"index", "pan" (masked), "verification", "message", "data"?,
+    "error"?}``. Repeated PANs are verified once.
+    """
+    logger.info(f"Bulk PAN verification: {len(req.pans)} PANs")
+
+    async def lines():
+        async for result in setu_pan_service.verify_pans(req.pans, req.consent, req.reason):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -6,9 +6,10 @@ Handles Shield service requests for harassment protection and creditor communica
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.service_request import ServiceRequest
 from app.models.subscription import Subscription
@@ -29,7 +30,7 @@ VALID_TYPES = {"harassment", "creditor_comms"}
 async def create_service_request(
     payload: ServiceRequestCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new service request (Shield users only).
 
@@ -43,19 +44,19 @@ async def create_service_request(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == uid).first()
+    user = await db.get(User, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
     # Validate Shield subscription
-    active_sub = (
-        db.query(Subscription)
-        .filter(
+    active_sub = await db.scalar(
+        select(Subscription)
+        .where(
             Subscription.user_id == uid,
             Subscription.tier == "shield",
             Subscription.status == "active",
         )
-        .first()
+        .limit(1)
     )
     if not active_sub:
         raise HTTPException(
@@ -75,8 +76,8 @@ async def create_service_request(
         details=payload.details,
     )
     db.add(sr)
-    db.commit()
-    db.refresh(sr)
+    await db.commit()
+    await db.refresh(sr)
 
     # Push to CRM
     crm_service = get_crm_service()
@@ -92,7 +93,7 @@ async def create_service_request(
 
     # Audit
     client_ip = request.client.host if request.client else None
-    log_event(
+    await log_event(
         db=db,
         event_type="service_request_created",
         user_id=uid,
@@ -116,7 +117,7 @@ async def create_service_request(
 @router.get("/{user_id}", response_model=ServiceRequestListResponse)
 async def list_service_requests(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all service requests for a user."""
     try:
@@ -125,11 +126,12 @@ async def list_service_requests(
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
     requests = (
-        db.query(ServiceRequest)
-        .filter(ServiceRequest.user_id == uid)
-        .order_by(ServiceRequest.created_at.desc())
-        .all()
-    )
+        await db.scalars(
+            select(ServiceRequest)
+            .where(ServiceRequest.user_id == uid)
+            .order_by(ServiceRequest.created_at.desc())
+        )
+    ).all()
 
     return ServiceRequestListResponse(
         requests=[
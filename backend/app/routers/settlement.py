@@ -7,9 +7,9 @@ Phase 1: CRM-backed, no automated negotiation.
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.settlement import (
     SettlementIntakeRequest,
@@ -30,7 +30,7 @@ router = APIRouter(prefix="/api/settlement", tags=["Settlement"])
 async def settlement_intake(
     payload: SettlementIntakeRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Start a settlement case.
 
@@ -46,13 +46,13 @@ async def settlement_intake(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == uid).first()
+    user = await db.get(User, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
     try:
-        case = create_settlement_case(
-            db=db,
+        case = await db.run_sync(
+            create_settlement_case,
             user_id=uid,
             total_debt=payload.total_debt,
             target_amount=payload.target_amount,
@@ -75,7 +75,7 @@ async def settlement_intake(
 
     # Audit
     client_ip = request.client.host if request.client else None
-    log_event(
+    await log_event(
         db=db,
         event_type="settlement_intake",
         user_id=uid,
@@ -107,7 +107,7 @@ async def settlement_intake(
 @router.get("/{user_id}", response_model=SettlementCaseResponse)
 async def get_settlement(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get the latest settlement case for a user."""
     try:
@@ -115,7 +115,7 @@ async def get_settlement(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    case = get_user_settlement(db, uid)
+    case = await db.run_sync(get_user_settlement, uid)
     if not case:
         raise HTTPException(status_code=404, detail="No settlement case found for this user.")
 
@@ -2,17 +2,22 @@
 
 Endpoints:
   POST /aa/consent       – Create consent request, get redirect URL
-  GET  /aa/consent/{id}  – Check consent status
+  GET  /aa/consent/{id}  – Check consent status (stored; kept current by the webhook)
   POST /aa/consent/{id}/approve – Mock-approve (dev only)
-  GET  /aa/data/{id}     – Fetch financial data after consent approval
-  POST /aa/webhook       – Receive Setu notifications
+  GET  /aa/data/{id}     – Financial data after consent approval (202 while it is fetched)
+  POST /aa/webhook       – Receive Setu notifications (X-Webhook-Secret)
 """
 
 import logging
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.services import setu_aa_service
+from app.database import get_async_db
+from app.models.aa_consent import FI_READY
+from app.services import aa_data_service, setu_aa_service
+from app.utils.auth import require_setu_aa_webhook_secret
 
 logger = logging.getLogger(__name__)
 
@@ -35,14 +40,14 @@ class ConsentResponse(BaseModel):
 # ── Endpoints ────────────────────────────────────────────────────────
 
 @router.post("/consent", response_model=ConsentResponse)
-async def create_consent(req: ConsentCreateRequest):
+async def create_consent(req: ConsentCreateRequest, db: AsyncSession = Depends(get_async_db)):
     """Create an AA consent request. Returns redirect URL for user."""
     try:
-        result = await setu_aa_service.create_consent(req.phone, req.fi_types)
+        consent = await setu_aa_service.create_consent(db, req.phone, req.fi_types)
         return ConsentResponse(
-            id=result.get("id", ""),
-            url=result.get("url", ""),
-            status=result.get("status", "PENDING"),
+            id=consent.setu_consent_id,
+            url=consent.redirect_url or "",
+            status=consent.status,
         )
     except Exception as e:
         logger.error(f"Failed to create AA consent: {e}")
@@ -50,54 +55,62 @@ async def create_consent(req: ConsentCreateRequest):
 
 
 @router.get("/consent/{consent_id}")
-async def get_consent(consent_id: str):
-    """Check consent status."""
-    result = await setu_aa_service.get_consent_status(consent_id)
-    if "error" in result:
-        raise HTTPException(status_code=404, detail=result["error"])
-    return result
+async def get_consent(consent_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Check consent status (a local lookup; Setu is polled only as a fallback)."""
+    consent = await setu_aa_service.get_consent_status(db, consent_id)
+    if consent is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return setu_aa_service.consent_to_dict(consent)
 
 
 @router.post("/consent/{consent_id}/approve")
-async def approve_consent(consent_id: str):
+async def approve_consent(consent_id: str, db: AsyncSession = Depends(get_async_db)):
     """Mock-approve a consent (development only).
     In production, users approve via Setu's consent screens."""
-    result = await setu_aa_service.approve_consent(consent_id)
-    if "error" in result:
-        raise HTTPException(status_code=404, detail=result["error"])
-    return {"message": "Consent approved", "consent": result}
+    consent = await setu_aa_service.approve_consent(db, consent_id)
+    if consent is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return {"message": "Consent approved", "consent": setu_aa_service.consent_to_dict(consent)}
 
 
 @router.get("/data/{consent_id}")
-async def fetch_data(consent_id: str):
-    """Fetch financial data after consent is approved."""
+async def fetch_data(consent_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Financial data for an approved consent.
+
+    Data is fetched in the background: until it is ready this returns 202
+    with the fetch status (``REQUESTED`` / ``FETCHING`` / ``FAILED``, which is
+    retried on the next call, as is a fetch stuck for AA_FI_STALE_SECONDS);
+    poll again. Ready data is served from the consent for as long as the
+    consent stands.
+    """
     # Verify consent is approved
-    consent = await setu_aa_service.get_consent_status(consent_id)
-    if consent.get("status") not in ("APPROVED", "ACTIVE"):
+    consent = await setu_aa_service.get_consent_status(db, consent_id)
+    if consent is None or not consent.is_approved:
         raise HTTPException(
             status_code=400,
-            detail=f"Consent not approved. Current status: {consent.get('status', 'UNKNOWN')}",
+            detail=f"Consent not approved. Current status: {consent.status if consent else 'UNKNOWN'}",
         )
 
+    if consent.fi_status == FI_READY:
+        return {"consent_id": consent_id, "status": "COMPLETED", **consent.fi_result}
+
     try:
-        fi_data = await setu_aa_service.fetch_financial_data(consent_id)
-        debt_accounts = setu_aa_service.parse_fi_to_debt_accounts(fi_data)
-        return {
-            "consent_id": consent_id,
-            "status": fi_data.get("status", "COMPLETED"),
-            "accounts": debt_accounts,
-            "raw_fi_count": len(fi_data.get("fi_data", [])),
-        }
+        await aa_data_service.ensure_fi_data(db, consent)
     except Exception as e:
-        logger.error(f"Failed to fetch AA data: {e}")
+        logger.error(f"Failed to queue AA data fetch: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    return JSONResponse(
+        status_code=202,
+        content={"consent_id": consent_id, "status": consent.fi_status},
+    )
 
 
-@router.post("/webhook")
-async def setu_webhook(request: Request):
+@router.post("/webhook", dependencies=[Depends(require_setu_aa_webhook_secret)])
+async def setu_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Receive Setu AA notifications (consent approved/rejected, data ready).
 
-    In production, verify webhook signature before processing.
+    The sender must present SETU_AA_WEBHOOK_SECRET (see
+    ``require_setu_aa_webhook_secret``).
     """
     body = await request.json()
     event_type = body.get("type", "")
@@ -108,11 +121,11 @@ async def setu_webhook(request: Request):
     if event_type == "CONSENT_STATUS_UPDATE":
         status = body.get("data", {}).get("status", "")
         logger.info(f"Consent {consent_id} status updated to: {status}")
-        # In production: update AAConsent record in DB
+        await setu_aa_service.update_consent_status(db, consent_id, status)
 
     elif event_type == "FI_DATA_READY":
         session_id = body.get("dataSessionId", "")
         logger.info(f"FI data ready for consent {consent_id}, session: {session_id}")
-        # In production: trigger data fetch and update user profile
+        await aa_data_service.on_fi_data_ready(db, consent_id, session_id)
 
     return {"success": True, "message": "Webhook received"}
@@ -6,9 +6,9 @@ Provides plan listing, subscription status checks, and tier upgrades.
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.shield_consent import ShieldConsent
 from app.schemas.subscription import (
@@ -44,7 +44,7 @@ async def list_plans():
 @router.get("/status/{user_id}", response_model=SubscriptionStatusResponse)
 async def get_subscription_status(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get current subscription status for a user."""
     try:
@@ -52,11 +52,11 @@ async def get_subscription_status(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == uid).first()
+    user = await db.get(User, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    sub = get_or_create_subscription(db, uid)
+    sub = await db.run_sync(get_or_create_subscription, uid)
 
     # Compute days remaining based on status
     if sub.status == "trial":
@@ -83,7 +83,7 @@ async def get_subscription_status(
 async def upgrade_tier(
     payload: SubscriptionUpgradeRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Upgrade a user's subscription tier.
 
@@ -95,18 +95,18 @@ async def upgrade_tier(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == uid).first()
+    user = await db.get(User, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
     try:
-        sub = upgrade_subscription(db, uid, payload.tier, payload.billing_period)
+        sub = await db.run_sync(upgrade_subscription, uid, payload.tier, payload.billing_period)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     # Audit
     client_ip = request.client.host if request.client else None
-    log_event(
+    await log_event(
         db=db,
         event_type="subscription_upgrade",
         user_id=uid,
@@ -135,7 +135,7 @@ async def upgrade_tier(
 async def record_shield_consent(
     user_id: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Record explicit Shield consent: 'I authorize ExitDebt to communicate
     with my creditors on my behalf.'
@@ -147,7 +147,7 @@ async def record_shield_consent(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == uid).first()
+    user = await db.get(User, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
@@ -159,15 +159,15 @@ async def record_shield_consent(
         ip_address=client_ip,
     )
     db.add(consent)
-    db.commit()
-    db.refresh(consent)
+    await db.commit()
+    await db.refresh(consent)
 
     # Also update the subscription record
-    sub = get_or_create_subscription(db, uid)
+    sub = await db.run_sync(get_or_create_subscription, uid)
     sub.shield_consent_timestamp = consent.timestamp
-    db.commit()
+    await db.commit()
 
-    log_event(
+    await log_event(
         db=db,
         event_type="shield_consent",
         user_id=uid,
@@ -3,11 +3,13 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Request, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.user import UserDeleteRequest, UserResponse
 from app.models.user import User
+from app.services.user_summary_service import invalidate_user
 from app.utils.audit import log_event
 
 router = APIRouter(prefix="/api/user", tags=["User"])
@@ -17,7 +19,7 @@ router = APIRouter(prefix="/api/user", tags=["User"])
 async def request_deletion(
     payload: UserDeleteRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Request user data deletion (GDPR/DPDPA compliance)."""
     client_ip = request.client.host if request.client else None
@@ -27,12 +29,12 @@ async def request_deletion(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    user = db.query(User).filter(User.id == user_uuid, User.phone == payload.phone).first()
+    user = await db.scalar(select(User).where(User.id == user_uuid, User.phone == payload.phone))
     if not user:
         raise HTTPException(status_code=404, detail="User not found or phone mismatch.")
 
     # Audit log before deletion
-    log_event(
+    await log_event(
         db=db,
         event_type="user_delete_request",
         user_id=user.id,
@@ -44,7 +46,8 @@ async def request_deletion(
     user.pan_hash = "DELETED"
     user.name = "DELETED"
     user.phone = "DELETED"
-    db.commit()
+    await db.commit()
+    invalidate_user(user.id)
 
     return UserResponse(
         success=True,
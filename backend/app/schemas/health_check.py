@@ -1,7 +1,7 @@
 """Health check request/response schemas."""
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import re
 
 
@@ -10,6 +10,9 @@ class HealthCheckRequest(BaseModel):
     phone: str = Field(..., description="Verified phone number")
     name: str = Field(..., min_length=2, max_length=255, description="Full name")
     consent: bool = Field(..., description="User consent for credit check")
+    force_refresh: bool = Field(
+        False, description="Pull a new CIBIL report even if an unexpired one is on file"
+    )
 
     def validate_pan(self) -> bool:
         return bool(re.match(r"^[A-Z]{5}[0-9]{4}[A-Z]$", self.pan.upper()))
@@ -45,3 +48,13 @@ class HealthCheckResponse(BaseModel):
     debt_accounts: List[DebtAccountResponse]
     flagged_accounts: List[FlaggedAccount]
     whatsapp_share_link: Optional[str] = None
+
+
+class HealthCheckJob(BaseModel):
+    """Status of a health check running in job mode."""
+    job_id: str
+    status: str  # queued | running | succeeded | failed
+    result: Optional[HealthCheckResponse] = None  # when succeeded
+    error: Optional[Dict[str, Any]] = None  # {"status_code", "detail"} when failed
+    created_at: str
+    updated_at: str
@@ -89,14 +89,28 @@ class StatsOverview(BaseModel):
     callbacks_cancelled: int
 
 
+# ─── Audit Log ─────────────────────────────────────────────────────────────
+
+class AuditLogEntry(BaseModel):
+    id: str
+    event_type: str
+    user_id: Optional[str] = None
+    phone: Optional[str] = None
+    ip_address: Optional[str] = None
+    metadata: Optional[dict] = None
+    created_at: datetime
+
+
 # ─── Paginated ─────────────────────────────────────────────────────────────
 
 class PaginatedResponse(BaseModel):
     items: List[dict]
-    total: int
-    page: int
+    total: Optional[int] = None  # None in cursor mode unless an estimate is available
+    page: Optional[int] = None  # page mode only
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # cursor mode; None on the last page
+    total_estimated: bool = False
 
 
 # Rebuild forward refs
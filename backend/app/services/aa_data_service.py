@@ -0,0 +1,259 @@
+"""Background FI data pipeline for Account Aggregator consents.
+
+Fetching a data session takes seconds, so it never runs inside a user's
+request:
+
+1. ``GET /aa/data/{id}`` on an approved consent without data calls
+   ``request_fi_data``, which queues a job that creates the data session.
+2. Setu's ``FI_DATA_READY`` webhook calls ``on_fi_data_ready``, which
+   queues a job to fetch that session. (In mock mode the data is ready as
+   soon as the session exists, and the first job fetches it directly.)
+3. The job parses the FI data as it streams in, replaces the consent's
+   ``DebtAccount`` rows (``source="aa"``), records a new HealthScore for the
+   consent's user and caches accounts and score on the consent
+   (``fi_result``) until the consent ends, when both the cache and the
+   AA accounts are dropped.
+
+Jobs run on the shared job queue (app/utils/job_queue.py); the consent's
+``fi_status`` tracks progress for clients polling ``/aa/data``. A fetch
+that makes no progress for AA_FI_STALE_SECONDS (FI_DATA_READY never
+arrived, or the job was lost in a restart) is queued again by the next
+poll: see ``ensure_fi_data``.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.aa_consent import FI_FAILED, FI_FETCHING, FI_READY, FI_REQUESTED, AAConsent
+from app.models.debt_account import DebtAccount
+from app.models.health_score import HealthScore
+from app.models.user import User
+from app.services import setu_aa_service
+from app.services.score_cache import score_cached
+from app.utils.job_queue import Job, JobFailed, JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+AA_FI_FETCH_JOB = "aa_fi_fetch"
+AA_SOURCE = "aa"
+
+
+# ─── Triggers ─────────────────────────────────────────────────────────────────
+
+async def request_fi_data(db: AsyncSession, consent: AAConsent) -> Job:
+    """Queue a data session for an approved consent."""
+    consent.fi_status = FI_REQUESTED
+    consent.fi_error = None
+    consent.fi_requested_at = datetime.utcnow()
+    await db.commit()
+    return await get_job_queue().submit(
+        AA_FI_FETCH_JOB, {"consent_id": consent.setu_consent_id, "session_id": None},
+    )
+
+
+async def _queue_session_fetch(db: AsyncSession, consent: AAConsent, session_id: str) -> Job:
+    consent.fi_status = FI_FETCHING
+    consent.fi_session_id = session_id
+    consent.fi_requested_at = datetime.utcnow()
+    await db.commit()
+    return await get_job_queue().submit(
+        AA_FI_FETCH_JOB, {"consent_id": consent.setu_consent_id, "session_id": session_id},
+    )
+
+
+async def on_fi_data_ready(db: AsyncSession, consent_id: str, session_id: str) -> Optional[Job]:
+    """Queue the fetch of a ready data session (FI_DATA_READY webhook)."""
+    consent = await setu_aa_service.find_consent(db, consent_id)
+    if consent is None or not consent.is_approved:
+        logger.warning(f"FI data ready for unknown or unapproved consent {consent_id}")
+        return None
+    if not session_id or session_id != consent.fi_session_id:
+        # Only the session we asked Setu for can carry this consent's data
+        logger.warning(f"FI data ready for consent {consent_id} names an unknown session {session_id}")
+        return None
+    return await _queue_session_fetch(db, consent, session_id)
+
+
+def is_stale(consent: AAConsent, now: Optional[datetime] = None) -> bool:
+    """Whether an in-progress fetch has made no progress for AA_FI_STALE_SECONDS."""
+    if consent.fi_status not in (FI_REQUESTED, FI_FETCHING):
+        return False
+    if consent.fi_requested_at is None:
+        return True
+    cutoff = timedelta(seconds=get_settings().AA_FI_STALE_SECONDS)
+    return (now or datetime.utcnow()) - consent.fi_requested_at > cutoff
+
+
+async def ensure_fi_data(db: AsyncSession, consent: AAConsent) -> Optional[Job]:
+    """Queue whatever an approved consent's FI data needs next; None if it is on its way.
+
+    Nothing fetched yet, or the last fetch failed: request a data session.
+    A stale fetch is queued again: a ready session (FETCHING) is re-fetched,
+    a session whose FI_DATA_READY never came (REQUESTED) is replaced.
+    """
+    if consent.fi_status in (None, FI_FAILED):
+        return await request_fi_data(db, consent)
+    if not is_stale(consent):
+        return None
+    logger.warning(f"FI fetch for consent {consent.setu_consent_id} stale in {consent.fi_status}; re-queuing")
+    if consent.fi_status == FI_FETCHING and consent.fi_session_id:
+        return await _queue_session_fetch(db, consent, consent.fi_session_id)
+    return await request_fi_data(db, consent)
+
+
+# ─── Pipeline ─────────────────────────────────────────────────────────────────
+
+def _scoring_input(account: Dict[str, Any]) -> Dict[str, Any]:
+    """Parsed AA account → health score input (the DebtAccount field names)."""
+    return {
+        "lender_name": account["lender"],
+        "account_type": account["type"],
+        "outstanding": account["outstanding"],
+        "interest_rate": account["apr"],
+        "emi_amount": account["emi"],
+        "status": "active",  # FI data only lists open accounts
+    }
+
+
+async def _lock_consent(db: AsyncSession, consent_id: str) -> Optional[AAConsent]:
+    """Re-read the consent and hold its row until the next commit."""
+    return await db.scalar(
+        select(AAConsent)
+        .where(AAConsent.setu_consent_id == consent_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+
+async def run_fi_fetch(db: AsyncSession, consent_id: str, session_id: Optional[str]) -> Dict[str, Any]:
+    """Create or fetch the consent's data session and store the result.
+
+    The consent is checked again, under a row lock, once Setu has answered:
+    a consent revoked during the call gets nothing stored.
+
+    Raises JobFailed (404 unknown consent, 409 not approved, 502 Setu failure).
+    """
+    consent = await setu_aa_service.find_consent(db, consent_id)
+    if consent is None:
+        raise JobFailed("Consent not found.", status_code=404)
+    if not consent.is_approved:
+        raise JobFailed(f"Consent not approved. Current status: {consent.status}", status_code=409)
+    await db.commit()  # release the connection during Setu calls
+
+    ready = True
+    try:
+        if session_id is None:
+            session = await setu_aa_service.create_data_session(consent_id)
+            session_id, ready = session["id"], session["ready"]
+        if ready:
+            accounts, fip_count = await setu_aa_service.fetch_session_accounts(consent_id, session_id)
+    except Exception as e:
+        logger.error(f"FI data fetch failed for consent {consent_id}: {e}")
+        consent = await _lock_consent(db, consent_id)
+        if consent is not None and consent.is_approved:
+            consent.fi_status = FI_FAILED
+            consent.fi_error = str(e)
+        await db.commit()
+        raise JobFailed("Failed to fetch financial data. Please try again later.", status_code=502)
+
+    consent = await _lock_consent(db, consent_id)
+    if consent is None or not consent.is_approved:
+        await db.commit()
+        logger.warning(f"Consent {consent_id} ended during its FI fetch; discarding the data")
+        raise JobFailed("Consent is no longer approved.", status_code=409)
+
+    consent.fi_session_id = session_id
+    if not ready:
+        consent.fi_status = FI_REQUESTED
+        consent.fi_requested_at = datetime.utcnow()  # now waiting on FI_DATA_READY
+        await db.commit()
+        return {"consent_id": consent_id, "fi_status": FI_REQUESTED}
+
+    await _store_accounts(db, consent, accounts, raw_fi_count=fip_count)
+    return {"consent_id": consent_id, "fi_status": FI_READY, "accounts": len(accounts)}
+
+
+async def _store_accounts(
+    db: AsyncSession,
+    consent: AAConsent,
+    accounts: List[Dict[str, Any]],
+    raw_fi_count: int,
+) -> None:
+    """Replace the consent's AA accounts, score them and cache the result, in one transaction."""
+    if consent.user_id is None and consent.phone:
+        consent.user_id = await db.scalar(
+            select(User.id).where(User.phone == consent.phone).order_by(User.created_at.desc()).limit(1)
+        )
+
+    await db.execute(
+        delete(DebtAccount).where(DebtAccount.consent_id == consent.id, DebtAccount.source == AA_SOURCE)
+    )
+    db.add_all([
+        DebtAccount(
+            consent_id=consent.id,
+            source=AA_SOURCE,
+            lender_name=account["lender"],
+            account_type=account["type"],
+            outstanding=account["outstanding"],
+            interest_rate=account["apr"],
+            emi_amount=account["emi"],
+            due_date=account.get("dueDate"),
+        )
+        for account in accounts
+    ])
+
+    result = await score_cached([_scoring_input(a) for a in accounts])
+    if consent.user_id is not None:
+        db.add(HealthScore(
+            user_id=consent.user_id,
+            consent_id=consent.id,
+            score=result.score,
+            dti_ratio=result.dti_ratio,
+            avg_rate=result.avg_rate,
+            savings_est=result.savings_est,
+            total_outstanding=result.total_outstanding,
+            total_emi=result.total_emi,
+        ))
+
+    consent.fi_result = {
+        "accounts": accounts,
+        "raw_fi_count": raw_fi_count,
+        "health_score": {
+            "score": result.score,
+            "category": result.category,
+            "total_outstanding": result.total_outstanding,
+            "total_emi": result.total_emi,
+            "avg_rate": result.avg_rate,
+            "dti_ratio": result.dti_ratio,
+            "savings_est": result.savings_est,
+        },
+    }
+    consent.fi_status = FI_READY
+    consent.fi_error = None
+    consent.fi_fetched_at = datetime.utcnow()
+    await db.commit()
+
+
+# ─── Job registration ─────────────────────────────────────────────────────────
+
+def register_jobs(queue: JobQueue, session_factory: Optional[Callable[[], AsyncSession]] = None) -> None:
+    """Register the FI fetch job handler on ``queue``.
+
+    ``session_factory`` defaults to the app's AsyncSessionLocal.
+    """
+
+    async def run_fi_fetch_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+        factory = session_factory
+        if factory is None:
+            from app.database import AsyncSessionLocal
+            factory = AsyncSessionLocal
+
+        async with factory() as db:
+            return await run_fi_fetch(db, payload["consent_id"], payload.get("session_id"))
+
+    queue.register(AA_FI_FETCH_JOB, run_fi_fetch_job)
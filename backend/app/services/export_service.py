@@ -0,0 +1,151 @@
+"""Streaming bulk exports of admin data as CSV or NDJSON.
+
+Each export runs on its own connection (the HTTP response outlives the
+request's session) inside a REPEATABLE READ transaction, so every row comes
+from one consistent snapshot even while the export takes minutes. Rows are
+read through a server-side cursor in chunks of EXPORT_CHUNK_ROWS and
+encoded chunk by chunk, optionally gzip-compressed on the fly, so worker
+memory stays flat regardless of table size.
+"""
+
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, List, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Select
+
+from app.config import get_settings
+from app.models.callback import Callback
+from app.models.health_score import HealthScore
+from app.models.settlement_case import SettlementCase
+from app.models.user import User
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+MEDIA_TYPES = {CSV: "text/csv", NDJSON: "application/x-ndjson"}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    query: Select
+
+    @property
+    def columns(self) -> List[str]:
+        return [c.key for c in self.query.selected_columns]
+
+
+# pan_hash and consent_ip are deliberately not exported.
+EXPORTS = {
+    "users": ExportSpec(
+        select(User.id, User.name, User.phone, User.role, User.consent_ts, User.created_at)
+        .where(User.pan_hash != "DELETED")
+        .order_by(User.created_at, User.id)
+    ),
+    "health-checks": ExportSpec(
+        select(
+            HealthScore.id, HealthScore.user_id, HealthScore.score, HealthScore.dti_ratio,
+            HealthScore.avg_rate, HealthScore.savings_est, HealthScore.total_outstanding,
+            HealthScore.total_emi, HealthScore.calculated_at,
+        ).order_by(HealthScore.calculated_at, HealthScore.id)
+    ),
+    "callbacks": ExportSpec(
+        select(
+            Callback.id, Callback.user_id, Callback.preferred_time, Callback.reason, Callback.status,
+            Callback.assigned_to, Callback.called_at, Callback.outcome, Callback.created_at,
+        ).order_by(Callback.created_at, Callback.id)
+    ),
+    "settlement-cases": ExportSpec(
+        select(
+            SettlementCase.id, SettlementCase.user_id, SettlementCase.total_debt,
+            SettlementCase.target_amount, SettlementCase.status, SettlementCase.settled_amount,
+            SettlementCase.fee_amount, SettlementCase.assigned_to, SettlementCase.started_at,
+            SettlementCase.settled_at,
+        ).order_by(SettlementCase.started_at, SettlementCase.id)
+    ),
+}
+
+
+# ─── Encoding ────────────────────────────────────────────────────────────────
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def encode_csv(columns: Sequence[str], rows: Iterable[Sequence], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_cell(v) for v in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(columns: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    lines = (
+        json.dumps({c: _plain(v) for c, v in zip(columns, row)}, separators=(",", ":"))
+        for row in rows
+    )
+    return "".join(line + "\n" for line in lines).encode("utf-8")
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member as it is produced."""
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# ─── Streaming ───────────────────────────────────────────────────────────────
+
+async def stream_export(
+    engine: AsyncEngine,
+    dataset: str,
+    fmt: str = CSV,
+    chunk_rows: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export of ``dataset`` chunk by chunk."""
+    spec = EXPORTS[dataset]
+    columns = spec.columns
+    chunk_rows = chunk_rows or get_settings().EXPORT_CHUNK_ROWS
+
+    async with engine.connect() as conn:
+        # SQLite transactions are already serializable snapshots
+        if conn.dialect.name == "postgresql":
+            conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+        async with conn.begin():
+            result = await conn.stream(spec.query.execution_options(yield_per=chunk_rows))
+            first = True
+            async for rows in result.partitions(chunk_rows):
+                if fmt == CSV:
+                    yield encode_csv(columns, rows, header=first)
+                else:
+                    yield encode_ndjson(columns, rows)
+                first = False
+            if first and fmt == CSV:
+                yield encode_csv(columns, [], header=True)
@@ -0,0 +1,356 @@
+"""Health check pipeline: find user → reuse or pull report → score → persist.
+
+Used directly by ``POST /api/health-check`` and, in job mode, by a
+background worker (``run_health_check_job``) so the HTTP request returns
+before the bureau call.
+
+Either way the database connection is released while the CIBIL pull is
+in flight (up to ~8 s): the lookup transaction ends before the pull and
+the writes happen in a fresh transaction afterwards.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import get_settings
+from app.integrations.mock_providers import MockCIBILService, MockWhatsAppService
+from app.models.cibil_report import CibilReport
+from app.models.debt_account import DebtAccount
+from app.models.health_score import HealthScore as HealthScoreModel
+from app.models.user import User
+from app.schemas.health_check import (
+    DebtAccountResponse,
+    FlaggedAccount,
+    HealthCheckRequest,
+    HealthCheckResponse,
+)
+from app.services.health_score import HealthScoreResult
+from app.services.score_cache import account_dicts, score_cached
+from app.utils.audit import log_event
+from app.utils.job_queue import JobFailed, JobQueue
+from app.utils.rate_limiter import rate_limiter
+from app.utils.security import (
+    decrypt_data,
+    decrypt_data_async,
+    encrypt_data,
+    encrypt_data_async,
+    hash_pan,
+)
+from app.utils.single_flight import RedisFlightBackend, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_JOB = "health_check"
+
+# Service instances (use DI pattern for production)
+_cibil_service = MockCIBILService()
+_whatsapp_service = MockWhatsAppService()
+
+_report_pulls: Optional[SingleFlight] = None
+
+
+def get_report_pulls() -> SingleFlight:
+    """Coalesces concurrent pulls per PAN hash (CIBIL_PULL_COALESCE_BACKEND)."""
+    global _report_pulls
+    if _report_pulls is None:
+        settings = get_settings()
+        backend = None
+        if settings.CIBIL_PULL_COALESCE_BACKEND == "redis":
+            from app.utils.redis_client import get_redis
+            backend = RedisFlightBackend(get_redis())
+        _report_pulls = SingleFlight(
+            backend=backend,
+            wait_timeout=settings.CIBIL_PULL_COALESCE_WAIT_SECONDS,
+            # Shared reports hold bureau data: encrypted while in Redis
+            encode=lambda data: encrypt_data(json.dumps(data)),
+            decode=lambda value: json.loads(decrypt_data(value)),
+        )
+    return _report_pulls
+
+
+def set_report_pulls(flight: Optional[SingleFlight]) -> None:
+    """Override the pull coalescer (useful for testing)."""
+    global _report_pulls
+    _report_pulls = flight
+
+
+class HealthCheckError(Exception):
+    """A health check that cannot complete; ``status_code`` is the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# ─── Pipeline ─────────────────────────────────────────────────────────────────
+
+async def run_health_check(
+    db: AsyncSession,
+    payload: HealthCheckRequest,
+    client_ip: str,
+) -> HealthCheckResponse:
+    """
+    Run a full health check:
+    1. Find user; reuse their latest unexpired report unless force_refresh
+    2. Rate limit check
+    3. Pull CIBIL report (no DB connection held)
+    4. Compute health score
+    5. Persist user, report, accounts, score and audit event in one transaction
+
+    Raises HealthCheckError (429 rate limited, 502 bureau failure).
+    """
+    # Hash PAN — never store raw
+    pan_hashed = hash_pan(payload.pan)
+
+    # Find existing user (created below, in the same transaction as the report)
+    user = await db.scalar(
+        select(User).where(User.pan_hash == pan_hashed, User.phone == payload.phone)
+    )
+
+    # A report is valid until expires_at: re-score it instead of paying for a new pull.
+    # This does not count against the pull rate limit.
+    if user and not payload.force_refresh:
+        report = await _latest_unexpired_report(db, user.id)
+        if report is not None:
+            return await _rescore_existing_report(db, user, report, payload.phone, client_ip)
+
+    # Rate limiting — consumes a slot atomically; refunded if the pull fails
+    if not await rate_limiter.check_and_record(payload.phone):
+        await log_event(
+            db=db,
+            event_type="cibil_pull_rate_limited",
+            phone=payload.phone,
+            ip_address=client_ip,
+        )
+        remaining = await rate_limiter.remaining(payload.phone)
+        raise HealthCheckError(
+            429,
+            f"Rate limit exceeded. Maximum 3 credit checks per 24 hours. Remaining: {remaining}",
+        )
+
+    # End the lookup transaction so no pooled connection waits on the bureau
+    user_id = user.id if user else None
+    await db.rollback()
+
+    # Pull CIBIL report before writing anything, so a failed pull leaves no rows behind.
+    # Concurrent requests for the same PAN (double taps, retries) share one pull.
+    try:
+        cibil_data, shared = await get_report_pulls().do(
+            pan_hashed,
+            lambda: _cibil_service.pull_report(
+                pan=payload.pan,
+                name=payload.name,
+                phone=payload.phone,
+            ),
+        )
+    except Exception as e:
+        await rate_limiter.refund(payload.phone)
+        await log_event(
+            db=db,
+            event_type="cibil_pull",
+            user_id=user_id,
+            phone=payload.phone,
+            ip_address=client_ip,
+            metadata={"status": "error", "error": str(e)},
+        )
+        raise HealthCheckError(502, "Failed to fetch credit report. Please try again later.")
+
+    if shared:
+        # Another request paid for this pull; give this caller's slot back
+        await rate_limiter.refund(payload.phone)
+
+    # ── Single unit of work: user, report, accounts, score and audit event ──
+    user = await db.get(User, user_id) if user_id else None
+    if not user:
+        user = User(
+            pan_hash=pan_hashed,
+            phone=payload.phone,
+            name=payload.name,
+            consent_ts=datetime.utcnow(),
+            consent_ip=client_ip,
+        )
+        db.add(user)
+
+    # Encrypt raw CIBIL data (large reports on the crypto thread pool); accounts
+    # are attached to the report and inserted together as one batched INSERT at flush time
+    accounts_data = cibil_data.get("accounts", [])
+    report = CibilReport(
+        user=user,
+        raw_encrypted=await encrypt_data_async(cibil_data.get("raw_data", "{}")),
+        credit_score=cibil_data.get("credit_score"),
+        debt_accounts=[
+            DebtAccount(
+                lender_name=acc["lender_name"],
+                account_type=acc["account_type"],
+                outstanding=acc["outstanding"],
+                interest_rate=acc.get("interest_rate"),
+                emi_amount=acc.get("emi_amount"),
+                status=acc.get("status", "active"),
+                utilization=acc.get("utilization"),
+                payment_history=acc.get("payment_history"),
+            )
+            for acc in accounts_data
+        ],
+    )
+
+    # Calculate health score (reused when this exact account list was scored before)
+    score_result = await score_cached(accounts_data)
+
+    health_score = _new_health_score(user, report, score_result)
+    db.add_all([report, health_score])
+    await db.flush()  # Assigns IDs for the response and the audit event
+
+    await log_event(
+        db=db,
+        event_type="cibil_pull",
+        user_id=user.id,
+        phone=payload.phone,
+        ip_address=client_ip,
+        metadata={"status": "success", "score": score_result.score, "coalesced": shared},
+        commit=False,
+    )
+
+    # Build the response from in-memory objects before commit expires them
+    response = build_response(health_score, report, score_result)
+    await db.commit()
+    return response
+
+
+async def _latest_unexpired_report(db: AsyncSession, user_id: UUID) -> Optional[CibilReport]:
+    return await db.scalar(
+        select(CibilReport)
+        .options(selectinload(CibilReport.debt_accounts))
+        .where(CibilReport.user_id == user_id, CibilReport.expires_at > datetime.utcnow())
+        .order_by(CibilReport.pulled_at.desc())
+        .limit(1)
+    )
+
+
+async def _report_accounts(report: CibilReport) -> List[Dict[str, Any]]:
+    """Scoring input for a stored report.
+
+    The persisted DebtAccount rows carry every scored field, so the
+    encrypted raw report is only decrypted for reports stored without rows.
+    """
+    if report.debt_accounts or not report.raw_encrypted:
+        return account_dicts(report.debt_accounts)
+    raw = json.loads(await decrypt_data_async(report.raw_encrypted))
+    return raw.get("accounts", [])
+
+
+async def _rescore_existing_report(
+    db: AsyncSession,
+    user: User,
+    report: CibilReport,
+    phone: str,
+    client_ip: str,
+) -> HealthCheckResponse:
+    """Score an unexpired report already on file and record it as a new health check."""
+    score_result = await score_cached(await _report_accounts(report))
+
+    health_score = _new_health_score(user, report, score_result)
+    db.add(health_score)
+    await db.flush()
+
+    await log_event(
+        db=db,
+        event_type="cibil_report_reused",
+        user_id=user.id,
+        phone=phone,
+        ip_address=client_ip,
+        metadata={
+            "report_id": str(report.id),
+            "pulled_at": report.pulled_at.isoformat(),
+            "score": score_result.score,
+        },
+        commit=False,
+    )
+
+    response = build_response(health_score, report, score_result)
+    await db.commit()
+    return response
+
+
+def _new_health_score(user: User, report: CibilReport, score_result: HealthScoreResult) -> HealthScoreModel:
+    return HealthScoreModel(
+        user=user,
+        report=report,
+        score=score_result.score,
+        dti_ratio=score_result.dti_ratio,
+        avg_rate=score_result.avg_rate,
+        savings_est=score_result.savings_est,
+        total_outstanding=score_result.total_outstanding,
+        total_emi=score_result.total_emi,
+    )
+
+
+def build_response(
+    health_score: HealthScoreModel,
+    report: CibilReport,
+    score_result: HealthScoreResult,
+) -> HealthCheckResponse:
+    # WhatsApp share link
+    share_text = (
+        f"I checked my Debt Health Score on ExitDebt — scored {score_result.score}/100 "
+        f"({score_result.category}). Check yours: https://exitdebt.in/check"
+    )
+    share_link = _whatsapp_service.generate_share_link(share_text)
+
+    return HealthCheckResponse(
+        id=str(health_score.id),
+        score=score_result.score,
+        category=score_result.category,
+        credit_score=report.credit_score,
+        total_outstanding=score_result.total_outstanding,
+        total_emi=score_result.total_emi,
+        avg_rate=score_result.avg_rate,
+        dti_ratio=score_result.dti_ratio,
+        savings_est=score_result.savings_est,
+        debt_accounts=[
+            DebtAccountResponse(
+                id=str(da.id),
+                lender_name=da.lender_name,
+                account_type=da.account_type,
+                outstanding=da.outstanding,
+                interest_rate=da.interest_rate,
+                emi_amount=da.emi_amount,
+                status=da.status,
+            )
+            for da in report.debt_accounts
+        ],
+        flagged_accounts=[FlaggedAccount(**f) for f in score_result.flagged_accounts],
+        whatsapp_share_link=share_link,
+    )
+
+
+# ─── Job mode ─────────────────────────────────────────────────────────────────
+
+def register_jobs(queue: JobQueue, session_factory: Optional[Callable[[], AsyncSession]] = None) -> None:
+    """Register the health check job handler on ``queue``.
+
+    ``session_factory`` defaults to the app's AsyncSessionLocal.
+    """
+
+    async def run_health_check_job(job_payload: Dict[str, Any]) -> Dict[str, Any]:
+        factory = session_factory
+        if factory is None:
+            from app.database import AsyncSessionLocal
+            factory = AsyncSessionLocal
+
+        payload = HealthCheckRequest(**job_payload["request"])
+        async with factory() as db:
+            try:
+                response = await run_health_check(db, payload, job_payload["client_ip"])
+            except HealthCheckError as e:
+                raise JobFailed(e.detail, status_code=e.status_code)
+        return response.model_dump(mode="json")
+
+    queue.register(HEALTH_CHECK_JOB, run_health_check_job)
@@ -15,9 +15,15 @@ Categories:
     0–39:   Critical
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from dataclasses import dataclass
 
+import numpy as np
+
+# Bump whenever scoring rules, weights or flag reasons change: cached
+# results (app/services/score_cache.py) are keyed by it.
+SCORING_MODEL_VERSION = "1"
+
 
 @dataclass
 class HealthScoreResult:
@@ -253,3 +259,253 @@ def calculate_health_score(
         savings_est=savings_est,
         flagged_accounts=flagged,
     )
+
+
+# ─── Batch Calculator ───────────────────────────────────────────────────────
+
+_ACTIVE_STATUSES = ("active", "overdue")
+
+
+@dataclass
+class AccountBatch:
+    """
+    Columnar (NumPy-backed) view of many users' debt accounts.
+
+    Row ``i`` describes one account owned by user ``owner[i]`` where
+    ``0 <= owner[i] < n_users``. Users that own no rows are scored as
+    having no accounts. Missing or ``None`` numeric values take the same
+    defaults the scalar calculator uses for absent keys.
+    """
+    n_users: int
+    owner: np.ndarray            # int64, user index per account
+    outstanding: np.ndarray      # float64
+    interest_rate: np.ndarray    # float64
+    emi_amount: np.ndarray       # float64
+    utilization: np.ndarray      # float64, 0–1
+    payment_history: np.ndarray  # float64, 0–1
+    is_active: np.ndarray        # bool, status in (active, overdue)
+    is_overdue: np.ndarray       # bool
+    lender_name: List[str]
+    account_type: List[str]
+    # Original interest rate values, used only to render flag reasons
+    # exactly as the scalar calculator does (e.g. ``30`` vs ``30.0``).
+    rate_labels: Optional[List[Any]] = None
+
+    @classmethod
+    def from_accounts(cls, accounts_by_user: Sequence[List[Dict[str, Any]]]) -> "AccountBatch":
+        """Build a batch from per-user lists of account dicts (CIBIL format)."""
+        owner: List[int] = []
+        outstanding: List[float] = []
+        interest_rate: List[float] = []
+        emi_amount: List[float] = []
+        utilization: List[float] = []
+        payment_history: List[float] = []
+        status: List[Any] = []
+        lender_name: List[str] = []
+        account_type: List[str] = []
+        rate_labels: List[Any] = []
+
+        def _num(acc: Dict[str, Any], key: str, default: float) -> Any:
+            value = acc.get(key)
+            return default if value is None else value
+
+        for user_idx, accounts in enumerate(accounts_by_user):
+            for acc in accounts:
+                owner.append(user_idx)
+                outstanding.append(_num(acc, "outstanding", 0))
+                rate = _num(acc, "interest_rate", 0)
+                interest_rate.append(rate)
+                rate_labels.append(rate)
+                emi_amount.append(_num(acc, "emi_amount", 0))
+                utilization.append(_num(acc, "utilization", 0))
+                payment_history.append(_num(acc, "payment_history", 1.0))
+                status.append(acc.get("status"))
+                lender_name.append(acc.get("lender_name", "Unknown"))
+                account_type.append(acc.get("account_type", "unknown"))
+
+        status_arr = np.asarray(status, dtype=object)
+        return cls(
+            n_users=len(accounts_by_user),
+            owner=np.asarray(owner, dtype=np.int64),
+            outstanding=np.asarray(outstanding, dtype=np.float64),
+            interest_rate=np.asarray(interest_rate, dtype=np.float64),
+            emi_amount=np.asarray(emi_amount, dtype=np.float64),
+            utilization=np.asarray(utilization, dtype=np.float64),
+            payment_history=np.asarray(payment_history, dtype=np.float64),
+            is_active=np.isin(status_arr, _ACTIVE_STATUSES),
+            is_overdue=status_arr == "overdue",
+            lender_name=lender_name,
+            account_type=account_type,
+            rate_labels=rate_labels,
+        )
+
+
+def _bucket(values: np.ndarray, upper_bounds: Sequence[float], scores: Sequence[float]) -> np.ndarray:
+    """Vectorised threshold lookup: first ``value <= bound`` wins, else last score."""
+    conditions = [values <= bound for bound in upper_bounds]
+    return np.select(conditions, scores[:-1], default=scores[-1]).astype(np.float64)
+
+
+def _flag_batch(batch: AccountBatch) -> List[List[Dict[str, Any]]]:
+    """Vectorised counterpart of ``_flag_accounts`` grouped by user."""
+    overdue = batch.is_overdue
+    high_rate = batch.interest_rate > 24
+    high_util = batch.utilization > 0.75
+    poor_history = batch.payment_history < 0.7
+
+    rows = np.flatnonzero(overdue | high_rate | high_util | poor_history)
+    owners = batch.owner[rows].tolist()
+    outstanding = batch.outstanding[rows].tolist()
+    utilization = batch.utilization[rows].tolist()
+    rates = batch.interest_rate[rows].tolist()
+    overdue_l, high_rate_l = overdue[rows].tolist(), high_rate[rows].tolist()
+    high_util_l, poor_history_l = high_util[rows].tolist(), poor_history[rows].tolist()
+
+    flagged: List[List[Dict[str, Any]]] = [[] for _ in range(batch.n_users)]
+    for j, i in enumerate(rows.tolist()):
+        reasons = []
+        if overdue_l[j]:
+            reasons.append("Account is overdue")
+        if high_rate_l[j]:
+            rate = batch.rate_labels[i] if batch.rate_labels is not None else rates[j]
+            reasons.append(f"High interest rate ({rate}%)")
+        if high_util_l[j]:
+            reasons.append(f"High utilization ({utilization[j] * 100:.0f}%)")
+        if poor_history_l[j]:
+            reasons.append("Poor payment history")
+
+        flagged[owners[j]].append({
+            "lender_name": batch.lender_name[i],
+            "account_type": batch.account_type[i],
+            "reason": "; ".join(reasons),
+            "outstanding": outstanding[j],
+        })
+
+    return flagged
+
+
+def calculate_health_scores_batch(
+    batch: AccountBatch,
+    monthly_incomes: Optional[np.ndarray] = None,
+) -> List[HealthScoreResult]:
+    """
+    Score many users in one vectorised pass.
+
+    Produces the same results as calling ``calculate_health_score`` once
+    per user, but aggregates every metric with NumPy instead of iterating
+    over account dicts.
+
+    Args:
+        batch: Columnar account data for ``batch.n_users`` users.
+        monthly_incomes: Optional per-user monthly income. Values that are
+                        NaN or <= 0 fall back to the EMI-based estimate.
+
+    Returns:
+        One HealthScoreResult per user, in user-index order.
+    """
+    n = batch.n_users
+    owner = batch.owner
+    active = batch.is_active
+
+    def _per_user_sum(weights: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        return np.bincount(owner[mask], weights=weights[mask], minlength=n)
+
+    account_count = np.bincount(owner, minlength=n)
+    active_count = np.bincount(owner[active], minlength=n)
+
+    # Aggregate metrics
+    total_outstanding = _per_user_sum(batch.outstanding, active)
+    total_emi = _per_user_sum(batch.emi_amount, active)
+    weighted_rates = _per_user_sum(batch.interest_rate * batch.outstanding, active)
+    avg_rate = np.divide(
+        weighted_rates, total_outstanding,
+        out=np.zeros(n), where=total_outstanding > 0,
+    )
+
+    # DTI ratio
+    if monthly_incomes is None:
+        incomes = np.zeros(n)
+    else:
+        incomes = np.nan_to_num(np.asarray(monthly_incomes, dtype=np.float64), nan=0.0)
+    estimated_income = np.where(total_emi > 0, total_emi / 0.4, 1.0)
+    dti_ratio = np.where(
+        incomes > 0,
+        total_emi / np.where(incomes > 0, incomes, 1.0),
+        total_emi / estimated_income,
+    )
+
+    # Utilization (active revolving accounts only)
+    util_mask = active & (batch.utilization > 0)
+    util_count = np.bincount(owner[util_mask], minlength=n)
+    avg_utilization = np.divide(
+        _per_user_sum(batch.utilization, util_mask), util_count,
+        out=np.zeros(n), where=util_count > 0,
+    )
+
+    # Payment history
+    avg_payment_history = np.divide(
+        _per_user_sum(batch.payment_history, active), active_count,
+        out=np.ones(n), where=active_count > 0,
+    )
+
+    # Component scores (same thresholds as the scalar _score_* helpers)
+    dti_score = _bucket(dti_ratio, (0.20, 0.35, 0.50, 0.70), (100, 80, 60, 35, 10))
+    rate_score = _bucket(avg_rate, (10, 14, 20, 30), (100, 85, 60, 35, 10))
+    accounts_score = _bucket(active_count, (2, 4, 6, 8), (100, 75, 50, 30, 10))
+    utilization_score = _bucket(avg_utilization, (0.30, 0.50, 0.70, 0.90), (100, 75, 45, 20, 5))
+    history_score = np.minimum(100, np.maximum(0, avg_payment_history * 100))
+
+    final_score = (
+        dti_score * 0.30
+        + rate_score * 0.25
+        + accounts_score * 0.15
+        + utilization_score * 0.15
+        + history_score * 0.15
+    ).astype(np.int64)
+    final_score = np.clip(final_score, 0, 100)
+
+    categories = np.select(
+        [final_score >= 85, final_score >= 65, final_score >= 40],
+        ["Healthy", "Fair", "Needs Attention"],
+        default="Critical",
+    )
+
+    # Savings estimation (all accounts, as in _estimate_savings)
+    optimal_rate = (10.0 + 14.0) / 2
+    savings_mask = (batch.interest_rate > optimal_rate) & (batch.outstanding > 0)
+    per_account_savings = (
+        batch.outstanding * (batch.interest_rate / 100)
+        - batch.outstanding * (optimal_rate / 100)
+    )
+    savings = _per_user_sum(per_account_savings, savings_mask)
+
+    flagged = _flag_batch(batch)
+
+    results: List[HealthScoreResult] = []
+    columns = zip(
+        account_count.tolist(),
+        final_score.tolist(),
+        categories.tolist(),
+        total_outstanding.tolist(),
+        total_emi.tolist(),
+        avg_rate.tolist(),
+        dti_ratio.tolist(),
+        savings.tolist(),
+        flagged,
+    )
+    for count, score, category, outstanding, emi, rate, dti, saved, flags in columns:
+        if count == 0:
+            results.append(calculate_health_score([]))
+            continue
+        results.append(HealthScoreResult(
+            score=score,
+            category=category,
+            total_outstanding=round(outstanding, 2),
+            total_emi=round(emi, 2),
+            avg_rate=round(rate, 2),
+            dti_ratio=round(dti, 4),
+            savings_est=round(saved, 2),
+            flagged_accounts=flags,
+        ))
+
+    return results
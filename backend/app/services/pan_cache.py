@@ -0,0 +1,137 @@
+"""Cache of PAN verification results, keyed by ``hash_pan(pan)``.
+
+Onboarding verifies the same PAN several times within minutes; each
+Setu call is paid and takes about a second. Results are cached by PAN
+hash, so the raw PAN is never stored, with a TTL per outcome:
+
+- success → PAN_CACHE_SUCCESS_TTL_SECONDS
+- failed (PAN found but invalid) → PAN_CACHE_FAILURE_TTL_SECONDS
+- failed with NOT_FOUND (404) → PAN_CACHE_NOT_FOUND_TTL_SECONDS, a short
+  negative cache since newly issued PANs show up later
+- error (timeouts, 5xx, bad input) → not cached
+
+Usage:
+    cache = get_pan_cache()
+    result = await cache.get(pan)
+    if result is None:
+        result = await call_setu(pan)
+        await cache.put(pan, result)
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+from app.utils.cache import TTLCache
+from app.utils.security import decrypt_data, encrypt_data, hash_pan
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Stores ───────────────────────────────────────────────────────────────────
+
+class PanCacheStore(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        ...
+
+
+class InMemoryPanCacheStore(PanCacheStore):
+    """Process-local LRU store (default)."""
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        self._cache.set(key, result, ttl=ttl)
+
+
+class RedisPanCacheStore(PanCacheStore):
+    """Shares results across workers. Values hold names, so they are encrypted."""
+
+    def __init__(self, client: Any, prefix: str = "exitdebt:pan:"):
+        self._client = client
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._client.get(self._prefix + key)
+        if not raw:
+            return None
+        return json.loads(decrypt_data(raw))
+
+    async def set(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        await self._client.set(self._prefix + key, encrypt_data(json.dumps(result)), ex=max(1, int(ttl)))
+
+
+# ─── Cache ────────────────────────────────────────────────────────────────────
+
+class PanVerificationCache:
+    def __init__(self, store: PanCacheStore, success_ttl: float, failure_ttl: float, not_found_ttl: float):
+        self.store = store
+        self.success_ttl = success_ttl
+        self.failure_ttl = failure_ttl
+        self.not_found_ttl = not_found_ttl
+
+    def ttl_for(self, result: Dict[str, Any]) -> Optional[float]:
+        """How long ``result`` may be reused; None if it must not be cached."""
+        verification = result.get("verification")
+        if verification == "success":
+            return self.success_ttl
+        if verification == "failed":
+            if result.get("error", {}).get("code") == "NOT_FOUND":
+                return self.not_found_ttl
+            return self.failure_ttl
+        return None
+
+    async def get(self, pan: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.store.get(hash_pan(pan))
+        except Exception as e:
+            logger.warning(f"PAN cache read failed: {e}")
+            return None
+
+    async def put(self, pan: str, result: Dict[str, Any]) -> None:
+        ttl = self.ttl_for(result)
+        if ttl is None or ttl <= 0:
+            return
+        try:
+            await self.store.set(hash_pan(pan), result, ttl)
+        except Exception as e:
+            logger.warning(f"PAN cache write failed: {e}")
+
+
+_default_cache: Optional[PanVerificationCache] = None
+
+
+def get_pan_cache() -> PanVerificationCache:
+    """Cache backed by the store selected by PAN_CACHE_BACKEND ("memory" or "redis")."""
+    global _default_cache
+    if _default_cache is None:
+        settings = get_settings()
+        if settings.PAN_CACHE_BACKEND == "redis":
+            from app.utils.redis_client import get_redis
+            store = RedisPanCacheStore(get_redis())
+        else:
+            store = InMemoryPanCacheStore(maxsize=settings.PAN_CACHE_SIZE)
+        _default_cache = PanVerificationCache(
+            store,
+            success_ttl=settings.PAN_CACHE_SUCCESS_TTL_SECONDS,
+            failure_ttl=settings.PAN_CACHE_FAILURE_TTL_SECONDS,
+            not_found_ttl=settings.PAN_CACHE_NOT_FOUND_TTL_SECONDS,
+        )
+    return _default_cache
+
+
+def set_pan_cache(cache: Optional[PanVerificationCache]) -> None:
+    """Override the default cache (useful for testing)."""
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,159 @@
+"""Content-addressed cache of health score results.
+
+A result depends only on the scored fields of the account list, the
+monthly income and the scoring rules, so it is keyed by a SHA-256 of the
+normalized accounts plus SCORING_MODEL_VERSION. Re-running a check on an
+unchanged report, or reading a stored check back, reuses the full
+``HealthScoreResult`` (including ``flagged_accounts``) instead of
+recomputing it; bumping the model version invalidates every entry.
+
+Normalization keeps account order (flags are reported in order), drops
+fields the calculator does not read and absent/None values, and compares
+numbers as floats, so a CIBIL payload and the DebtAccount rows stored
+from it hash the same.
+
+Usage:
+    result = await score_cached(accounts)
+"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import get_settings
+from app.services.health_score import (
+    SCORING_MODEL_VERSION,
+    HealthScoreResult,
+    calculate_health_score,
+)
+from app.utils.cache import TTLCache
+
+SCORED_FIELDS = (
+    "lender_name",
+    "account_type",
+    "outstanding",
+    "interest_rate",
+    "emi_amount",
+    "status",
+    "utilization",
+    "payment_history",
+)
+
+
+# ─── Keys ─────────────────────────────────────────────────────────────────────
+
+def _normalize_account(account: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for field in SCORED_FIELDS:
+        value = account.get(field)
+        if value is None:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        normalized[field] = value
+    return normalized
+
+
+def result_key(accounts: Iterable[Dict[str, Any]], monthly_income: Optional[float] = None) -> str:
+    payload = json.dumps(
+        {
+            "accounts": [_normalize_account(a) for a in accounts],
+            "monthly_income": float(monthly_income) if monthly_income else None,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return f"v{SCORING_MODEL_VERSION}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def account_dicts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Scoring input from stored DebtAccount rows (NULL columns left out, as in CIBIL data)."""
+    return [
+        {field: getattr(row, field) for field in SCORED_FIELDS if getattr(row, field) is not None}
+        for row in rows
+    ]
+
+
+# ─── Stores ───────────────────────────────────────────────────────────────────
+
+class ScoreCacheStore(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[HealthScoreResult]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, result: HealthScoreResult) -> None:
+        ...
+
+
+class InMemoryScoreCacheStore(ScoreCacheStore):
+    """Process-local LRU store (default)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[HealthScoreResult]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, result: HealthScoreResult) -> None:
+        self._cache.set(key, result)
+
+
+class RedisScoreCacheStore(ScoreCacheStore):
+    """Shares results across workers; Redis eviction policy provides the LRU."""
+
+    def __init__(self, client: Any, ttl: float, prefix: str = "exitdebt:score:"):
+        self._client = client
+        self._ttl = max(1, int(ttl))
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[HealthScoreResult]:
+        raw = await self._client.get(self._prefix + key)
+        if not raw:
+            return None
+        return HealthScoreResult(**json.loads(raw))
+
+    async def set(self, key: str, result: HealthScoreResult) -> None:
+        await self._client.set(self._prefix + key, json.dumps(asdict(result)), ex=self._ttl)
+
+
+_default_store: Optional[ScoreCacheStore] = None
+
+
+def get_score_cache_store() -> ScoreCacheStore:
+    """Store selected by SCORE_CACHE_BACKEND ("memory" or "redis")."""
+    global _default_store
+    if _default_store is None:
+        settings = get_settings()
+        if settings.SCORE_CACHE_BACKEND == "redis":
+            from app.utils.redis_client import get_redis
+            _default_store = RedisScoreCacheStore(get_redis(), ttl=settings.SCORE_CACHE_TTL_SECONDS)
+        else:
+            _default_store = InMemoryScoreCacheStore(
+                maxsize=settings.SCORE_CACHE_SIZE, ttl=settings.SCORE_CACHE_TTL_SECONDS,
+            )
+    return _default_store
+
+
+def set_score_cache_store(store: Optional[ScoreCacheStore]) -> None:
+    """Override the default store (useful for testing)."""
+    global _default_store
+    _default_store = store
+
+
+# ─── Read-through ─────────────────────────────────────────────────────────────
+
+async def score_cached(
+    accounts: List[Dict[str, Any]],
+    monthly_income: Optional[float] = None,
+) -> HealthScoreResult:
+    """``calculate_health_score`` behind the result cache."""
+    store = get_score_cache_store()
+    key = result_key(accounts, monthly_income)
+    result = await store.get(key)
+    if result is None:
+        result = calculate_health_score(accounts, monthly_income)
+        await store.set(key, result)
+    return result
@@ -5,48 +5,63 @@ When SETU_AA_PROVIDER=mock, returns synthetic data for local development.
 When SETU_AA_PROVIDER=setu, calls the real Setu FIU APIs.
 
 Setu AA Flow:
-  1. Create consent (POST /consents) → get redirect URL
-  2. User approves at Setu screens → webhook notification
+  1. Create consent (POST /consents) → get redirect URL; stored as AAConsent
+  2. User approves at Setu screens → webhook notification updates AAConsent
   3. Create data session (POST /sessions) → fetch FI data
-  4. Parse FI data into ExitDebt debt accounts
+  4. Parse FI data into ExitDebt debt accounts (streamed; see FIStreamParser)
+
+Consent status reads come from the aa_consents table. With the real
+provider, a read also polls GET /consents/{id} when the consent's
+``next_poll_at`` has passed, backing off exponentially from
+AA_CONSENT_POLL_BASE_SECONDS to AA_CONSENT_POLL_MAX_SECONDS, in case a
+webhook was missed.
 """
 
 import uuid
 import logging
-import httpx
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import AsyncIterator, Optional, Tuple
+import ijson
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import get_settings
+from app.integrations.http_client import get_http_client
+from app.models.aa_consent import APPROVED, AAConsent
+from app.models.debt_account import DebtAccount
+from app.models.user import User
+from app.utils.token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
 # ── Token Cache ──────────────────────────────────────────────────────
-_token_cache: dict = {"access_token": None, "expires_at": 0}
+SETU_TOKEN_TTL_SECONDS = 300
 
 
-async def _get_setu_token() -> str:
-    """Get or refresh Setu auth token (cached for 280s of the 300s expiry)."""
+async def _login_setu_aa() -> Tuple[str, float]:
+    """Log in to Setu auth with the AA credentials."""
     settings = get_settings()
-    now = datetime.utcnow().timestamp()
-
-    if _token_cache["access_token"] and _token_cache["expires_at"] > now:
-        return _token_cache["access_token"]
-
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.SETU_AUTH_URL}/v1/users/login",
-            json={
-                "clientID": settings.SETU_AA_CLIENT_ID,
-                "secret": settings.SETU_AA_CLIENT_SECRET,
-                "grant_type": "client_credentials",
-            },
-            headers={"Content-Type": "application/json"},
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        _token_cache["access_token"] = data["access_token"]
-        _token_cache["expires_at"] = now + 280  # refresh 20s before expiry
-        return data["access_token"]
+    client = get_http_client("setu_auth")
+    resp = await client.post(
+        f"{settings.SETU_AUTH_URL}/v1/users/login",
+        json={
+            "clientID": settings.SETU_AA_CLIENT_ID,
+            "secret": settings.SETU_AA_CLIENT_SECRET,
+            "grant_type": "client_credentials",
+        },
+        headers={"Content-Type": "application/json"},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return data["access_token"], SETU_TOKEN_TTL_SECONDS
+
+
+# Never use a token in its last 20s; refresh in the background from 60s out.
+_token_cache = TokenCache("setu_aa", fetch=_login_setu_aa, refresh_margin=20, proactive_margin=60)
+
+
+async def _get_setu_token() -> str:
+    """Get the cached Setu auth token (single-flight refresh)."""
+    return await _token_cache.get()
 
 
 def _setu_headers(token: str, settings=None) -> dict:
@@ -62,35 +77,14 @@ def _setu_headers(token: str, settings=None) -> dict:
 
 # ── Mock Consent Flow ────────────────────────────────────────────────
 
-MOCK_CONSENTS: dict = {}
-
-
 def _mock_create_consent(phone: str, fi_types: list[str]) -> dict:
-    """Create a mock consent for local development."""
+    """Create a mock consent for local development (stored like a real one)."""
     consent_id = str(uuid.uuid4())
-    consent = {
+    return {
         "id": consent_id,
         "url": f"http://localhost:3000/aa/callback?mock=true&consentId={consent_id}",
         "status": "PENDING",
-        "vua": f"{phone}@setu-mock",
-        "fi_types": fi_types,
-        "created_at": datetime.utcnow().isoformat(),
     }
-    MOCK_CONSENTS[consent_id] = consent
-    return consent
-
-
-def _mock_approve_consent(consent_id: str) -> dict:
-    """Simulate consent approval in mock mode."""
-    if consent_id in MOCK_CONSENTS:
-        MOCK_CONSENTS[consent_id]["status"] = "APPROVED"
-        MOCK_CONSENTS[consent_id]["approved_at"] = datetime.utcnow().isoformat()
-    return MOCK_CONSENTS.get(consent_id, {"error": "Not found"})
-
-
-def _mock_get_consent(consent_id: str) -> dict:
-    """Get mock consent status."""
-    return MOCK_CONSENTS.get(consent_id, {"error": "Not found"})
 
 
 def _mock_fetch_fi_data(consent_id: str) -> dict:
@@ -209,16 +203,16 @@ async def _setu_create_consent(phone: str, fi_types: list[str]) -> dict:
         "context": [],
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.SETU_AA_BASE_URL}/consents",
-            json=payload,
-            headers=_setu_headers(token, settings),
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        logger.info(f"Setu consent created: {data.get('id')}")
-        return data
+    client = get_http_client("setu_aa")
+    resp = await client.post(
+        f"{settings.SETU_AA_BASE_URL}/consents",
+        json=payload,
+        headers=_setu_headers(token, settings),
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    logger.info(f"Setu consent created: {data.get('id')}")
+    return data
 
 
 async def _setu_get_consent(consent_id: str) -> dict:
@@ -226,13 +220,13 @@ async def _setu_get_consent(consent_id: str) -> dict:
     settings = get_settings()
     token = await _get_setu_token()
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{settings.SETU_AA_BASE_URL}/consents/{consent_id}",
-            headers=_setu_headers(token, settings),
-        )
-        resp.raise_for_status()
-        return resp.json()
+    client = get_http_client("setu_aa")
+    resp = await client.get(
+        f"{settings.SETU_AA_BASE_URL}/consents/{consent_id}",
+        headers=_setu_headers(token, settings),
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 async def _setu_create_data_session(consent_id: str) -> dict:
@@ -250,66 +244,240 @@ async def _setu_create_data_session(consent_id: str) -> dict:
         "format": "json",
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.SETU_AA_BASE_URL}/sessions",
-            json=payload,
-            headers=_setu_headers(token, settings),
-        )
-        resp.raise_for_status()
-        return resp.json()
+    client = get_http_client("setu_aa")
+    resp = await client.post(
+        f"{settings.SETU_AA_BASE_URL}/sessions",
+        json=payload,
+        headers=_setu_headers(token, settings),
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
-async def _setu_fetch_data(session_id: str) -> dict:
-    """Fetch decrypted FI data from a completed session."""
+async def _setu_fetch_accounts(session_id: str) -> Tuple[list[dict], int]:
+    """Stream a completed session's FI data and parse it as it arrives.
+
+    Statements can run to tens of MB, so the body is never decoded whole.
+    Returns (debt accounts, number of FIPs in the response).
+    """
     settings = get_settings()
     token = await _get_setu_token()
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{settings.SETU_AA_BASE_URL}/sessions/{session_id}",
-            headers=_setu_headers(token, settings),
-        )
+    client = get_http_client("setu_aa")
+    parser = FIStreamParser()
+    async with client.stream(
+        "GET",
+        f"{settings.SETU_AA_BASE_URL}/sessions/{session_id}",
+        headers=_setu_headers(token, settings),
+    ) as resp:
         resp.raise_for_status()
-        return resp.json()
+        accounts = [a async for a in stream_fi_accounts(resp.aiter_bytes(), parser)]
+    return accounts, parser.fip_count
+
+
+# ── Consent state ────────────────────────────────────────────────────
+
+def _use_setu(settings=None) -> bool:
+    if settings is None:
+        settings = get_settings()
+    return settings.SETU_AA_PROVIDER == "setu" and bool(settings.SETU_AA_CLIENT_ID)
+
+
+def _poll_delay(attempts: int) -> timedelta:
+    """Backoff before the next fallback poll, after ``attempts`` polls without a change."""
+    settings = get_settings()
+    seconds = min(settings.AA_CONSENT_POLL_BASE_SECONDS * 2 ** attempts, settings.AA_CONSENT_POLL_MAX_SECONDS)
+    return timedelta(seconds=seconds)
+
+
+async def _apply_status(db: AsyncSession, consent: AAConsent, status: str) -> bool:
+    """Transition ``consent``; on a change, restart the poll schedule (none once terminal).
+
+    A consent that ends takes its AA debt accounts with it (``transition``
+    already drops the cached result).
+    """
+    if not consent.transition(status):
+        return False
+    consent.poll_attempts = 0
+    consent.next_poll_at = None
+    if _use_setu() and not consent.is_terminal:
+        consent.next_poll_at = datetime.utcnow() + _poll_delay(0)
+    if consent.is_terminal:
+        # Flush the status first: it waits out an FI fetch holding the consent
+        # row, so the delete also sees the accounts that fetch stored
+        await db.flush()
+        await db.execute(delete(DebtAccount).where(DebtAccount.consent_id == consent.id))
+    return True
+
+
+def consent_to_dict(consent: AAConsent) -> dict:
+    return {
+        "id": consent.setu_consent_id,
+        "url": consent.redirect_url,
+        "status": consent.status,
+        "fi_types": consent.fi_types,
+        "created_at": consent.created_at.isoformat() if consent.created_at else None,
+        "approved_at": consent.approved_at.isoformat() if consent.approved_at else None,
+        "updated_at": consent.updated_at.isoformat() if consent.updated_at else None,
+    }
+
+
+async def find_consent(db: AsyncSession, consent_id: str) -> Optional[AAConsent]:
+    return await db.scalar(select(AAConsent).where(AAConsent.setu_consent_id == consent_id))
+
+
+async def _poll_if_due(db: AsyncSession, consent: AAConsent) -> AAConsent:
+    """Fallback poll of Setu for a consent whose webhook may have been missed."""
+    now = datetime.utcnow()
+    if consent.is_terminal or consent.next_poll_at is None or consent.next_poll_at > now:
+        return consent
+
+    # Claim the poll (optimistically, on poll_attempts) so concurrent readers
+    # on any worker wait for the next slot instead of all calling Setu
+    attempts = consent.poll_attempts + 1
+    claimed = await db.execute(
+        update(AAConsent)
+        .where(AAConsent.id == consent.id, AAConsent.poll_attempts == consent.poll_attempts)
+        .values(poll_attempts=attempts, next_poll_at=now + _poll_delay(attempts))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await db.refresh(consent)
+    if claimed.rowcount != 1:
+        return consent
+
+    try:
+        upstream = await _setu_get_consent(consent.setu_consent_id)
+    except Exception as e:
+        logger.warning(f"Setu consent poll failed for {consent.setu_consent_id}: {e}")
+        return consent
+
+    if await _apply_status(db, consent, upstream.get("status", "")):
+        logger.info(f"Consent {consent.setu_consent_id} → {consent.status} (poll)")
+        await db.commit()
+    return consent
 
 
 # ── Public API (auto-selects mock vs real) ───────────────────────────
 
-async def create_consent(phone: str, fi_types: list[str] | None = None) -> dict:
-    """Create an AA consent request. Auto-selects mock or real Setu."""
+async def create_consent(db: AsyncSession, phone: str, fi_types: list[str] | None = None) -> AAConsent:
+    """Create an AA consent request and store it. Auto-selects mock or real Setu."""
     if fi_types is None:
         fi_types = ["DEPOSIT", "CREDIT_CARD", "TERM_DEPOSIT"]
 
     settings = get_settings()
-    if settings.SETU_AA_PROVIDER == "setu" and settings.SETU_AA_CLIENT_ID:
-        return await _setu_create_consent(phone, fi_types)
-    return _mock_create_consent(phone, fi_types)
+    use_setu = _use_setu(settings)
+    if use_setu:
+        result = await _setu_create_consent(phone, fi_types)
+    else:
+        result = _mock_create_consent(phone, fi_types)
+
+    now = datetime.utcnow()
+    user_id = await db.scalar(
+        select(User.id).where(User.phone == phone).order_by(User.created_at.desc()).limit(1)
+    )
+    consent = AAConsent(
+        user_id=user_id,
+        phone=phone,
+        setu_consent_id=result["id"],
+        status=result.get("status", "PENDING"),
+        redirect_url=result.get("url"),
+        fi_types=fi_types,
+        data_range_from=now - timedelta(days=180),
+        data_range_to=now,
+        next_poll_at=now + _poll_delay(0) if use_setu else None,
+    )
+    db.add(consent)
+    await db.commit()
+    return consent
 
 
-async def get_consent_status(consent_id: str) -> dict:
-    """Check consent status. Auto-selects mock or real Setu."""
-    settings = get_settings()
-    if settings.SETU_AA_PROVIDER == "setu" and settings.SETU_AA_CLIENT_ID:
-        return await _setu_get_consent(consent_id)
-    return _mock_get_consent(consent_id)
+async def get_consent_status(db: AsyncSession, consent_id: str) -> Optional[AAConsent]:
+    """Stored consent (None if unknown), refreshed from Setu only when a fallback poll is due."""
+    consent = await find_consent(db, consent_id)
+    if consent is not None and _use_setu():
+        consent = await _poll_if_due(db, consent)
+    return consent
 
 
-async def approve_consent(consent_id: str) -> dict:
-    """Approve a consent (mock only — real flow uses Setu screens)."""
-    return _mock_approve_consent(consent_id)
+async def update_consent_status(db: AsyncSession, consent_id: str, status: str) -> Optional[AAConsent]:
+    """Apply a CONSENT_STATUS_UPDATE webhook. Disallowed moves (stale or replayed events) are ignored."""
+    consent = await find_consent(db, consent_id)
+    if consent is None:
+        logger.warning(f"Webhook for unknown consent {consent_id}")
+        return None
+    if await _apply_status(db, consent, status):
+        logger.info(f"Consent {consent_id} → {status} (webhook)")
+        await db.commit()
+    else:
+        logger.info(f"Ignoring consent {consent_id} update {consent.status} → {status}")
+    return consent
 
 
-async def fetch_financial_data(consent_id: str) -> dict:
-    """Fetch FI data after consent approval. Auto-selects mock or real Setu."""
-    settings = get_settings()
-    if settings.SETU_AA_PROVIDER == "setu" and settings.SETU_AA_CLIENT_ID:
+async def approve_consent(db: AsyncSession, consent_id: str) -> Optional[AAConsent]:
+    """Approve a consent (mock only — real flow uses Setu screens).
+
+    Returns None with the real provider, so a Setu consent can only be
+    approved by the user at Setu.
+    """
+    if _use_setu():
+        return None
+    consent = await find_consent(db, consent_id)
+    if consent is not None and await _apply_status(db, consent, APPROVED):
+        await db.commit()
+    return consent
+
+
+async def create_data_session(consent_id: str) -> dict:
+    """Ask for FI data under an approved consent; Setu sends FI_DATA_READY when it is ready.
+
+    In mock mode the data is available immediately (``ready`` is True).
+    """
+    if _use_setu():
         session = await _setu_create_data_session(consent_id)
-        session_id = session.get("id")
-        if session_id:
-            return await _setu_fetch_data(session_id)
-        return session
-    return _mock_fetch_fi_data(consent_id)
+        return {"id": session.get("id"), "ready": False}
+    return {"id": f"mock-session-{uuid.uuid4()}", "ready": True}
+
+
+async def fetch_session_accounts(consent_id: str, session_id: str) -> Tuple[list[dict], int]:
+    """Debt accounts from a ready data session, and the number of FIPs it covered.
+
+    Auto-selects mock or real Setu; real sessions are parsed while streaming.
+    """
+    if _use_setu():
+        return await _setu_fetch_accounts(session_id)
+    fi_data = _mock_fetch_fi_data(consent_id)
+    return parse_fi_to_debt_accounts(fi_data), len(fi_data["fi_data"])
+
+
+# ── FI data parsing ──────────────────────────────────────────────────
+
+def _emi_account(txn: dict) -> Optional[dict]:
+    """Debt account for an EMI debit on a deposit statement, else None."""
+    narration = txn.get("narration") or ""
+    if "EMI" not in narration.upper() or txn.get("type") != "DEBIT":
+        return None
+    return {
+        "lender": narration.replace("EMI - ", "").replace("EMI ", ""),
+        "outstanding": 0,  # Not available from bank statement alone
+        "apr": 0,
+        "type": "loan",
+        "emi": float(txn.get("amount", 0)),
+        "dueDate": 5,  # Approximated from transaction date
+    }
+
+
+def _credit_card_account(masked_acc_number: Optional[str], summary: dict) -> dict:
+    current_due = float(summary.get("currentDue", 0))
+    due_date = summary.get("dueDate")
+    return {
+        "lender": f"Credit Card ({masked_acc_number or 'XXXX'})",
+        "outstanding": current_due,
+        "apr": 36,  # Default CC APR for India
+        "type": "credit_card",
+        "emi": current_due * 0.05,  # ~5% min payment
+        "dueDate": int(due_date.split("-")[2]) if due_date else 5,
+    }
 
 
 def parse_fi_to_debt_accounts(fi_data: dict) -> list[dict]:
@@ -322,36 +490,101 @@ def parse_fi_to_debt_accounts(fi_data: dict) -> list[dict]:
         for item in fip.get("data", []):
             fi_type = item.get("fiType", "")
             account = item.get("account", {})
-            summary = account.get("summary", {})
 
             if fi_type == "DEPOSIT":
                 # Extract EMI payments from transactions
-                transactions = account.get("transactions", {}).get("transaction", [])
-                for txn in transactions:
-                    narration = txn.get("narration", "")
-                    if "EMI" in narration.upper() and txn.get("type") == "DEBIT":
-                        lender = narration.replace("EMI - ", "").replace("EMI ", "")
-                        accounts.append({
-                            "lender": lender,
-                            "outstanding": 0,  # Not available from bank statement alone
-                            "apr": 0,
-                            "type": "loan",
-                            "emi": float(txn.get("amount", 0)),
-                            "dueDate": 5,  # Approximated from transaction date
-                        })
+                for txn in account.get("transactions", {}).get("transaction", []):
+                    emi = _emi_account(txn)
+                    if emi is not None:
+                        accounts.append(emi)
 
             elif fi_type == "CREDIT_CARD":
-                accounts.append({
-                    "lender": f"Credit Card ({item.get('maskedAccNumber', 'XXXX')})",
-                    "outstanding": float(summary.get("currentDue", 0)),
-                    "apr": 36,  # Default CC APR for India
-                    "type": "credit_card",
-                    "emi": float(summary.get("currentDue", 0)) * 0.05,  # ~5% min payment
-                    "dueDate": int(summary.get("dueDate", "2026-03-05").split("-")[2]) if summary.get("dueDate") else 5,
-                })
-
-            elif fi_type == "TERM_DEPOSIT":
-                # Term deposits aren't debts — skip
-                continue
+                accounts.append(_credit_card_account(item.get("maskedAccNumber"), account.get("summary", {})))
+
+            # Term deposits aren't debts — skip
 
     return accounts
+
+
+_FI_ITEM = "fi_data.item.data.item"
+_FI_TXN = f"{_FI_ITEM}.account.transactions.transaction.item"
+_FI_SUMMARY = f"{_FI_ITEM}.account.summary"
+
+
+class FIStreamParser:
+    """Incremental ``parse_fi_to_debt_accounts`` over raw JSON bytes.
+
+    ``feed`` each chunk of the response body as it arrives and it returns the
+    accounts completed so far; ``close`` at the end of the body. Only the
+    current FI item's scalars are held: transactions are inspected one at a
+    time, and EMI debits are buffered only while the item's ``fiType`` has
+    not been seen yet.
+    """
+
+    def __init__(self):
+        self._events = ijson.sendable_list()
+        self._coro = ijson.parse_coro(self._events, use_float=True)
+        self.fip_count = 0
+        self._reset_item()
+
+    def _reset_item(self) -> None:
+        self._fi_type: Optional[str] = None
+        self._masked_acc_number: Optional[str] = None
+        self._summary: dict = {}
+        self._txn: Optional[dict] = None
+        self._pending_emis: list[dict] = []
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        self._coro.send(chunk)
+        return self._drain()
+
+    def close(self) -> list[dict]:
+        """End of input; raises ``ijson.IncompleteJSONError`` on a truncated body."""
+        self._coro.close()
+        return self._drain()
+
+    def _drain(self) -> list[dict]:
+        accounts: list[dict] = []
+        for prefix, event, value in self._events:
+            self._on_event(prefix, event, value, accounts)
+        del self._events[:]
+        return accounts
+
+    def _on_event(self, prefix: str, event: str, value, accounts: list[dict]) -> None:
+        if prefix == _FI_TXN:
+            if event == "start_map" and self._fi_type in (None, "DEPOSIT"):
+                self._txn = {}
+            elif event == "end_map" and self._txn is not None:
+                emi = _emi_account(self._txn)
+                self._txn = None
+                if emi is not None:
+                    (accounts if self._fi_type == "DEPOSIT" else self._pending_emis).append(emi)
+        elif self._txn is not None and prefix.startswith(_FI_TXN):
+            key = prefix[len(_FI_TXN) + 1:]
+            if key in ("narration", "type", "amount"):
+                self._txn[key] = value
+        elif prefix == f"{_FI_ITEM}.fiType":
+            self._fi_type = value
+            if value == "DEPOSIT":
+                accounts.extend(self._pending_emis)
+            self._pending_emis = []
+        elif prefix == f"{_FI_ITEM}.maskedAccNumber":
+            self._masked_acc_number = value
+        elif prefix in (f"{_FI_SUMMARY}.currentDue", f"{_FI_SUMMARY}.dueDate"):
+            self._summary[prefix[len(_FI_SUMMARY) + 1:]] = value
+        elif prefix == _FI_ITEM and event == "end_map":
+            if self._fi_type == "CREDIT_CARD":
+                accounts.append(_credit_card_account(self._masked_acc_number, self._summary))
+            self._reset_item()
+        elif prefix == "fi_data.item" and event == "start_map":
+            self.fip_count += 1
+
+
+async def stream_fi_accounts(chunks: AsyncIterator[bytes], parser: Optional[FIStreamParser] = None) -> AsyncIterator[dict]:
+    """Yield debt accounts from a stream of FI JSON bytes as they are parsed."""
+    parser = parser or FIStreamParser()
+    async for chunk in chunks:
+        for account in parser.feed(chunk):
+            yield account
+    for account in parser.close():
+        yield account
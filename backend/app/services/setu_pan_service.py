@@ -14,13 +14,25 @@ Sandbox test PANs:
   - ABCDE1234A → valid PAN
   - ABCDE1234B → invalid PAN (found but invalid)
   - Any other  → 404 PAN not found
+
+Every upstream call, single or bulk, is paced to SETU_PAN_QPS. The pacer is
+per process: with N API processes, set SETU_PAN_QPS to Setu's quota / N.
+Cache hits are not paced. Bulk verification (``verify_pans``) fans out over
+at most PAN_BULK_CONCURRENCY concurrent calls and verifies each distinct PAN
+once.
+SETU_PAN_MOCK_LATENCY_SECONDS adds a delay to mock calls for benchmarking.
 """
 
+import asyncio
 import logging
 import re
 import httpx
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 from app.config import get_settings
+from app.integrations.http_client import get_http_client
+from app.services.pan_cache import get_pan_cache
+from app.utils.pacer import Pacer
+from app.utils.security import mask_pan
 
 logger = logging.getLogger(__name__)
 
@@ -103,10 +115,8 @@ MOCK_PAN_DATA = {
 }
 
 
-def _mock_verify_pan(pan: str, consent: str, reason: str) -> dict:
-    """Return mock PAN verification matching Setu's response format."""
-    pan = pan.upper().strip()
-
+def _request_error(pan: str, consent: str, reason: str) -> Optional[dict]:
+    """Setu's BAD_REQUEST response for a malformed request, or None if it is valid."""
     if not PAN_REGEX.match(pan):
         return {
             "verification": "error",
@@ -127,6 +137,16 @@ def _mock_verify_pan(pan: str, consent: str, reason: str) -> dict:
             "message": "Reason too short",
             "error": {"code": "BAD_REQUEST", "detail": "reason must be at least 20 characters"},
         }
+    return None
+
+
+def _mock_verify_pan(pan: str, consent: str, reason: str) -> dict:
+    """Return mock PAN verification matching Setu's response format."""
+    pan = pan.upper().strip()
+
+    error = _request_error(pan, consent, reason)
+    if error is not None:
+        return error
 
     # Check predefined mock PANs
     if pan in MOCK_PAN_DATA:
@@ -172,32 +192,32 @@ async def _setu_verify_pan(pan: str, consent: str, reason: str) -> dict:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(
-                f"{settings.SETU_PAN_BASE_URL}/api/verify/pan",
-                json=payload,
-                headers=headers,
-            )
-
-            if resp.status_code == 200:
-                data = resp.json()
-                logger.info(f"Setu PAN verify success: {pan[:5]}XXXXX")
-                return data
-            elif resp.status_code == 404:
-                logger.warning(f"Setu PAN not found: {pan[:5]}XXXXX")
-                return {
-                    "verification": "failed",
-                    "message": "PAN not found",
-                    "error": {"code": "NOT_FOUND", "detail": "No PAN record found"},
-                }
-            else:
-                error_body = resp.text
-                logger.error(f"Setu PAN verify error {resp.status_code}: {error_body}")
-                return {
-                    "verification": "error",
-                    "message": f"Setu API error: {resp.status_code}",
-                    "error": {"code": "API_ERROR", "detail": error_body},
-                }
+        client = get_http_client("setu_pan")
+        resp = await client.post(
+            f"{settings.SETU_PAN_BASE_URL}/api/verify/pan",
+            json=payload,
+            headers=headers,
+        )
+
+        if resp.status_code == 200:
+            data = resp.json()
+            logger.info(f"Setu PAN verify success: {pan[:5]}XXXXX")
+            return data
+        elif resp.status_code == 404:
+            logger.warning(f"Setu PAN not found: {pan[:5]}XXXXX")
+            return {
+                "verification": "failed",
+                "message": "PAN not found",
+                "error": {"code": "NOT_FOUND", "detail": "No PAN record found"},
+            }
+        else:
+            error_body = resp.text
+            logger.error(f"Setu PAN verify error {resp.status_code}: {error_body}")
+            return {
+                "verification": "error",
+                "message": f"Setu API error: {resp.status_code}",
+                "error": {"code": "API_ERROR", "detail": error_body},
+            }
     except httpx.TimeoutException:
         logger.error("Setu PAN verify timeout")
         return {
@@ -216,9 +236,67 @@ async def _setu_verify_pan(pan: str, consent: str, reason: str) -> dict:
 
 # ── Public API (auto-selects mock vs real) ───────────────────────────
 
+async def _local_result(pan: str, consent: str, reason: str) -> Optional[dict]:
+    """A result that needs no upstream call: a request error or a cached verification.
+
+    The request is validated first, so a cached result is never returned
+    to a caller without consent.
+    """
+    error = _request_error(pan.upper().strip(), consent, reason)
+    if error is not None:
+        return error
+    cached = await get_pan_cache().get(pan)
+    if cached is not None:
+        logger.info(f"PAN verification served from cache: {pan[:5]}XXXXX")
+    return cached
+
+
+_pacer: Optional[Pacer] = None
+
+
+def get_pacer() -> Pacer:
+    """Pacer for the Setu PAN QPS budget (SETU_PAN_QPS), shared by all calls in this process."""
+    global _pacer
+    if _pacer is None:
+        _pacer = Pacer(rate=get_settings().SETU_PAN_QPS)
+    return _pacer
+
+
+def set_pacer(pacer: Optional[Pacer]) -> None:
+    """Override the pacer (useful for testing)."""
+    global _pacer
+    _pacer = pacer
+
+
+async def _call_provider(pan: str, consent: str, reason: str) -> dict:
+    """Call mock or real Setu."""
+    settings = get_settings()
+
+    if settings.SETU_PAN_PROVIDER == "setu" and settings.SETU_PAN_CLIENT_ID:
+        logger.info("Using real Setu PAN API")
+        return await _setu_verify_pan(pan, consent, reason)
+
+    logger.info("Using mock PAN verification")
+    if settings.SETU_PAN_MOCK_LATENCY_SECONDS > 0:
+        await asyncio.sleep(settings.SETU_PAN_MOCK_LATENCY_SECONDS)
+    return _mock_verify_pan(pan, consent, reason)
+
+
+async def _verify_upstream(pan: str, consent: str, reason: str) -> dict:
+    """Wait for a QPS slot, call the provider and cache the result."""
+    await get_pacer().wait()
+    result = await _call_provider(pan, consent, reason)
+    await get_pan_cache().put(pan, result)
+    return result
+
+
 async def verify_pan(pan: str, consent: str = "Y", reason: str = "Debt health check for ExitDebt user") -> dict:
     """Verify a PAN number. Auto-selects mock or real Setu.
 
+    Malformed requests (PAN format, consent, reason) are rejected before
+    anything else. Successful, invalid and not-found results are cached by
+    PAN hash (see app/services/pan_cache.py); errors are always retried.
+
     Args:
         pan: PAN card number (e.g. ABCDE1234F)
         consent: User consent indicator (Y/N)
@@ -227,14 +305,10 @@ async def verify_pan(pan: str, consent: str = "Y", reason: str = "Debt health ch
     Returns:
         dict with verification result matching Setu API response format
     """
-    settings = get_settings()
-
-    if settings.SETU_PAN_PROVIDER == "setu" and settings.SETU_PAN_CLIENT_ID:
-        logger.info("Using real Setu PAN API")
-        return await _setu_verify_pan(pan, consent, reason)
-
-    logger.info("Using mock PAN verification")
-    return _mock_verify_pan(pan, consent, reason)
+    result = await _local_result(pan, consent, reason)
+    if result is not None:
+        return result
+    return await _verify_upstream(pan, consent, reason)
 
 
 def is_pan_valid(result: dict) -> bool:
@@ -247,3 +321,75 @@ def get_verified_name(result: dict) -> Optional[str]:
     if is_pan_valid(result):
         return result.get("data", {}).get("full_name")
     return None
+
+
+# ── Bulk verification ────────────────────────────────────────────────
+
+def _bulk_line(index: int, pan: str, result: dict) -> Dict[str, Any]:
+    line = {
+        "index": index,
+        "pan": mask_pan(pan),
+        "verification": result.get("verification", "error"),
+        "message": result.get("message", ""),
+    }
+    for key in ("data", "error"):
+        if key in result:
+            line[key] = result[key]
+    return line
+
+
+async def verify_pans(
+    pans: Sequence[str],
+    consent: str = "Y",
+    reason: str = "Debt health check for ExitDebt user",
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Verify many PANs, yielding one result per input in completion order.
+
+    Each result carries the input ``index`` and the masked PAN. Repeated
+    PANs (case and whitespace ignored) are verified once and reported for
+    every index; malformed PANs are reported straight away without a call.
+    Stopping iteration early cancels the outstanding calls.
+    """
+    concurrency = concurrency or get_settings().PAN_BULK_CONCURRENCY
+
+    indexes: Dict[str, List[int]] = {}
+    for index, raw in enumerate(pans):
+        pan = raw.upper().strip()
+        if not PAN_REGEX.match(pan):
+            yield _bulk_line(index, pan, {
+                "verification": "error",
+                "message": "Invalid PAN format",
+                "error": {"code": "BAD_REQUEST", "detail": "PAN format must be ABCDE1234F"},
+            })
+        else:
+            indexes.setdefault(pan, []).append(index)
+
+    pending = iter(indexes)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        for pan in pending:
+            try:
+                result = await _local_result(pan, consent, reason)
+                if result is None:
+                    result = await _verify_upstream(pan, consent, reason)
+            except Exception as e:
+                logger.error(f"Bulk PAN verify exception: {e}")
+                result = {
+                    "verification": "error",
+                    "message": "Internal error during PAN verification",
+                    "error": {"code": "INTERNAL_ERROR", "detail": str(e)},
+                }
+            await results.put((pan, result))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(indexes)))]
+    try:
+        for _ in range(len(indexes)):
+            pan, result = await results.get()
+            for index in indexes[pan]:
+                yield _bulk_line(index, pan, result)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -12,40 +12,42 @@ Payment Flow:
 
 import uuid
 import logging
-import httpx
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 from app.config import get_settings
+from app.integrations.http_client import get_http_client
+from app.utils.token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
 # ── Token Cache (separate from AA) ───────────────────────────────────
-_upi_token_cache: dict = {"access_token": None, "expires_at": 0}
+SETU_TOKEN_TTL_SECONDS = 300
 
 
-async def _get_upi_token() -> str:
-    """Get or refresh Setu UPI auth token."""
+async def _login_setu_upi() -> Tuple[str, float]:
+    """Log in to Setu auth with the UPI credentials."""
     settings = get_settings()
-    now = datetime.utcnow().timestamp()
-
-    if _upi_token_cache["access_token"] and _upi_token_cache["expires_at"] > now:
-        return _upi_token_cache["access_token"]
-
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.SETU_AUTH_URL}/v1/users/login",
-            json={
-                "clientID": settings.SETU_UPI_CLIENT_ID,
-                "secret": settings.SETU_UPI_CLIENT_SECRET,
-                "grant_type": "client_credentials",
-            },
-            headers={"Content-Type": "application/json"},
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        _upi_token_cache["access_token"] = data["access_token"]
-        _upi_token_cache["expires_at"] = now + 280
-        return data["access_token"]
+    client = get_http_client("setu_auth")
+    resp = await client.post(
+        f"{settings.SETU_AUTH_URL}/v1/users/login",
+        json={
+            "clientID": settings.SETU_UPI_CLIENT_ID,
+            "secret": settings.SETU_UPI_CLIENT_SECRET,
+            "grant_type": "client_credentials",
+        },
+        headers={"Content-Type": "application/json"},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return data["access_token"], SETU_TOKEN_TTL_SECONDS
+
+
+_upi_token_cache = TokenCache("setu_upi", fetch=_login_setu_upi, refresh_margin=20, proactive_margin=60)
+
+
+async def _get_upi_token() -> str:
+    """Get the cached Setu UPI auth token (single-flight refresh)."""
+    return await _upi_token_cache.get()
 
 
 # ── Pricing ──────────────────────────────────────────────────────────
@@ -124,30 +126,30 @@ async def _setu_create_payment(
         "settlement": {"parts": [{"account": {"id": "primary"}}]},
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.SETU_UPI_BASE_URL}/payment-links",
-            json=payload,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        logger.info(f"Setu payment link created: {data.get('id')}")
-        return {
-            "id": data.get("id"),
-            "user_id": user_id,
-            "tier": tier,
-            "billing_period": billing_period,
-            "amount": amount,
-            "currency": "INR",
-            "status": data.get("status", "CREATED"),
-            "payment_link": data.get("paymentLink", {}).get("shortUrl", ""),
-            "upi_link": data.get("paymentLink", {}).get("upiLink", ""),
-            "created_at": datetime.utcnow().isoformat(),
-        }
+    client = get_http_client("setu_upi")
+    resp = await client.post(
+        f"{settings.SETU_UPI_BASE_URL}/payment-links",
+        json=payload,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    logger.info(f"Setu payment link created: {data.get('id')}")
+    return {
+        "id": data.get("id"),
+        "user_id": user_id,
+        "tier": tier,
+        "billing_period": billing_period,
+        "amount": amount,
+        "currency": "INR",
+        "status": data.get("status", "CREATED"),
+        "payment_link": data.get("paymentLink", {}).get("shortUrl", ""),
+        "upi_link": data.get("paymentLink", {}).get("upiLink", ""),
+        "created_at": datetime.utcnow().isoformat(),
+    }
 
 
 async def _setu_get_payment(payment_id: str) -> dict:
@@ -155,16 +157,16 @@ async def _setu_get_payment(payment_id: str) -> dict:
     settings = get_settings()
     token = await _get_upi_token()
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{settings.SETU_UPI_BASE_URL}/payment-links/{payment_id}",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-        )
-        resp.raise_for_status()
-        return resp.json()
+    client = get_http_client("setu_upi")
+    resp = await client.get(
+        f"{settings.SETU_UPI_BASE_URL}/payment-links/{payment_id}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 # ── Public API (auto-selects mock vs real) ───────────────────────────
@@ -0,0 +1,186 @@
+"""Dashboard statistics backed by the daily_stats materialized view.
+
+The view (migration 008) holds one row per day with user, health-check and
+callback counters, so the overview is a single aggregate over at most a
+few hundred rows regardless of table sizes. ``StatsRefresher`` refreshes
+it concurrently on a schedule from the app lifespan; figures can lag
+writes by up to STATS_REFRESH_INTERVAL_SECONDS.
+
+Every worker process runs a refresher, but only the one holding the
+``STATS_REFRESH_LOCK_KEY`` advisory lock refreshes. The lock lives on the
+refresher's own connection, so if that worker exits, another takes over
+at its next tick.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Column, Date, Float, Integer, MetaData, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.config import get_settings
+from app.schemas.internal import StatsOverview
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key held by the worker that refreshes daily_stats
+STATS_REFRESH_LOCK_KEY = 0x5354_4154  # "STAT"
+
+# Not part of Base.metadata: it is a materialized view, created by migration 008.
+daily_stats = Table(
+    "daily_stats",
+    MetaData(),
+    Column("day", Date, primary_key=True),
+    Column("users", Integer),
+    Column("health_checks", Integer),
+    Column("score_sum", Integer),
+    Column("savings_sum", Float),
+    Column("callbacks", Integer),
+    Column("callbacks_pending", Integer),
+    Column("callbacks_confirmed", Integer),
+    Column("callbacks_completed", Integer),
+    Column("callbacks_cancelled", Integer),
+)
+
+
+# ─── Queries ─────────────────────────────────────────────────────────────────
+
+async def get_overview(
+    db: AsyncSession,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> StatsOverview:
+    """Aggregate the dashboard counters over an optional inclusive date range."""
+    c = daily_stats.c
+    query = select(
+        func.coalesce(func.sum(c.users), 0),
+        func.coalesce(func.sum(c.health_checks), 0),
+        func.coalesce(func.sum(c.score_sum), 0),
+        func.sum(c.savings_sum),
+        func.coalesce(func.sum(c.callbacks), 0),
+        func.coalesce(func.sum(c.callbacks_pending), 0),
+        func.coalesce(func.sum(c.callbacks_confirmed), 0),
+        func.coalesce(func.sum(c.callbacks_completed), 0),
+        func.coalesce(func.sum(c.callbacks_cancelled), 0),
+    )
+    if start is not None:
+        query = query.where(c.day >= start)
+    if end is not None:
+        query = query.where(c.day <= end)
+
+    (users, checks, score_sum, savings, callbacks,
+     pending, confirmed, completed, cancelled) = (await db.execute(query)).one()
+
+    avg_score = score_sum / checks if checks else None
+    return StatsOverview(
+        total_users=users,
+        total_health_checks=checks,
+        total_callbacks=callbacks,
+        avg_health_score=round(avg_score, 1) if avg_score else None,
+        total_savings_found=round(savings, 0) if savings else None,
+        callbacks_pending=pending,
+        callbacks_confirmed=confirmed,
+        callbacks_completed=completed,
+        callbacks_cancelled=cancelled,
+    )
+
+
+# ─── Refresh ─────────────────────────────────────────────────────────────────
+
+_REFRESH_SQL = text("REFRESH MATERIALIZED VIEW CONCURRENTLY daily_stats")
+
+
+async def refresh_daily_stats(engine: AsyncEngine) -> None:
+    """Rebuild the view without blocking readers."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(_REFRESH_SQL)
+
+
+class StatsRefresher:
+    """Background task that refreshes daily_stats every ``interval`` seconds.
+
+    Only the worker holding the refresh advisory lock refreshes; the others
+    retry the lock each interval.
+    """
+
+    def __init__(self, engine: Optional[AsyncEngine] = None, interval: Optional[float] = None):
+        self._engine = engine
+        self.interval = interval or get_settings().STATS_REFRESH_INTERVAL_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._lock_conn: Optional[AsyncConnection] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            from app.database import async_engine
+            self._engine = async_engine
+        return self._engine
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release_lock()
+
+    async def _acquire_lock(self) -> bool:
+        """Take the refresh lock on a dedicated connection; False if another worker holds it."""
+        if self._lock_conn is not None:
+            return True
+        conn = await self.engine.connect()
+        try:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": STATS_REFRESH_LOCK_KEY}
+            )
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._lock_conn = conn
+        logger.info("[STATS] This worker now refreshes daily_stats")
+        return True
+
+    async def _release_lock(self, broken: bool = False) -> None:
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is None:
+            return
+        if not broken:
+            try:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": STATS_REFRESH_LOCK_KEY}
+                )
+            except Exception as e:
+                logger.warning(f"[STATS] Failed to release refresh lock: {e}")
+                broken = True
+        try:
+            if broken:
+                # Never return a connection that may still hold the lock to the pool
+                await conn.invalidate()
+        finally:
+            await conn.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._acquire_lock():
+                    await self._lock_conn.execute(_REFRESH_SQL)
+            except Exception as e:
+                logger.error(f"[STATS] daily_stats refresh failed: {e}")
+                await self._release_lock(broken=True)
+            await asyncio.sleep(self.interval)
+
+
+stats_refresher = StatsRefresher()
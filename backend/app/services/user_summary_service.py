@@ -0,0 +1,59 @@
+"""Read-through cache of user display fields for the admin API.
+
+Admin lists show the user's name and phone next to every callback and
+health check. ``get_user_summaries`` loads the users for a whole page with
+one ``IN`` query and keeps them in a short-TTL cache shared by the admin
+endpoints, so repeated page loads mostly skip the query entirely.
+
+The cache is per worker: ``invalidate_user`` clears the local entry when a
+user changes, and USER_SUMMARY_CACHE_TTL_SECONDS bounds staleness elsewhere.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class UserRef:
+    name: str
+    phone: str
+
+
+UNKNOWN_USER = UserRef(name="Unknown", phone="Unknown")
+
+_settings = get_settings()
+user_summary_cache = TTLCache(
+    maxsize=_settings.USER_SUMMARY_CACHE_SIZE,
+    ttl=_settings.USER_SUMMARY_CACHE_TTL_SECONDS,
+)
+
+
+async def get_user_summaries(db: AsyncSession, user_ids: Iterable[UUID]) -> Dict[UUID, UserRef]:
+    """Name and phone for each user ID, with at most one query for the misses.
+
+    Users that do not exist map to ``UNKNOWN_USER``.
+    """
+    wanted = set(user_ids)
+    found = user_summary_cache.get_many(wanted)
+    missing = wanted - found.keys()
+
+    if missing:
+        rows = await db.execute(select(User.id, User.name, User.phone).where(User.id.in_(missing)))
+        for user_id, name, phone in rows:
+            ref = UserRef(name=name, phone=phone)
+            user_summary_cache.set(user_id, ref)
+            found[user_id] = ref
+
+    return {user_id: found.get(user_id, UNKNOWN_USER) for user_id in wanted}
+
+
+def invalidate_user(user_id: UUID) -> None:
+    user_summary_cache.invalidate(user_id)
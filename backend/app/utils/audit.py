@@ -1,35 +1,177 @@
-"""Audit logging utility for security-sensitive events."""
+"""Audit logging utility for security-sensitive events.
 
+Events are written one of three ways:
+
+- ``commit=False``: added to the caller's session and written with the
+  caller's own transaction.
+- Durable (compliance-critical event types, or ``durable=True``): added
+  and committed synchronously before ``log_event`` returns.
+- Everything else (OTP sends/verifies, rate-limit hits, ...): queued on the
+  process-wide ``AuditWriter``, which flushes batches with one multi-row
+  INSERT when the buffer fills or the flush interval elapses, and drains
+  on shutdown. Until the writer is started (scripts, tests), these fall
+  back to the synchronous path.
+"""
+
+import asyncio
+import logging
+import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.config import get_settings
 from app.models.audit_log import AuditLog
 
+logger = logging.getLogger(__name__)
+
+# Events that must be on disk before the request returns.
+DURABLE_EVENT_TYPES = frozenset({
+    "cibil_pull",
+    "advisory_purchase",
+    "user_delete_request",
+    "shield_consent",
+    "subscription_upgrade",
+    "settlement_intake",
+    "admin_export",
+})
+
+
+# ─── Buffered writer ──────────────────────────────────────────────────────────
+
+class AuditWriter:
+    """In-memory audit buffer flushed in batches by a background task."""
+
+    def __init__(
+        self,
+        engine: Optional[AsyncEngine] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self._engine = engine
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        self.max_pending = max_pending or settings.AUDIT_MAX_PENDING
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            from app.database import async_engine
+            self._engine = async_engine
+        return self._engine
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
 
-def log_event(
-    db: Session,
+    async def stop(self) -> None:
+        """Stop the flush loop and write everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            if not await self.flush():
+                logger.error(f"[AUDIT] Dropping {len(self._pending)} events on shutdown.")
+                self._pending.clear()
+
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        self._pending.append(row)
+        if len(self._pending) > self.max_pending:
+            dropped = len(self._pending) - self.max_pending
+            del self._pending[:dropped]
+            logger.error(f"[AUDIT] Buffer full; dropped {dropped} oldest events.")
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """Write up to ``batch_size`` buffered events. Returns False on failure."""
+        if not self._pending:
+            return True
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch = self._pending[: self.batch_size]
+            del self._pending[: len(batch)]
+            try:
+                async with self.engine.begin() as conn:
+                    await conn.execute(insert(AuditLog), batch)
+            except Exception as e:
+                # Put the batch back in order; the next tick retries it.
+                self._pending[:0] = batch
+                logger.error(f"[AUDIT] Failed to flush {len(batch)} events: {e}")
+                return False
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # Size trigger woke us, or the interval elapsed: write full
+            # batches and then the partial remainder.
+            while self._pending:
+                if not await self.flush():
+                    break
+
+
+audit_writer = AuditWriter()
+
+
+# ─── API ──────────────────────────────────────────────────────────────────────
+
+async def log_event(
+    db: AsyncSession,
     event_type: str,
     user_id: Optional[UUID] = None,
     phone: Optional[str] = None,
     ip_address: Optional[str] = None,
     metadata: Optional[dict] = None,
+    commit: bool = True,
+    durable: Optional[bool] = None,
 ) -> AuditLog:
     """
     Log a security-auditable event.
 
+    With ``commit=False`` the event is only added to the session, so it is
+    written atomically with the caller's own unit of work. ``durable``
+    overrides whether the event is written synchronously (defaults to
+    membership in DURABLE_EVENT_TYPES).
+
     Event types:
         - otp_send: OTP requested
         - otp_verify_success: OTP verified successfully
         - otp_verify_fail: OTP verification failed
         - cibil_pull: CIBIL report pulled
         - cibil_pull_rate_limited: Rate limit hit for CIBIL pull
+        - cibil_report_reused: Unexpired CIBIL report re-scored instead of pulled
         - callback_request: Callback scheduled
         - advisory_purchase: Advisory plan purchased
         - user_delete_request: User requested data deletion
+        - admin_export: Admin bulk export downloaded
     """
     audit = AuditLog(
+        id=uuid.uuid4(),
         event_type=event_type,
         user_id=user_id,
         phone=phone,
@@ -37,7 +179,24 @@ def log_event(
         metadata_json=metadata or {},
         created_at=datetime.utcnow(),
     )
+    if not commit:
+        db.add(audit)
+        return audit
+
+    if durable is None:
+        durable = event_type in DURABLE_EVENT_TYPES
+    if not durable and audit_writer.running:
+        audit_writer.enqueue({
+            "id": audit.id,
+            "event_type": audit.event_type,
+            "user_id": audit.user_id,
+            "phone": audit.phone,
+            "ip_address": audit.ip_address,
+            "metadata_json": audit.metadata_json,
+            "created_at": audit.created_at,
+        })
+        return audit
+
     db.add(audit)
-    db.commit()
-    db.refresh(audit)
+    await db.commit()
     return audit
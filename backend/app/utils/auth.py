@@ -1,10 +1,13 @@
-"""API key authentication for internal endpoints."""
+"""API key authentication for internal endpoints and webhook senders."""
+
+import hmac
 
 from fastapi import Security, HTTPException, status
 from fastapi.security import APIKeyHeader
 from app.config import get_settings
 
 _api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+_webhook_secret_header = APIKeyHeader(name="X-Webhook-Secret", auto_error=False)
 
 
 async def require_api_key(
@@ -26,3 +29,34 @@ async def require_api_key(
         )
 
     return api_key
+
+
+async def require_setu_aa_webhook_secret(
+    secret: str | None = Security(_webhook_secret_header),
+) -> None:
+    """Check that an AA notification carries SETU_AA_WEBHOOK_SECRET.
+
+    Without a configured secret, notifications are only accepted from the
+    mock provider.
+    """
+    settings = get_settings()
+
+    if not settings.SETU_AA_WEBHOOK_SECRET:
+        if settings.SETU_AA_PROVIDER == "setu":
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="SETU_AA_WEBHOOK_SECRET is not configured.",
+            )
+        return
+
+    if not secret:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing webhook secret. Include X-Webhook-Secret header.",
+        )
+
+    if not hmac.compare_digest(secret.encode(), settings.SETU_AA_WEBHOOK_SECRET.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid webhook secret.",
+        )
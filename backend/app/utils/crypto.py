@@ -0,0 +1,296 @@
+"""AES-256-GCM encryption with versioned keys, a thread pool and chunked streams.
+
+Token formats (all ASCII, stored in Text columns):
+
+- ``g1.<kid>.<b64(nonce + ciphertext + tag)>`` — one GCM message.
+- ``s1.<kid>.<b64(prefix)>.<b64(segment)>.<b64(segment)>…`` — a chunked
+  stream. Each segment is GCM with nonce ``prefix + index`` and the final
+  segment authenticated as such, so segments cannot be reordered, dropped,
+  truncated or spliced in from another stream.
+- Legacy ``b64(iv + ciphertext)`` — AES-256-CBC written before key
+  versioning (with key version 1); decrypt only.
+
+``<kid>`` is the key version. New data uses AES_KEY_VERSION; older
+versions stay decryptable while listed in AES_RETIRED_KEYS, so keys can be
+rotated without re-encrypting existing rows first.
+
+Key material and cipher objects are built once per process (``keyring()``).
+The async helpers run payloads above CRYPTO_OFFLOAD_THRESHOLD_BYTES on a
+bounded thread pool (OpenSSL releases the GIL) so a large bureau report
+does not stall other requests on the event loop.
+"""
+
+import asyncio
+import base64
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.config import get_settings
+
+GCM_PREFIX = "g1"
+STREAM_PREFIX = "s1"
+LEGACY_KEY_VERSION = 1
+NONCE_BYTES = 12
+STREAM_PREFIX_BYTES = 8  # + 4-byte segment counter = 12-byte nonce
+_LAST_SEGMENT = b"\x01"
+_MORE_SEGMENTS = b"\x00"
+
+
+class DecryptionError(ValueError):
+    """Ciphertext is malformed, tampered with, or uses an unknown key version."""
+
+
+def _key_bytes(key_hex: str) -> bytes:
+    """32-byte AES-256 key from hex, zero-padded as the original CBC key was."""
+    return bytes.fromhex(key_hex).ljust(32, b"\0")[:32]
+
+
+# ─── Keyring ──────────────────────────────────────────────────────────────────
+
+class Keyring:
+    """Cipher objects per key version; ``current`` encrypts, all decrypt."""
+
+    def __init__(self, current: int, keys: Dict[int, bytes]):
+        if current not in keys:
+            raise ValueError(f"No key configured for AES_KEY_VERSION {current}")
+        self.current = current
+        self._keys = keys
+        self._aead = {version: AESGCM(key) for version, key in keys.items()}
+
+    @classmethod
+    def from_settings(cls) -> "Keyring":
+        settings = get_settings()
+        keys: Dict[int, bytes] = {}
+        for entry in filter(None, (e.strip() for e in settings.AES_RETIRED_KEYS.split(","))):
+            version, _, key_hex = entry.partition(":")
+            keys[int(version)] = _key_bytes(key_hex)
+        keys[settings.AES_KEY_VERSION] = _key_bytes(settings.AES_ENCRYPTION_KEY)
+        return cls(settings.AES_KEY_VERSION, keys)
+
+    def aead(self, version: int) -> AESGCM:
+        try:
+            return self._aead[version]
+        except KeyError:
+            raise DecryptionError(f"Unknown key version: {version}") from None
+
+    def key(self, version: int) -> bytes:
+        try:
+            return self._keys[version]
+        except KeyError:
+            raise DecryptionError(f"Unknown key version: {version}") from None
+
+
+@lru_cache()
+def keyring() -> Keyring:
+    """Process-wide keyring built from settings on first use."""
+    return Keyring.from_settings()
+
+
+def reset_keyring() -> None:
+    """Rebuild the keyring on next use (after changing key settings, e.g. in tests)."""
+    keyring.cache_clear()
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _unb64(data: str) -> bytes:
+    try:
+        return base64.b64decode(data, validate=True)
+    except ValueError as e:
+        raise DecryptionError("Malformed ciphertext") from e
+
+
+def _as_bytes(data: Union[str, bytes]) -> bytes:
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+# ─── One-shot ─────────────────────────────────────────────────────────────────
+
+def encrypt(plaintext: Union[str, bytes]) -> str:
+    ring = keyring()
+    nonce = os.urandom(NONCE_BYTES)
+    sealed = ring.aead(ring.current).encrypt(nonce, _as_bytes(plaintext), None)
+    return f"{GCM_PREFIX}.{ring.current}.{_b64(nonce + sealed)}"
+
+
+def decrypt(token: str) -> bytes:
+    """Plaintext of any token format. Raises DecryptionError."""
+    if token.startswith(STREAM_PREFIX + "."):
+        return b"".join(decrypt_chunks(token))
+    if token.startswith(GCM_PREFIX + "."):
+        version, body = _parse_header(token, parts=3)
+        raw = _unb64(body)
+        try:
+            return keyring().aead(version).decrypt(raw[:NONCE_BYTES], raw[NONCE_BYTES:], None)
+        except InvalidTag as e:
+            raise DecryptionError("Ciphertext failed authentication") from e
+    return _decrypt_legacy_cbc(token)
+
+
+def _parse_header(token: str, parts: int) -> Tuple[int, str]:
+    fields = token.split(".", parts - 1)
+    if len(fields) != parts:
+        raise DecryptionError("Malformed ciphertext")
+    try:
+        version = int(fields[1])
+    except ValueError as e:
+        raise DecryptionError("Malformed key version") from e
+    return version, fields[2]
+
+
+def _decrypt_legacy_cbc(token: str) -> bytes:
+    raw = _unb64(token)
+    if len(raw) < 32 or len(raw) % 16:
+        raise DecryptionError("Malformed ciphertext")
+    key = keyring().key(LEGACY_KEY_VERSION)
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(raw[:16]), backend=default_backend()).decryptor()
+    padded = decryptor.update(raw[16:]) + decryptor.finalize()
+    unpadder = padding.PKCS7(128).unpadder()
+    try:
+        return unpadder.update(padded) + unpadder.finalize()
+    except ValueError as e:
+        raise DecryptionError("Ciphertext failed to decrypt") from e
+
+
+# ─── Chunked streams ──────────────────────────────────────────────────────────
+
+class StreamEncryptor:
+    """Encrypts a sequence of chunks into the pieces of one ``s1`` token."""
+
+    def __init__(self):
+        ring = keyring()
+        self._aead = ring.aead(ring.current)
+        self._prefix = os.urandom(STREAM_PREFIX_BYTES)
+        self._index = 0
+        self.header = f"{STREAM_PREFIX}.{ring.current}.{_b64(self._prefix)}"
+
+    def seal(self, chunk: bytes, last: bool) -> str:
+        """``.<segment>`` to append to the header."""
+        nonce = self._prefix + self._index.to_bytes(4, "big")
+        self._index += 1
+        return "." + _b64(self._aead.encrypt(nonce, chunk, _LAST_SEGMENT if last else _MORE_SEGMENTS))
+
+
+def encrypt_chunks(chunks: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Yield the pieces of an ``s1`` token; ``"".join`` them to store it."""
+    encryptor = StreamEncryptor()
+    yield encryptor.header
+    pending: Optional[bytes] = None
+    for chunk in chunks:
+        if pending is not None:
+            yield encryptor.seal(pending, last=False)
+        pending = _as_bytes(chunk)
+    yield encryptor.seal(pending or b"", last=True)
+
+
+def decrypt_chunks(token: str) -> Iterator[bytes]:
+    """Yield the plaintext of an ``s1`` token segment by segment."""
+    version, rest = _parse_header(token, parts=3)
+    prefix_b64, _, body = rest.partition(".")
+    prefix = _unb64(prefix_b64)
+    if len(prefix) != STREAM_PREFIX_BYTES or not body:
+        raise DecryptionError("Malformed ciphertext")
+    aead = keyring().aead(version)
+    segments = body.split(".")
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        nonce = prefix + index.to_bytes(4, "big")
+        try:
+            yield aead.decrypt(nonce, _unb64(segment), _LAST_SEGMENT if last else _MORE_SEGMENTS)
+        except InvalidTag as e:
+            raise DecryptionError("Stream segment failed authentication") from e
+
+
+def iter_chunks(data: Union[str, bytes], size: int) -> Iterator[bytes]:
+    data = _as_bytes(data)
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+# ─── Async ────────────────────────────────────────────────────────────────────
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings().CRYPTO_THREADS, thread_name_prefix="crypto"
+        )
+    return _executor
+
+
+def shutdown_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+async def _offload(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_pool(), fn, *args)
+
+
+async def encrypt_async(plaintext: Union[str, bytes]) -> str:
+    """``encrypt`` off the event loop for large payloads.
+
+    Payloads larger than CRYPTO_CHUNK_BYTES become an ``s1`` stream sealed
+    one chunk per pool task, so one huge report cannot occupy a pool thread
+    for its whole length while other requests queue behind it.
+    """
+    settings = get_settings()
+    data = _as_bytes(plaintext)
+    if len(data) < settings.CRYPTO_OFFLOAD_THRESHOLD_BYTES:
+        return encrypt(data)
+    if len(data) <= settings.CRYPTO_CHUNK_BYTES:
+        return await _offload(encrypt, data)
+    chunks = _aiter(iter_chunks(data, settings.CRYPTO_CHUNK_BYTES))
+    return "".join([piece async for piece in encrypt_stream(chunks)])
+
+
+async def decrypt_async(token: str) -> bytes:
+    """``decrypt`` off the event loop for large tokens."""
+    if len(token) < get_settings().CRYPTO_OFFLOAD_THRESHOLD_BYTES:
+        return decrypt(token)
+    if token.startswith(STREAM_PREFIX + "."):
+        return b"".join([chunk async for chunk in decrypt_stream(token)])
+    return await _offload(decrypt, token)
+
+
+async def encrypt_stream(chunks: AsyncIterable[Union[str, bytes]]) -> AsyncIterator[str]:
+    """Async ``encrypt_chunks``: each chunk is sealed on the thread pool."""
+    encryptor = StreamEncryptor()
+    yield encryptor.header
+    pending: Optional[bytes] = None
+    async for chunk in chunks:
+        if pending is not None:
+            yield await _offload(encryptor.seal, pending, False)
+        pending = _as_bytes(chunk)
+    yield await _offload(encryptor.seal, pending or b"", True)
+
+
+async def decrypt_stream(token: str) -> AsyncIterator[bytes]:
+    """Async ``decrypt_chunks``: each segment is opened on the thread pool."""
+    segments = decrypt_chunks(token)
+    sentinel = object()
+    while True:
+        chunk = await _offload(next, segments, sentinel)
+        if chunk is sentinel:
+            return
+        yield chunk
+
+
+async def _aiter(items: Iterable) -> AsyncIterator:
+    for item in items:
+        yield item
@@ -0,0 +1,301 @@
+"""Background job queue with a pluggable backend and job store.
+
+Request handlers ``submit`` a job and return its ID straight away; worker
+tasks started from the app lifespan run the registered handler for the
+job's ``kind`` and record its progress in a ``JobStore`` that clients poll
+(or follow over Server-Sent Events).
+
+- ``InProcessJobQueue`` (default): an ``asyncio.Queue`` consumed by
+  JOB_WORKERS tasks in the same process.
+- ``RedisJobQueue``: a Redis list shared by every worker process. Payloads
+  are encrypted with ``encrypt_data`` since they can carry PAN. A worker
+  claims a job by moving it onto a processing list and removes it from there
+  once the job finishes, so jobs held by a worker that died can be requeued.
+
+Handlers take the job payload and return a JSON-serialisable result dict.
+Raise ``JobFailed`` to record an expected failure with an HTTP-style status
+code; any other exception is logged and recorded as a 500. A job interrupted
+by ``stop()`` is recorded as a 503.
+
+Usage:
+    queue = get_job_queue()
+    queue.register("health_check", run_health_check_job)
+    await queue.start()
+    job = await queue.submit("health_check", {...})
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATUSES = frozenset({SUCCEEDED, FAILED})
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobFailed(Exception):
+    """Expected job failure, reported to the client with ``status_code``."""
+
+    def __init__(self, detail: str, status_code: int = 500):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = QUEUED
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    updated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ─── Stores ───────────────────────────────────────────────────────────────────
+
+class JobStore(ABC):
+    """Where job status and results are kept until JOB_RESULT_TTL_SECONDS."""
+
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local store (default); pairs with ``InProcessJobQueue``."""
+
+    def __init__(self, ttl: float, maxsize: int = 100_000):
+        self._jobs = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def save(self, job: Job) -> None:
+        self._jobs.set(job.id, Job(**job.to_dict()))
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        return Job(**job.to_dict()) if job else None
+
+
+class RedisJobStore(JobStore):
+    """Shares job status across workers via any ``redis.asyncio``-compatible client."""
+
+    def __init__(self, client: Any, ttl: float, prefix: str = "exitdebt:job:"):
+        self._client = client
+        self._ttl = max(1, int(ttl))
+        self._prefix = prefix
+
+    async def save(self, job: Job) -> None:
+        await self._client.set(self._prefix + job.id, json.dumps(job.to_dict()), ex=self._ttl)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        raw = await self._client.get(self._prefix + job_id)
+        return Job(**json.loads(raw)) if raw else None
+
+
+# ─── Queues ───────────────────────────────────────────────────────────────────
+
+class JobQueue(ABC):
+    """Runs registered handlers for submitted jobs on ``workers`` tasks."""
+
+    def __init__(self, store: JobStore, workers: int = 4):
+        self.store = store
+        self.workers = workers
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = Job(id=str(uuid.uuid4()), kind=kind)
+        await self.store.save(job)
+        await self._put(job.id, kind, payload)
+        return job
+
+    async def start(self) -> None:
+        if not self.running:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                item = await self._get()
+            except Exception as e:
+                logger.error(f"[JOBS] Failed to fetch next job: {e}")
+                await asyncio.sleep(1)
+                continue
+            if item is not None:
+                try:
+                    await self.run(*item)
+                finally:
+                    await self._ack(item[0])
+
+    async def run(self, job_id: str, kind: str, payload: Dict[str, Any]) -> Job:
+        """Run one job and record its outcome."""
+        job = await self.store.get(job_id) or Job(id=job_id, kind=kind)
+        await self._update(job, RUNNING)
+        try:
+            result = await self._handlers[kind](payload)
+        except asyncio.CancelledError:
+            # Shutting down mid-job: don't leave it "running" for clients polling it
+            await self._update(job, FAILED, error={"status_code": 503, "detail": "Worker shut down."})
+            raise
+        except JobFailed as e:
+            await self._update(job, FAILED, error={"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.exception(f"[JOBS] {kind} job {job_id} crashed: {e}")
+            await self._update(job, FAILED, error={"status_code": 500, "detail": "Internal error."})
+        else:
+            await self._update(job, SUCCEEDED, result=result)
+        return job
+
+    async def _update(self, job: Job, status: str, **fields: Any) -> None:
+        job.status = status
+        job.updated_at = datetime.utcnow().isoformat()
+        for name, value in fields.items():
+            setattr(job, name, value)
+        await self.store.save(job)
+
+    @abstractmethod
+    async def _put(self, job_id: str, kind: str, payload: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def _get(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """Next job, or None if nothing arrived within the backend's poll timeout."""
+
+    async def _ack(self, job_id: str) -> None:
+        """Called once a job taken from ``_get`` has finished (in any state)."""
+
+
+class InProcessJobQueue(JobQueue):
+    """asyncio.Queue in this process; queued jobs are lost on restart."""
+
+    def __init__(self, store: JobStore, workers: int = 4):
+        super().__init__(store, workers)
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    async def _put(self, job_id: str, kind: str, payload: Dict[str, Any]) -> None:
+        self.queue.put_nowait((job_id, kind, payload))
+
+    async def _get(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        return await self.queue.get()
+
+
+class RedisJobQueue(JobQueue):
+    """Redis list shared by all processes; survives restarts of the API workers."""
+
+    def __init__(self, client: Any, store: JobStore, workers: int = 4, key: str = "exitdebt:jobs"):
+        super().__init__(store, workers)
+        self._client = client
+        self._key = key
+        self._processing_key = f"{key}:processing"
+        self._claimed: Dict[str, str] = {}  # job ID -> raw message on the processing list
+
+    async def _put(self, job_id: str, kind: str, payload: Dict[str, Any]) -> None:
+        from app.utils.security import encrypt_data
+
+        message = {"id": job_id, "kind": kind, "payload": encrypt_data(json.dumps(payload))}
+        await self._client.lpush(self._key, json.dumps(message))
+
+    async def _get(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        from app.utils.security import decrypt_data
+
+        raw = await self._client.blmove(self._key, self._processing_key, 1, src="RIGHT", dest="LEFT")
+        if not raw:
+            return None
+        message = json.loads(raw)
+        self._claimed[message["id"]] = raw
+        return message["id"], message["kind"], json.loads(decrypt_data(message["payload"]))
+
+    async def _ack(self, job_id: str) -> None:
+        raw = self._claimed.pop(job_id, None)
+        if raw is not None:
+            await self._client.lrem(self._processing_key, 1, raw)
+
+    async def requeue_unfinished(self) -> int:
+        """Put jobs claimed by workers that died back on the queue; returns how many.
+
+        Only safe while no worker is running anywhere (e.g. before the first
+        worker starts after a deploy), since live workers' jobs are on the
+        same processing list.
+        """
+        moved = 0
+        while await self._client.lmove(self._processing_key, self._key, src="RIGHT", dest="RIGHT"):
+            moved += 1
+        if moved:
+            logger.warning(f"[JOBS] Requeued {moved} unfinished job(s)")
+        return moved
+
+
+_default_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Queue selected by JOB_QUEUE_BACKEND ("memory" or "redis")."""
+    global _default_queue
+    if _default_queue is None:
+        settings = get_settings()
+        if settings.JOB_QUEUE_BACKEND == "redis":
+            from app.utils.redis_client import get_redis
+            client = get_redis()
+            store = RedisJobStore(client, ttl=settings.JOB_RESULT_TTL_SECONDS)
+            _default_queue = RedisJobQueue(client, store, workers=settings.JOB_WORKERS)
+        else:
+            store = InMemoryJobStore(ttl=settings.JOB_RESULT_TTL_SECONDS)
+            _default_queue = InProcessJobQueue(store, workers=settings.JOB_WORKERS)
+    return _default_queue
+
+
+def set_job_queue(queue: Optional[JobQueue]) -> None:
+    """Override the default queue (useful for testing)."""
+    global _default_queue
+    _default_queue = queue
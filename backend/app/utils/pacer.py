@@ -0,0 +1,39 @@
+"""Spaces outbound calls to stay within an upstream QPS budget.
+
+Unlike ``RateLimiter`` (which rejects callers over a quota), a ``Pacer``
+makes callers wait for their slot: each ``wait()`` reserves the next free
+slot, ``1 / rate`` seconds after the previous one, and sleeps until it.
+Share one pacer between everything that draws on the same budget.
+
+Usage:
+    pacer = Pacer(rate=50)
+    await pacer.wait()
+    await client.post(...)
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+
+class Pacer:
+    def __init__(
+        self,
+        rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.rate = rate
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot = 0.0
+
+    async def wait(self) -> None:
+        """Return once this caller's slot has come. A rate of 0 or less disables pacing."""
+        if self.rate <= 0:
+            return
+        now = self._clock()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await self._sleep(slot - now)
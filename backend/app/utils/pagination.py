@@ -0,0 +1,141 @@
+"""Page-number and keyset (cursor) pagination for admin list endpoints.
+
+Page mode is the original ``OFFSET (page-1)*page_size`` plus an exact
+``count()``; both cost grows with the table and the page number.
+
+Cursor mode orders by ``(timestamp, id)`` descending and continues from the
+last row of the previous page with a row-value comparison, which is an
+index range scan on a composite ``(timestamp, id)`` index no matter how
+deep the page is. Cursors are opaque URL-safe base64 strings. The total is
+skipped, or for unfiltered lists estimated from ``pg_class.reltuples``.
+"""
+
+import base64
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.schemas.internal import PaginatedResponse
+
+PAGE = "page"
+CURSOR = "cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+# ─── Cursors ───────────────────────────────────────────────────────────────
+
+def encode_cursor(ts: datetime, row_id: UUID) -> str:
+    payload = json.dumps({"t": ts.isoformat(), "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), UUID(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor.") from e
+
+
+# ─── Totals ────────────────────────────────────────────────────────────────
+
+async def estimate_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """Planner row estimate for a whole table; None where unavailable.
+
+    Kept fresh by autovacuum/ANALYZE; -1 means the table was never analyzed.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+    estimate = await db.scalar(
+        text("SELECT reltuples FROM pg_class WHERE relname = :table"),
+        {"table": table_name},
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+# ─── Paginate ──────────────────────────────────────────────────────────────
+
+@dataclass
+class PageResult:
+    rows: List[Any]
+    page_size: int
+    total: Optional[int] = None
+    page: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
+
+    def response(self, items: List[dict]) -> PaginatedResponse:
+        total_pages = None
+        if self.total is not None:
+            total_pages = math.ceil(self.total / self.page_size) if self.total > 0 else 0
+        return PaginatedResponse(
+            items=items,
+            total=self.total,
+            page=self.page,
+            page_size=self.page_size,
+            total_pages=total_pages,
+            next_cursor=self.next_cursor,
+            total_estimated=self.total_estimated,
+        )
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    ts_col: ColumnElement,
+    id_col: ColumnElement,
+    *,
+    page_size: int,
+    mode: str = PAGE,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    estimate_table: Optional[str] = None,
+) -> PageResult:
+    """Run ``query`` newest-first in page or cursor mode.
+
+    ``estimate_table`` enables an approximate total in cursor mode; pass it
+    only when ``query`` is unfiltered, since the estimate covers the table.
+    Raises InvalidCursor for a malformed cursor.
+    """
+    query = query.order_by(ts_col.desc(), id_col.desc())
+
+    if mode == PAGE and cursor is None:
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        rows = (await db.scalars(query.offset((page - 1) * page_size).limit(page_size))).all()
+        return PageResult(rows=rows, page_size=page_size, total=total, page=page)
+
+    if cursor is not None:
+        ts, row_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(ts_col, id_col) < tuple_(literal(ts, ts_col.type), literal(row_id, id_col.type))
+        )
+
+    # One extra row tells us whether another page exists
+    rows = (await db.scalars(query.limit(page_size + 1))).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, ts_col.key), getattr(last, id_col.key))
+
+    total = await estimate_count(db, estimate_table) if estimate_table else None
+    return PageResult(
+        rows=rows,
+        page_size=page_size,
+        next_cursor=next_cursor,
+        total=total,
+        total_estimated=total is not None,
+    )
@@ -0,0 +1,24 @@
+"""Phone number normalization for storage and search.
+
+Users type numbers as "+91 98765-43210", "098765 43210" or "9876543210".
+``normalize_phone`` reduces all of them to the bare 10-digit national
+number stored in ``users.phone_normalized``, which the admin search
+matches against through trigram and prefix indexes.
+"""
+
+import re
+
+_NON_DIGITS = re.compile(r"\D")
+
+COUNTRY_CODE = "91"
+NATIONAL_LENGTH = 10
+
+
+def normalize_phone(phone: str | None) -> str:
+    """Digits only, without the +91 / 0 prefix; "" if there are no digits."""
+    digits = _NON_DIGITS.sub("", phone or "")
+    if len(digits) == NATIONAL_LENGTH + len(COUNTRY_CODE) and digits.startswith(COUNTRY_CODE):
+        return digits[len(COUNTRY_CODE):]
+    if len(digits) == NATIONAL_LENGTH + 1 and digits.startswith("0"):
+        return digits[1:]
+    return digits
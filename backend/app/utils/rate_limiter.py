@@ -1,47 +1,196 @@
-"""Rate limiter for CIBIL pulls — 3 pulls per 24 hours per phone number."""
+"""Rate limiter for CIBIL pulls — 3 pulls per 24 hours per phone number.
+
+The limiter delegates to a pluggable backend selected by RATE_LIMIT_BACKEND:
+
+- "memory": per-process deques, capped at the limit and swept lazily.
+- "redis": a sliding-window counter shared by all workers. Each key keeps
+  two fixed-window counters (current and previous), and the previous one
+  is weighted by how much of it still overlaps the sliding window. That is
+  O(1) time and memory per key, at the cost of assuming requests were
+  spread evenly across the previous window.
+
+``check_and_record`` checks and consumes a slot in one step, so two
+concurrent requests cannot both pass a check for the last slot.
+"""
+
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, Optional
 
-from datetime import datetime, timedelta
-from typing import Dict, List
 from app.config import get_settings
 
 
-class RateLimiter:
-    """In-memory rate limiter. Replace with Redis for production scaling."""
-
-    def __init__(self):
-        self._attempts: Dict[str, List[datetime]] = {}
-
-    def _cleanup(self, key: str) -> None:
-        """Remove expired entries."""
-        settings = get_settings()
-        cutoff = datetime.utcnow() - timedelta(hours=settings.RATE_LIMIT_WINDOW_HOURS)
-        if key in self._attempts:
-            self._attempts[key] = [ts for ts in self._attempts[key] if ts > cutoff]
-            if not self._attempts[key]:
-                del self._attempts[key]
+# ─── Backends ─────────────────────────────────────────────────────────────────
+
+class RateLimitBackend(ABC):
+    """Storage for per-key attempt counts within a sliding window."""
+
+    @abstractmethod
+    async def check_and_record(self, key: str, limit: int, window_seconds: float) -> bool:
+        """Consume a slot if one is free. Returns False (and records nothing) otherwise."""
+        ...
+
+    @abstractmethod
+    async def remaining(self, key: str, limit: int, window_seconds: float) -> int:
+        """Slots left in the current window."""
+        ...
+
+    @abstractmethod
+    async def refund(self, key: str, window_seconds: float) -> None:
+        """Give back the most recently consumed slot (e.g. the upstream call failed)."""
+        ...
 
-    def is_allowed(self, phone: str, action: str = "cibil_pull") -> bool:
-        """Check if the action is allowed for this phone number."""
-        settings = get_settings()
-        key = f"{action}:{phone}"
-        self._cleanup(key)
-        current_count = len(self._attempts.get(key, []))
-        return current_count < settings.RATE_LIMIT_CIBIL_PULLS
-
-    def record(self, phone: str, action: str = "cibil_pull") -> None:
-        """Record an action attempt."""
-        key = f"{action}:{phone}"
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local backend. Limits are per worker."""
+
+    def __init__(self, sweep_interval: float = 300.0):
+        self._attempts: Dict[str, Deque[float]] = {}
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def _trim(self, key: str, window_seconds: float, now: float) -> Deque[float]:
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return deque()
+        cutoff = now - window_seconds
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+        return attempts
+
+    def _maybe_sweep(self, window_seconds: float, now: float) -> None:
+        """Drop keys whose newest attempt has left the window (phones not seen again)."""
+        if time.monotonic() < self._next_sweep:
+            return
+        self._next_sweep = time.monotonic() + self._sweep_interval
+        cutoff = now - window_seconds
+        for key in [k for k, v in self._attempts.items() if not v or v[-1] <= cutoff]:
+            del self._attempts[key]
+
+    async def check_and_record(self, key: str, limit: int, window_seconds: float) -> bool:
+        now = time.time()
+        self._maybe_sweep(window_seconds, now)
+        attempts = self._trim(key, window_seconds, now)
+        if len(attempts) >= limit:
+            return False
         if key not in self._attempts:
-            self._attempts[key] = []
-        self._attempts[key].append(datetime.utcnow())
+            # maxlen bounds memory per key even if the limit is lowered at runtime
+            attempts = self._attempts[key] = deque(maxlen=limit)
+        attempts.append(now)
+        return True
+
+    async def remaining(self, key: str, limit: int, window_seconds: float) -> int:
+        attempts = self._trim(key, window_seconds, time.time())
+        return max(0, limit - len(attempts))
+
+    async def refund(self, key: str, window_seconds: float) -> None:
+        attempts = self._attempts.get(key)
+        if attempts:
+            attempts.pop()
+            if not attempts:
+                del self._attempts[key]
+
 
-    def remaining(self, phone: str, action: str = "cibil_pull") -> int:
+class RedisRateLimitBackend(RateLimitBackend):
+    """Sliding-window counter on any ``redis.asyncio``-compatible client.
+
+    Uses only INCR / DECR / GET / EXPIRE. A slot is taken optimistically with
+    INCR and given back with DECR if the weighted count then exceeds the
+    limit, so concurrent callers never over-admit.
+    """
+
+    def __init__(self, client: Any, prefix: str = "exitdebt:rl:"):
+        self._client = client
+        self._prefix = prefix
+
+    def _window(self, key: str, window_seconds: float, now: float):
+        index = int(now // window_seconds)
+        overlap = 1.0 - (now % window_seconds) / window_seconds
+        return (
+            f"{self._prefix}{key}:{index}",
+            f"{self._prefix}{key}:{index - 1}",
+            overlap,
+        )
+
+    async def _weighted_previous(self, previous_key: str, overlap: float) -> float:
+        return int(await self._client.get(previous_key) or 0) * overlap
+
+    async def check_and_record(self, key: str, limit: int, window_seconds: float) -> bool:
+        current_key, previous_key, overlap = self._window(key, window_seconds, time.time())
+        previous = await self._weighted_previous(previous_key, overlap)
+        if previous >= limit:
+            return False
+
+        current = await self._client.incr(current_key)
+        if current == 1:
+            # Counter must outlive its own window to serve as "previous" next window
+            await self._client.expire(current_key, int(window_seconds * 2))
+        if previous + current > limit:
+            await self._client.decr(current_key)
+            return False
+        return True
+
+    async def remaining(self, key: str, limit: int, window_seconds: float) -> int:
+        current_key, previous_key, overlap = self._window(key, window_seconds, time.time())
+        used = await self._weighted_previous(previous_key, overlap)
+        used += int(await self._client.get(current_key) or 0)
+        return max(0, math.floor(limit - used))
+
+    async def refund(self, key: str, window_seconds: float) -> None:
+        current_key, previous_key, _ = self._window(key, window_seconds, time.time())
+        # The slot was most likely taken in the current window; if the window
+        # rolled over since, it sits in the previous one.
+        for counter_key in (current_key, previous_key):
+            if int(await self._client.get(counter_key) or 0) > 0:
+                await self._client.decr(counter_key)
+                return
+
+
+# ─── Limiter ──────────────────────────────────────────────────────────────────
+
+class RateLimiter:
+    """Per-phone action limiter on top of a ``RateLimitBackend``."""
+
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        if self._backend is None:
+            if get_settings().RATE_LIMIT_BACKEND == "redis":
+                from app.utils.redis_client import get_redis
+                self._backend = RedisRateLimitBackend(get_redis())
+            else:
+                self._backend = InMemoryRateLimitBackend()
+        return self._backend
+
+    def set_backend(self, backend: RateLimitBackend) -> None:
+        """Swap the backend (useful for testing)."""
+        self._backend = backend
+
+    @staticmethod
+    def _window_seconds() -> float:
+        return get_settings().RATE_LIMIT_WINDOW_HOURS * 3600
+
+    async def check_and_record(self, phone: str, action: str = "cibil_pull") -> bool:
+        """Atomically check the limit and consume a slot if allowed."""
+        return await self.backend.check_and_record(
+            f"{action}:{phone}", get_settings().RATE_LIMIT_CIBIL_PULLS, self._window_seconds(),
+        )
+
+    async def remaining(self, phone: str, action: str = "cibil_pull") -> int:
         """Get remaining attempts."""
-        settings = get_settings()
-        key = f"{action}:{phone}"
-        self._cleanup(key)
-        current_count = len(self._attempts.get(key, []))
-        return max(0, settings.RATE_LIMIT_CIBIL_PULLS - current_count)
+        return await self.backend.remaining(
+            f"{action}:{phone}", get_settings().RATE_LIMIT_CIBIL_PULLS, self._window_seconds(),
+        )
+
+    async def refund(self, phone: str, action: str = "cibil_pull") -> None:
+        """Return a slot consumed by ``check_and_record`` for an attempt that did not count."""
+        await self.backend.refund(f"{action}:{phone}", self._window_seconds())
 
 
 # Singleton instance
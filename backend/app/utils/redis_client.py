@@ -0,0 +1,54 @@
+"""Shared async Redis client for cross-worker state (tokens, rate limits).
+
+``redis`` is imported lazily so the app runs without it when every
+backend is set to "memory".
+"""
+
+import secrets
+from typing import Any
+
+from app.config import get_settings
+
+_redis: Any = None
+
+# Delete KEYS[1] only while it still holds ARGV[1], atomically
+_COMPARE_AND_DELETE = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def get_redis() -> Any:
+    """Return the process-wide ``redis.asyncio.Redis`` client for REDIS_URL."""
+    global _redis
+    if _redis is None:
+        settings = get_settings()
+        if not settings.REDIS_URL:
+            raise RuntimeError("REDIS_URL must be set to use a Redis backend.")
+        import redis.asyncio as aioredis
+        _redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+def set_redis(client: Any) -> None:
+    """Override the Redis client (useful for testing)."""
+    global _redis
+    _redis = client
+
+
+# ─── Locks ────────────────────────────────────────────────────────────────────
+
+def new_lock_token() -> str:
+    """Random owner token to store as a lock's value (``SET key token NX EX ttl``)."""
+    return secrets.token_hex(16)
+
+
+async def release_lock(client: Any, key: str, token: str) -> bool:
+    """Release a lock only if ``token`` still owns it.
+
+    A holder that outlived the lock's TTL must not delete the lock another
+    worker has taken since. Returns whether the lock was released.
+    """
+    return bool(await client.eval(_COMPARE_AND_DELETE, 1, key, token))
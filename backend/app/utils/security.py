@@ -1,17 +1,13 @@
 """Security utilities — PAN hashing, AES encryption, JWT tokens, PAN masking."""
 
 import hashlib
-import base64
-import os
 from datetime import datetime, timedelta
 from typing import Optional
 
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives import padding
-from cryptography.hazmat.backends import default_backend
 from jose import jwt, JWTError
 
 from app.config import get_settings
+from app.utils import crypto
 
 
 # ─── PAN Hashing ──────────────────────────────────────────────────────────────
@@ -31,45 +27,24 @@ def mask_pan(pan: str) -> str:
 
 # ─── AES-256 Encryption ──────────────────────────────────────────────────────
 
-def _get_aes_key() -> bytes:
-    """Get AES key from settings (32 bytes for AES-256)."""
-    key_hex = get_settings().AES_ENCRYPTION_KEY
-    key_bytes = bytes.fromhex(key_hex)
-    # Pad or truncate to 32 bytes for AES-256
-    if len(key_bytes) < 32:
-        key_bytes = key_bytes.ljust(32, b'\0')
-    return key_bytes[:32]
-
-
 def encrypt_data(plaintext: str) -> str:
-    """Encrypt data using AES-256-CBC. Returns base64(iv + ciphertext)."""
-    key = _get_aes_key()
-    iv = os.urandom(16)
-    padder = padding.PKCS7(128).padder()
-    padded_data = padder.update(plaintext.encode("utf-8")) + padder.finalize()
-
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-    encryptor = cipher.encryptor()
-    ciphertext = encryptor.update(padded_data) + encryptor.finalize()
-
-    return base64.b64encode(iv + ciphertext).decode("utf-8")
+    """Encrypt data with AES-256-GCM under the current key version (see app/utils/crypto.py)."""
+    return crypto.encrypt(plaintext)
 
 
 def decrypt_data(encrypted: str) -> str:
-    """Decrypt AES-256-CBC encrypted data."""
-    key = _get_aes_key()
-    raw = base64.b64decode(encrypted)
-    iv = raw[:16]
-    ciphertext = raw[16:]
+    """Decrypt data written by ``encrypt_data``, including legacy AES-256-CBC blobs."""
+    return crypto.decrypt(encrypted).decode("utf-8")
+
 
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-    decryptor = cipher.decryptor()
-    padded_data = decryptor.update(ciphertext) + decryptor.finalize()
+async def encrypt_data_async(plaintext: str) -> str:
+    """``encrypt_data`` that runs large payloads on the crypto thread pool."""
+    return await crypto.encrypt_async(plaintext)
 
-    unpadder = padding.PKCS7(128).unpadder()
-    plaintext = unpadder.update(padded_data) + unpadder.finalize()
 
-    return plaintext.decode("utf-8")
+async def decrypt_data_async(encrypted: str) -> str:
+    """``decrypt_data`` that runs large payloads on the crypto thread pool."""
+    return (await crypto.decrypt_async(encrypted)).decode("utf-8")
 
 
 # ─── JWT Tokens ───────────────────────────────────────────────────────────────
@@ -0,0 +1,158 @@
+"""Request coalescing: concurrent calls with the same key share one execution.
+
+``SingleFlight.do(key, fn)`` runs ``fn`` once per key at a time. Callers
+that arrive while it is in flight await the same result (or exception)
+and are told it was shared, so they can undo per-caller bookkeeping such
+as rate-limit slots.
+
+A cancelled leader (e.g. its client disconnected) does not cancel the
+waiters: the first of them to wake runs ``fn`` in its place.
+
+Coalescing is per process by default. With a ``FlightBackend`` it also
+spans workers: the first worker takes a short lock and publishes its
+result; the others wait for that result, and fall back to calling ``fn``
+themselves if the leader fails or takes longer than ``wait_timeout``.
+Published results pass through ``encode``/``decode`` (e.g. to encrypt them).
+
+Usage:
+    flight = SingleFlight()
+    data, shared = await flight.do(pan_hash, lambda: cibil.pull_report(...))
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.utils.redis_client import new_lock_token, release_lock
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Backends ─────────────────────────────────────────────────────────────────
+
+class FlightBackend(ABC):
+    """Cross-process lock plus a short-lived slot for the leader's result."""
+
+    @abstractmethod
+    async def acquire(self, key: str, ttl: float) -> Optional[str]:
+        """Take the lock; returns the holder's lock token, or None if it is held."""
+
+    @abstractmethod
+    async def publish(self, key: str, value: str, ttl: float, token: str) -> None:
+        """Store the leader's result and release the lock (if ``token`` still owns it)."""
+
+    @abstractmethod
+    async def release(self, key: str, token: str) -> None:
+        """Release the lock without a result (the leader failed), if ``token`` still owns it."""
+
+    @abstractmethod
+    async def result(self, key: str) -> Tuple[Optional[str], bool]:
+        """``(published value or None, lock still held)``."""
+
+
+class RedisFlightBackend(FlightBackend):
+    """Lock and result keys in Redis via any ``redis.asyncio``-compatible client."""
+
+    def __init__(self, client: Any, prefix: str = "exitdebt:flight:"):
+        self._client = client
+        self._prefix = prefix
+
+    async def acquire(self, key: str, ttl: float) -> Optional[str]:
+        token = new_lock_token()
+        if not await self._client.set(f"{self._prefix}{key}:lock", token, ex=max(1, int(ttl)), nx=True):
+            return None
+        await self._client.delete(f"{self._prefix}{key}:result")  # from an earlier flight
+        return token
+
+    async def publish(self, key: str, value: str, ttl: float, token: str) -> None:
+        await self._client.set(f"{self._prefix}{key}:result", value, ex=max(1, int(ttl)))
+        await self.release(key, token)
+
+    async def release(self, key: str, token: str) -> None:
+        # A call slower than the lock TTL must not release the next leader's lock
+        await release_lock(self._client, f"{self._prefix}{key}:lock", token)
+
+    async def result(self, key: str) -> Tuple[Optional[str], bool]:
+        value = await self._client.get(f"{self._prefix}{key}:result")
+        locked = bool(await self._client.get(f"{self._prefix}{key}:lock"))
+        return value, locked
+
+
+# ─── SingleFlight ─────────────────────────────────────────────────────────────
+
+class SingleFlight:
+    def __init__(
+        self,
+        backend: Optional[FlightBackend] = None,
+        wait_timeout: float = 15.0,
+        result_ttl: float = 30.0,
+        poll_interval: float = 0.1,
+        encode: Callable[[Any], str] = str,
+        decode: Callable[[str], Any] = str,
+    ):
+        self.backend = backend
+        self.wait_timeout = wait_timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._encode = encode
+        self._decode = decode
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True if another caller did the work.
+
+        If the leading caller is cancelled, its waiters are not: one of them
+        takes over and runs ``fn`` for the rest.
+        """
+        while (inflight := self._inflight.get(key)) is not None:
+            # asyncio.wait only raises if *this* caller is cancelled
+            await asyncio.wait((inflight,))
+            if not inflight.cancelled():
+                return inflight.result(), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting: mark a failure as retrieved to avoid asyncio's warning
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            if self.backend is None:
+                result, shared = await fn(), False
+            else:
+                result, shared = await self._do_distributed(key, fn)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, shared
+        finally:
+            del self._inflight[key]
+
+    async def _do_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        token = await self.backend.acquire(key, ttl=self.wait_timeout)
+        if token is not None:
+            try:
+                result = await fn()
+            except BaseException:
+                await self.backend.release(key, token)
+                raise
+            await self.backend.publish(key, self._encode(result), ttl=self.result_ttl, token=token)
+            return result, False
+
+        # Another worker is leading: wait for its result
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while loop.time() < deadline:
+            value, locked = await self.backend.result(key)
+            if value is not None:
+                return self._decode(value), True
+            if not locked:
+                break  # leader failed or its lock expired
+            await asyncio.sleep(self.poll_interval)
+
+        logger.warning(f"[FLIGHT] No shared result for {key[:12]}…; running it here")
+        return await fn(), False
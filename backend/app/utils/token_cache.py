@@ -0,0 +1,248 @@
+"""Access-token cache with single-flight and proactive background refresh.
+
+Wraps an async ``fetch`` callable that logs in to an auth endpoint and
+returns ``(access_token, expires_in_seconds)``:
+
+- Concurrent callers that find the token missing or expired share one
+  refresh (an ``asyncio.Lock`` per cache, re-checked after acquiring).
+- Once a token is inside ``proactive_margin`` of expiry, callers still get
+  the cached token and a single background task fetches the next one.
+- Tokens live in a pluggable ``TokenStore``. The Redis store shares them
+  across workers and adds a short lock so only one worker logs in at a time.
+
+Usage:
+    cache = TokenCache("setu_aa", fetch=_login, refresh_margin=20, proactive_margin=60)
+    token = await cache.get()
+"""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.utils.redis_client import new_lock_token, release_lock
+
+logger = logging.getLogger(__name__)
+
+FetchToken = Callable[[], Awaitable[Tuple[str, float]]]
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    value: str
+    expires_at: float  # epoch seconds
+
+
+# ─── Stores ───────────────────────────────────────────────────────────────────
+
+class TokenStore(ABC):
+    """Where tokens are kept. Implementations must be safe to share across caches."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedToken]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, token: CachedToken) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def acquire_refresh_lock(self, key: str, ttl: float) -> Optional[str]:
+        """Claim the right to refresh ``key`` across workers.
+
+        Returns the holder's lock token, or None if another worker holds the
+        lock. Local stores always win.
+        """
+        return "local"
+
+    async def release_refresh_lock(self, key: str, token: str) -> None:
+        return None
+
+
+class InMemoryTokenStore(TokenStore):
+    """Process-local store (default)."""
+
+    def __init__(self):
+        self._tokens: Dict[str, CachedToken] = {}
+
+    async def get(self, key: str) -> Optional[CachedToken]:
+        return self._tokens.get(key)
+
+    async def set(self, key: str, token: CachedToken) -> None:
+        self._tokens[key] = token
+
+    async def delete(self, key: str) -> None:
+        self._tokens.pop(key, None)
+
+
+class RedisTokenStore(TokenStore):
+    """Shares tokens across workers via any ``redis.asyncio``-compatible client."""
+
+    def __init__(self, client: Any, prefix: str = "exitdebt:token:"):
+        self._client = client
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[CachedToken]:
+        raw = await self._client.get(self._prefix + key)
+        if not raw:
+            return None
+        data = json.loads(raw)
+        return CachedToken(value=data["value"], expires_at=data["expires_at"])
+
+    async def set(self, key: str, token: CachedToken) -> None:
+        ttl = max(1, int(token.expires_at - time.time()))
+        payload = json.dumps({"value": token.value, "expires_at": token.expires_at})
+        await self._client.set(self._prefix + key, payload, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._prefix + key)
+
+    async def acquire_refresh_lock(self, key: str, ttl: float) -> Optional[str]:
+        token = new_lock_token()
+        acquired = await self._client.set(
+            f"{self._prefix}{key}:lock", token, ex=max(1, int(ttl)), nx=True,
+        )
+        return token if acquired else None
+
+    async def release_refresh_lock(self, key: str, token: str) -> None:
+        # A login slower than the lock TTL must not release the next worker's lock
+        await release_lock(self._client, f"{self._prefix}{key}:lock", token)
+
+
+_default_store: Optional[TokenStore] = None
+
+
+def get_token_store() -> TokenStore:
+    """Store selected by TOKEN_CACHE_BACKEND ("memory" or "redis")."""
+    global _default_store
+    if _default_store is None:
+        if get_settings().TOKEN_CACHE_BACKEND == "redis":
+            from app.utils.redis_client import get_redis
+            _default_store = RedisTokenStore(get_redis())
+        else:
+            _default_store = InMemoryTokenStore()
+    return _default_store
+
+
+def set_token_store(store: Optional[TokenStore]) -> None:
+    """Override the default store (useful for testing)."""
+    global _default_store
+    _default_store = store
+
+
+# ─── Cache ────────────────────────────────────────────────────────────────────
+
+class TokenCache:
+    """Single-flight, proactively refreshed access token."""
+
+    def __init__(
+        self,
+        key: str,
+        fetch: FetchToken,
+        store: Optional[TokenStore] = None,
+        refresh_margin: float = 20.0,
+        proactive_margin: float = 60.0,
+        lock_wait: float = 5.0,
+    ):
+        """
+        Args:
+            key: Store key, unique per credential set.
+            fetch: Coroutine returning (token, expires_in_seconds).
+            store: Token store; defaults to the TOKEN_CACHE_BACKEND store.
+            refresh_margin: Never hand out a token closer than this to expiry.
+            proactive_margin: Start a background refresh inside this window.
+            lock_wait: How long to wait for another worker's refresh before
+                fetching anyway.
+        """
+        self.key = key
+        self._fetch = fetch
+        self._store = store
+        self._refresh_margin = refresh_margin
+        self._proactive_margin = max(proactive_margin, refresh_margin)
+        self._lock_wait = lock_wait
+        self._lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+
+    @property
+    def store(self) -> TokenStore:
+        if self._store is None:
+            self._store = get_token_store()
+        return self._store
+
+    def _usable(self, token: Optional[CachedToken], margin: float) -> bool:
+        return token is not None and token.expires_at - margin > time.time()
+
+    async def get(self) -> str:
+        """Return a valid token, refreshing at most once per expiry."""
+        token = await self.store.get(self.key)
+        if self._usable(token, self._refresh_margin):
+            if not self._usable(token, self._proactive_margin):
+                self._schedule_background_refresh()
+            return token.value
+
+        async with self._lock:
+            token = await self.store.get(self.key)
+            if self._usable(token, self._refresh_margin):
+                return token.value
+            return (await self._refresh()).value
+
+    async def invalidate(self) -> None:
+        """Drop the cached token, e.g. after the upstream rejected it with 401."""
+        await self.store.delete(self.key)
+
+    async def aclose(self) -> None:
+        """Cancel a pending background refresh."""
+        if self._background and not self._background.done():
+            self._background.cancel()
+            try:
+                await self._background
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._background = None
+
+    def _schedule_background_refresh(self) -> None:
+        if self._background and not self._background.done():
+            return
+        self._background = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            async with self._lock:
+                token = await self.store.get(self.key)
+                if self._usable(token, self._proactive_margin):
+                    return  # another caller or worker already refreshed
+                await self._refresh()
+        except Exception as e:
+            # The current token is still valid; the next get() retries.
+            logger.warning(f"[TOKEN] Background refresh of {self.key} failed: {e}")
+
+    async def _refresh(self) -> CachedToken:
+        """Fetch a new token. Caller holds ``self._lock``."""
+        store = self.store
+        lock_token = await store.acquire_refresh_lock(self.key, self._lock_wait)
+        if lock_token is None:
+            # Another worker is logging in; wait for its token to land.
+            deadline = time.monotonic() + self._lock_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                token = await store.get(self.key)
+                if self._usable(token, self._proactive_margin):
+                    return token
+            logger.warning(f"[TOKEN] Timed out waiting for {self.key} refresh; fetching directly.")
+
+        try:
+            value, expires_in = await self._fetch()
+            token = CachedToken(value=value, expires_at=time.time() + float(expires_in))
+            await store.set(self.key, token)
+            logger.info(f"[TOKEN] Refreshed {self.key} (expires in {int(expires_in)}s)")
+            return token
+        finally:
+            if lock_token is not None:
+                await store.release_refresh_lock(self.key, lock_token)
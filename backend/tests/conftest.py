@@ -10,3 +10,80 @@ def event_loop():
     loop = asyncio.new_event_loop()
     yield loop
     loop.close()
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """File-backed SQLite engine with the tables SQLite can represent.
+
+    Postgres-only column types (ARRAY, JSONB) keep subscriptions out;
+    everything the core health-check and AA consent flows need is here.
+    The database lives in a file so ``async_sqlite_engine`` can share it.
+    """
+    from sqlalchemy import create_engine
+
+    from app.database import Base
+    from app.models.user import User
+    from app.models.cibil_report import CibilReport
+    from app.models.debt_account import DebtAccount
+    from app.models.health_score import HealthScore
+    from app.models.callback import Callback
+    from app.models.audit_log import AuditLog
+    from app.models.aa_consent import AAConsent
+    # Remaining models must be imported so the User relationships can be configured.
+    import app.models.advisory_plan  # noqa: F401
+    import app.models.subscription  # noqa: F401
+    import app.models.service_request  # noqa: F401
+    import app.models.settlement_case  # noqa: F401
+    import app.models.shield_consent  # noqa: F401
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    # WAL lets a streaming reader and a writer overlap, as on PostgreSQL.
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    Base.metadata.create_all(
+        engine,
+        tables=[
+            m.__table__
+            for m in (User, CibilReport, DebtAccount, HealthScore, Callback, AuditLog, AAConsent)
+        ],
+    )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_sqlite_engine(sqlite_engine):
+    """aiosqlite engine on the same database file as ``sqlite_engine``.
+
+    NullPool: TestClient may run each request on a fresh event loop, and
+    aiosqlite connections are bound to the loop that opened them.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    engine = create_async_engine(
+        str(sqlite_engine.url).replace("sqlite://", "sqlite+aiosqlite://", 1),
+        poolclass=NullPool,
+    )
+    yield engine
+    engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def statement_counter(async_sqlite_engine):
+    """Counts SQL statements the app executes through the async engine."""
+    from sqlalchemy import event
+
+    target = async_sqlite_engine.sync_engine
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", _record)
+    yield statements
+    event.remove(target, "before_cursor_execute", _record)
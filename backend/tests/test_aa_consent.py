@@ -0,0 +1,136 @@
+"""Tests for the persisted AA consent state machine."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import get_settings
+from app.models.aa_consent import AAConsent
+from app.services import setu_aa_service
+
+
+@pytest.fixture
+def session_factory(async_sqlite_engine):
+    return async_sessionmaker(async_sqlite_engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def setu(monkeypatch):
+    """Real-provider mode with Setu's consent API replaced by a counter."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SETU_AA_PROVIDER", "setu")
+    monkeypatch.setattr(settings, "SETU_AA_CLIENT_ID", "client")
+    monkeypatch.setattr(settings, "AA_CONSENT_POLL_BASE_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "AA_CONSENT_POLL_MAX_SECONDS", 60.0)
+    upstream = {"status": "PENDING", "polls": 0}
+
+    async def create(phone, fi_types):
+        return {"id": "setu-consent-1", "url": "https://setu.example/consent", "status": "PENDING"}
+
+    async def get(consent_id):
+        upstream["polls"] += 1
+        return {"id": consent_id, "status": upstream["status"]}
+
+    monkeypatch.setattr(setu_aa_service, "_setu_create_consent", create)
+    monkeypatch.setattr(setu_aa_service, "_setu_get_consent", get)
+    return upstream
+
+
+@pytest.mark.usefixtures("sqlite_engine")  # configures the mappers User relates to
+class TestTransitions:
+    def test_approval_sets_approved_at(self):
+        consent = AAConsent(status="PENDING")
+        assert consent.transition("ACTIVE")
+        assert consent.is_approved and consent.approved_at is not None
+
+    def test_disallowed_moves_ignored(self):
+        consent = AAConsent(status="REVOKED")
+        assert not consent.transition("ACTIVE")
+        assert consent.status == "REVOKED"
+        assert not AAConsent(status="PENDING").transition("PAUSED")
+
+    def test_same_status_is_not_a_change(self):
+        assert not AAConsent(status="ACTIVE").transition("ACTIVE")
+
+
+class TestConsentStore:
+    @pytest.mark.asyncio
+    async def test_mock_consent_persisted(self, session_factory):
+        async with session_factory() as db:
+            consent = await setu_aa_service.create_consent(db, "9876543210")
+        async with session_factory() as db:
+            stored = await setu_aa_service.get_consent_status(db, consent.setu_consent_id)
+            assert stored.status == "PENDING"
+            assert stored.phone == "9876543210"
+            assert stored.next_poll_at is None  # nothing to poll in mock mode
+
+            await setu_aa_service.approve_consent(db, consent.setu_consent_id)
+        async with session_factory() as db:
+            assert (await setu_aa_service.get_consent_status(db, consent.setu_consent_id)).status == "APPROVED"
+
+    @pytest.mark.asyncio
+    async def test_unknown_consent(self, session_factory):
+        async with session_factory() as db:
+            assert await setu_aa_service.get_consent_status(db, "missing") is None
+            assert await setu_aa_service.update_consent_status(db, "missing", "ACTIVE") is None
+
+    @pytest.mark.asyncio
+    async def test_webhook_updates_without_polling(self, session_factory, setu):
+        async with session_factory() as db:
+            await setu_aa_service.create_consent(db, "9876543210")
+            await setu_aa_service.update_consent_status(db, "setu-consent-1", "ACTIVE")
+        async with session_factory() as db:
+            consent = await setu_aa_service.get_consent_status(db, "setu-consent-1")
+        assert consent.status == "ACTIVE"
+        assert setu["polls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_mock_approval_refused_for_setu_consents(self, session_factory, setu):
+        async with session_factory() as db:
+            await setu_aa_service.create_consent(db, "9876543210")
+            assert await setu_aa_service.approve_consent(db, "setu-consent-1") is None
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, "setu-consent-1")
+        assert consent.status == "PENDING"
+        assert consent.approved_at is None
+
+    @pytest.mark.asyncio
+    async def test_replayed_webhook_cannot_reopen_consent(self, session_factory, setu):
+        async with session_factory() as db:
+            await setu_aa_service.create_consent(db, "9876543210")
+            await setu_aa_service.update_consent_status(db, "setu-consent-1", "REJECTED")
+            consent = await setu_aa_service.update_consent_status(db, "setu-consent-1", "ACTIVE")
+        assert consent.status == "REJECTED"
+        assert consent.next_poll_at is None
+
+    @pytest.mark.asyncio
+    async def test_fallback_poll_backs_off(self, session_factory, setu):
+        async with session_factory() as db:
+            consent = await setu_aa_service.create_consent(db, "9876543210")
+            # Reads before next_poll_at stay local
+            await setu_aa_service.get_consent_status(db, "setu-consent-1")
+            assert setu["polls"] == 0
+
+            consent.next_poll_at = datetime.utcnow() - timedelta(seconds=1)
+            await db.commit()
+            await setu_aa_service.get_consent_status(db, "setu-consent-1")
+            await setu_aa_service.get_consent_status(db, "setu-consent-1")
+            assert setu["polls"] == 1
+            assert consent.poll_attempts == 1
+            first_delay = consent.next_poll_at - datetime.utcnow()
+            assert timedelta(seconds=8) < first_delay <= timedelta(seconds=10)
+
+            # A missed webhook is picked up by the next due poll
+            setu["status"] = "ACTIVE"
+            consent.next_poll_at = datetime.utcnow() - timedelta(seconds=1)
+            await db.commit()
+            consent = await setu_aa_service.get_consent_status(db, "setu-consent-1")
+        assert setu["polls"] == 2
+        assert consent.status == "ACTIVE"
+        assert consent.poll_attempts == 0
+
+    @pytest.mark.asyncio
+    async def test_poll_delay_capped(self, setu):
+        assert setu_aa_service._poll_delay(2) == timedelta(seconds=20)
+        assert setu_aa_service._poll_delay(10) == timedelta(seconds=60)
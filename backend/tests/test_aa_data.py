@@ -0,0 +1,263 @@
+"""Tests for the background AA FI data pipeline."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import get_settings
+from app.models.debt_account import DebtAccount
+from app.models.health_score import HealthScore
+from app.models.user import User
+from app.services import aa_data_service, setu_aa_service
+from app.utils.job_queue import FAILED, SUCCEEDED, InMemoryJobStore, InProcessJobQueue, set_job_queue
+
+
+@pytest.fixture
+def session_factory(async_sqlite_engine):
+    return async_sessionmaker(async_sqlite_engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def queue(session_factory):
+    queue = InProcessJobQueue(InMemoryJobStore(ttl=60), workers=1)
+    aa_data_service.register_jobs(queue, session_factory)
+    set_job_queue(queue)
+    yield queue
+    set_job_queue(None)
+
+
+async def _run_next(queue):
+    """Stand in for a worker: run the next queued job."""
+    return await queue.run(*queue.queue.get_nowait())
+
+
+async def _approved_consent(session_factory, phone="9876543210"):
+    async with session_factory() as db:
+        consent = await setu_aa_service.create_consent(db, phone)
+        await setu_aa_service.update_consent_status(db, consent.setu_consent_id, "ACTIVE")
+    return consent.setu_consent_id
+
+
+async def _requested_session(session_factory, queue, consent_id):
+    """Have the worker create a data session, as before a real FI_DATA_READY."""
+    async with session_factory() as db:
+        await aa_data_service.request_fi_data(db, await setu_aa_service.find_consent(db, consent_id))
+    await _run_next(queue)
+
+
+class TestMockPipeline:
+    @pytest.mark.asyncio
+    async def test_fetch_persists_scores_and_caches(self, session_factory, queue):
+        async with session_factory() as db:
+            db.add(User(pan_hash="h" * 64, phone="9876543210", name="Asha",
+                        consent_ts=datetime.utcnow(), consent_ip="127.0.0.1"))
+            await db.commit()
+        consent_id = await _approved_consent(session_factory)
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            await aa_data_service.request_fi_data(db, consent)
+            assert consent.fi_status == "REQUESTED"
+
+        job = await _run_next(queue)
+        assert job.status == SUCCEEDED
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            assert consent.fi_status == "READY"
+            assert [a["type"] for a in consent.fi_result["accounts"]] == ["loan", "loan", "credit_card"]
+            assert consent.fi_result["raw_fi_count"] == 1
+
+            rows = (await db.scalars(select(DebtAccount).where(DebtAccount.consent_id == consent.id))).all()
+            assert len(rows) == 3
+            assert {r.source for r in rows} == {"aa"}
+            assert all(r.report_id is None for r in rows)
+
+            score = await db.scalar(select(HealthScore).where(HealthScore.user_id == consent.user_id))
+            assert score.score == consent.fi_result["health_score"]["score"]
+
+    @pytest.mark.asyncio
+    async def test_refetch_replaces_accounts(self, session_factory, queue):
+        consent_id = await _approved_consent(session_factory)
+        for _ in range(2):
+            async with session_factory() as db:
+                await aa_data_service.request_fi_data(db, await setu_aa_service.find_consent(db, consent_id))
+            await _run_next(queue)
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            rows = (await db.scalars(select(DebtAccount).where(DebtAccount.consent_id == consent.id))).all()
+        assert len(rows) == 3
+        assert consent.user_id is None  # no user with this phone: nothing to score against
+
+    @pytest.mark.asyncio
+    async def test_unapproved_consent_rejected(self, session_factory, queue):
+        async with session_factory() as db:
+            consent = await setu_aa_service.create_consent(db, "9876543210")
+            assert await aa_data_service.on_fi_data_ready(db, consent.setu_consent_id, "session-1") is None
+        assert queue.queue.empty()
+
+        await queue.submit(aa_data_service.AA_FI_FETCH_JOB,
+                           {"consent_id": consent.setu_consent_id, "session_id": None})
+        job = await _run_next(queue)
+        assert job.status == FAILED
+        assert job.error["status_code"] == 409
+
+    @pytest.mark.asyncio
+    async def test_revocation_drops_cached_data(self, session_factory, queue):
+        consent_id = await _approved_consent(session_factory)
+        async with session_factory() as db:
+            await aa_data_service.request_fi_data(db, await setu_aa_service.find_consent(db, consent_id))
+        await _run_next(queue)
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.update_consent_status(db, consent_id, "REVOKED")
+            rows = (await db.scalars(select(DebtAccount).where(DebtAccount.consent_id == consent.id))).all()
+        assert consent.fi_result is None
+        assert consent.fi_status is None
+        assert rows == []
+
+
+class TestSetuPipeline:
+    @pytest.fixture
+    def setu(self, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "SETU_AA_PROVIDER", "setu")
+        monkeypatch.setattr(settings, "SETU_AA_CLIENT_ID", "client")
+        calls = {"sessions": 0, "fetches": []}
+
+        async def create_consent(phone, fi_types):
+            return {"id": "setu-consent-1", "url": "https://setu.example/consent", "status": "PENDING"}
+
+        async def create_session(consent_id):
+            calls["sessions"] += 1
+            return {"id": "session-1", "status": "PENDING"}
+
+        async def fetch(session_id):
+            calls["fetches"].append(session_id)
+            if calls.get("fail"):
+                raise RuntimeError("upstream 500")
+            fi_data = setu_aa_service._mock_fetch_fi_data("setu-consent-1")
+            return setu_aa_service.parse_fi_to_debt_accounts(fi_data), 1
+
+        monkeypatch.setattr(setu_aa_service, "_setu_create_consent", create_consent)
+        monkeypatch.setattr(setu_aa_service, "_setu_create_data_session", create_session)
+        monkeypatch.setattr(setu_aa_service, "_setu_fetch_accounts", fetch)
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_session_then_webhook_then_fetch(self, session_factory, queue, setu):
+        consent_id = await _approved_consent(session_factory)
+        async with session_factory() as db:
+            await aa_data_service.request_fi_data(db, await setu_aa_service.find_consent(db, consent_id))
+        await _run_next(queue)
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            assert (consent.fi_status, consent.fi_session_id) == ("REQUESTED", "session-1")
+            assert setu["fetches"] == []
+
+            await aa_data_service.on_fi_data_ready(db, consent_id, "session-1")
+        await _run_next(queue)
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+        assert consent.fi_status == "READY"
+        assert setu == {"sessions": 1, "fetches": ["session-1"]}
+
+    @pytest.mark.asyncio
+    async def test_unknown_session_ignored(self, session_factory, queue, setu):
+        consent_id = await _approved_consent(session_factory)
+        async with session_factory() as db:
+            assert await aa_data_service.on_fi_data_ready(db, consent_id, "session-1") is None
+        assert queue.queue.empty()  # no session was requested yet
+
+        await _requested_session(session_factory, queue, consent_id)
+        async with session_factory() as db:
+            assert await aa_data_service.on_fi_data_ready(db, consent_id, "someone-elses") is None
+            consent = await setu_aa_service.find_consent(db, consent_id)
+        assert queue.queue.empty()
+        assert (consent.fi_status, consent.fi_session_id) == ("REQUESTED", "session-1")
+        assert setu["fetches"] == []
+
+    @pytest.mark.asyncio
+    async def test_revoked_during_fetch_stores_nothing(self, session_factory, queue, setu, monkeypatch):
+        consent_id = await _approved_consent(session_factory)
+        await _requested_session(session_factory, queue, consent_id)
+        fetch = setu_aa_service._setu_fetch_accounts
+
+        async def revoked_midway(session_id):
+            async with session_factory() as db:
+                await setu_aa_service.update_consent_status(db, consent_id, "REVOKED")
+            return await fetch(session_id)
+
+        monkeypatch.setattr(setu_aa_service, "_setu_fetch_accounts", revoked_midway)
+        async with session_factory() as db:
+            await aa_data_service.on_fi_data_ready(db, consent_id, "session-1")
+        job = await _run_next(queue)
+
+        assert (job.status, job.error["status_code"]) == (FAILED, 409)
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            rows = (await db.scalars(select(DebtAccount).where(DebtAccount.consent_id == consent.id))).all()
+        assert (consent.status, consent.fi_status, consent.fi_result) == ("REVOKED", None, None)
+        assert rows == []
+
+    @pytest.mark.asyncio
+    async def test_fetch_failure_recorded(self, session_factory, queue, setu):
+        setu["fail"] = True
+        consent_id = await _approved_consent(session_factory)
+        await _requested_session(session_factory, queue, consent_id)
+        async with session_factory() as db:
+            await aa_data_service.on_fi_data_ready(db, consent_id, "session-1")
+        job = await _run_next(queue)
+
+        assert job.status == FAILED
+        assert job.error["status_code"] == 502
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+        assert consent.fi_status == "FAILED"
+        assert "upstream 500" in consent.fi_error
+
+    @pytest.mark.asyncio
+    async def test_missed_webhook_requeued_once_stale(self, session_factory, queue, setu):
+        consent_id = await _approved_consent(session_factory)
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            await aa_data_service.ensure_fi_data(db, consent)
+        await _run_next(queue)  # session created; FI_DATA_READY never arrives
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            assert await aa_data_service.ensure_fi_data(db, consent) is None  # still within the cutoff
+            assert queue.queue.empty()
+
+            consent.fi_requested_at = datetime.utcnow() - timedelta(hours=1)
+            await db.commit()
+            assert await aa_data_service.ensure_fi_data(db, consent) is not None
+        await _run_next(queue)
+
+        assert setu["sessions"] == 2
+        assert setu["fetches"] == []
+
+    @pytest.mark.asyncio
+    async def test_lost_fetch_job_refetches_session(self, session_factory, queue, setu):
+        consent_id = await _approved_consent(session_factory)
+        await _requested_session(session_factory, queue, consent_id)
+        async with session_factory() as db:
+            await aa_data_service.on_fi_data_ready(db, consent_id, "session-1")
+        queue.queue.get_nowait()  # the worker restarts and the job is lost
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+            consent.fi_requested_at = datetime.utcnow() - timedelta(hours=1)
+            await db.commit()
+            await aa_data_service.ensure_fi_data(db, consent)
+        await _run_next(queue)
+
+        async with session_factory() as db:
+            consent = await setu_aa_service.find_consent(db, consent_id)
+        assert consent.fi_status == "READY"
+        assert setu == {"sessions": 1, "fetches": ["session-1"]}
@@ -0,0 +1,117 @@
+"""Tests for audit logging and the buffered audit writer."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.audit_log import AuditLog
+from app.utils import audit
+from app.utils.audit import AuditWriter, log_event
+
+
+@pytest.fixture
+def insert_statements(async_sqlite_engine):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO audit_logs"):
+            statements.append(statement)
+
+    event.listen(async_sqlite_engine.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(async_sqlite_engine.sync_engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def session_factory(async_sqlite_engine):
+    return async_sessionmaker(async_sqlite_engine, expire_on_commit=False)
+
+
+async def _count(engine):
+    async with engine.connect() as conn:
+        return await conn.scalar(select(func.count()).select_from(AuditLog))
+
+
+class TestAuditWriter:
+    @pytest.mark.asyncio
+    async def test_size_trigger_flushes_in_batches(self, async_sqlite_engine, insert_statements):
+        writer = AuditWriter(engine=async_sqlite_engine, batch_size=5, flush_interval=60)
+        await writer.start()
+        for i in range(10):
+            writer.enqueue({"event_type": "otp_send", "phone": f"98765432{i:02d}", "metadata_json": {}})
+        await asyncio.sleep(0.2)
+
+        assert await _count(async_sqlite_engine) == 10
+        assert len(insert_statements) <= 2  # one multi-row INSERT per batch
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_time_trigger_flushes_partial_batch(self, async_sqlite_engine):
+        writer = AuditWriter(engine=async_sqlite_engine, batch_size=100, flush_interval=0.05)
+        await writer.start()
+        writer.enqueue({"event_type": "otp_send", "metadata_json": {}})
+        await asyncio.sleep(0.3)
+
+        assert await _count(async_sqlite_engine) == 1
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_buffer(self, async_sqlite_engine):
+        writer = AuditWriter(engine=async_sqlite_engine, batch_size=100, flush_interval=60)
+        await writer.start()
+        for _ in range(7):
+            writer.enqueue({"event_type": "otp_send", "metadata_json": {}})
+        await writer.stop()
+
+        assert await _count(async_sqlite_engine) == 7
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_events(self, async_sqlite_engine):
+        writer = AuditWriter(engine=async_sqlite_engine, batch_size=10)
+        writer.enqueue({"event_type": None, "metadata_json": {}})  # violates NOT NULL
+        assert await writer.flush() is False
+        assert len(writer._pending) == 1
+
+    def test_buffer_bounded(self):
+        writer = AuditWriter(batch_size=10, max_pending=3)
+        for i in range(5):
+            writer.enqueue({"event_type": "otp_send", "phone": str(i)})
+        assert [r["phone"] for r in writer._pending] == ["2", "3", "4"]
+
+
+class TestLogEvent:
+    @pytest.fixture
+    def writer(self, async_sqlite_engine, monkeypatch):
+        writer = AuditWriter(engine=async_sqlite_engine, batch_size=100, flush_interval=60)
+        monkeypatch.setattr(audit, "audit_writer", writer)
+        return writer
+
+    @pytest.mark.asyncio
+    async def test_hot_events_are_buffered(self, writer, session_factory, async_sqlite_engine):
+        await writer.start()
+        async with session_factory() as db:
+            await log_event(db=db, event_type="otp_send", phone="9876543210")
+
+        assert await _count(async_sqlite_engine) == 0
+        assert len(writer._pending) == 1
+        await writer.stop()
+        assert await _count(async_sqlite_engine) == 1
+
+    @pytest.mark.asyncio
+    async def test_durable_events_written_synchronously(self, writer, session_factory, async_sqlite_engine):
+        await writer.start()
+        async with session_factory() as db:
+            await log_event(db=db, event_type="user_delete_request", phone="9876543210")
+            await log_event(db=db, event_type="otp_send", durable=True)
+
+        assert await _count(async_sqlite_engine) == 2
+        assert writer._pending == []
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_sync_when_writer_not_running(self, writer, session_factory, async_sqlite_engine):
+        async with session_factory() as db:
+            await log_event(db=db, event_type="otp_send")
+        assert await _count(async_sqlite_engine) == 1
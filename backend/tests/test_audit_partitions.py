@@ -0,0 +1,42 @@
+"""Tests for audit_logs partition naming and retention selection."""
+
+from datetime import date
+
+from app.jobs.audit_partitions import (
+    add_months,
+    expired_partitions,
+    months_to_create,
+    partition_month,
+    partition_name,
+)
+
+
+class TestMonthHelpers:
+    def test_add_months_crosses_years(self):
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name_round_trip(self):
+        assert partition_name(date(2026, 3, 1)) == "audit_logs_y2026m03"
+        assert partition_month("audit_logs_y2026m03") == date(2026, 3, 1)
+        assert partition_month("audit_logs_default") is None
+
+    def test_months_to_create_includes_current_month(self):
+        months = months_to_create(date(2026, 12, 17), ahead=2)
+        assert months == [date(2026, 12, 1), date(2027, 1, 1), date(2027, 2, 1)]
+
+
+class TestRetention:
+    def test_only_whole_months_past_retention_expire(self):
+        names = [
+            "audit_logs_default",
+            "audit_logs_y2024m09",
+            "audit_logs_y2024m10",
+            "audit_logs_y2024m11",
+            "audit_logs_y2026m10",
+        ]
+        # 24 months before Oct 2026 → cutoff 2024-10-01; Sep 2024 ends on the cutoff
+        assert expired_partitions(names, date(2026, 10, 17), retention_months=24) == ["audit_logs_y2024m09"]
+
+    def test_default_partition_never_dropped(self):
+        assert expired_partitions(["audit_logs_default"], date(2030, 1, 1), retention_months=1) == []
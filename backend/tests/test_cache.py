@@ -0,0 +1,89 @@
+"""Tests for the TTL/LRU cache and the admin user-summary cache."""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User
+from app.services import user_summary_service
+from app.services.user_summary_service import UNKNOWN_USER, UserRef, get_user_summaries
+from app.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=30, clock=clock)
+        cache.set("a", 1)
+        clock.now = 29
+        assert cache.get("a") == 1
+        clock.now = 31
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_per_entry_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=30, clock=clock)
+        cache.set("short", 1, ttl=5)
+        cache.set("default", 2)
+        clock.now = 10
+        assert cache.get_many(["short", "default"]) == {"default": 2}
+
+    def test_least_recently_used_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+    def test_invalidate(self):
+        cache = TTLCache(maxsize=10, ttl=30)
+        cache.set("a", 1)
+        cache.invalidate("a")
+        cache.invalidate("missing")
+        assert cache.get("a", "default") == "default"
+
+
+class TestUserSummaries:
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(user_summary_service, "user_summary_cache", TTLCache(maxsize=100, ttl=30))
+
+    @pytest.fixture
+    def user_ids(self, sqlite_engine):
+        db = sessionmaker(bind=sqlite_engine)()
+        users = [User(pan_hash="h" * 64, phone=f"98765{i:05d}", name=f"User {i}",
+                      consent_ts=datetime.utcnow(), consent_ip="127.0.0.1") for i in range(3)]
+        db.add_all(users)
+        db.commit()
+        ids = [u.id for u in users]
+        db.close()
+        return ids
+
+    @pytest.mark.asyncio
+    async def test_one_query_then_cached(self, user_ids, async_sqlite_engine, statement_counter):
+        factory = async_sessionmaker(async_sqlite_engine)
+        missing = uuid.uuid4()
+        async with factory() as db:
+            first = await get_user_summaries(db, user_ids + [missing])
+            assert len(statement_counter) == 1
+
+            statement_counter.clear()
+            second = await get_user_summaries(db, user_ids)
+            assert statement_counter == []
+
+        assert first[user_ids[0]] == UserRef(name="User 0", phone="9876500000")
+        assert first[missing] == UNKNOWN_USER
+        assert second == {uid: first[uid] for uid in user_ids}
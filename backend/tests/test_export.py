@@ -0,0 +1,72 @@
+"""Tests for streaming admin exports."""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.callback import Callback
+from app.models.user import User
+from app.services.export_service import encode_csv, gzip_stream, stream_export
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.fixture
+def seeded(sqlite_engine):
+    db = sessionmaker(bind=sqlite_engine)()
+    for i in range(7):
+        user = User(pan_hash="h" * 64, phone=f"98765{i:05d}", name=f"User {i}",
+                    consent_ts=datetime(2026, 1, 1), consent_ip="127.0.0.1")
+        db.add(user)
+        db.flush()
+        db.add(Callback(user_id=user.id, preferred_time=datetime(2026, 2, 1), reason="Settlement, urgent"))
+    db.commit()
+    db.close()
+
+
+class TestStreamExport:
+    @pytest.mark.asyncio
+    async def test_csv_in_chunks_with_single_header(self, seeded, async_sqlite_engine):
+        chunks = await _collect(stream_export(async_sqlite_engine, "users", "csv", chunk_rows=3))
+        assert len(chunks) == 3  # 3 + 3 + 1 rows
+
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        assert rows[0] == ["id", "name", "phone", "role", "consent_ts", "created_at"]
+        assert len(rows) == 8
+        assert "pan_hash" not in rows[0]
+
+    @pytest.mark.asyncio
+    async def test_ndjson(self, seeded, async_sqlite_engine):
+        body = b"".join(await _collect(stream_export(async_sqlite_engine, "callbacks", "ndjson")))
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        assert len(records) == 7
+        assert records[0]["reason"] == "Settlement, urgent"
+        assert records[0]["preferred_time"] == "2026-02-01T00:00:00"
+
+    @pytest.mark.asyncio
+    async def test_empty_csv_has_header(self, async_sqlite_engine):
+        body = b"".join(await _collect(stream_export(async_sqlite_engine, "health-checks", "csv")))
+        assert body.decode().strip().startswith("id,user_id,score")
+
+    @pytest.mark.asyncio
+    async def test_gzip_round_trip(self):
+        async def chunks():
+            for i in range(3):
+                yield encode_csv(["n"], [[i]], header=i == 0)
+
+        compressed = b"".join(await _collect(gzip_stream(chunks())))
+        assert gzip.decompress(compressed) == b"n\r\n0\r\n1\r\n2\r\n"
+
+    def test_csv_escapes_formula_cells(self):
+        rows = [["=HYPERLINK(\"x\")", "+91", "-2+3", "@SUM(A1)", "\tx", "\rx", "Asha", -5]]
+        body = encode_csv(["a", "b", "c", "d", "e", "f", "g", "h"], rows, header=False)
+        assert next(csv.reader(io.StringIO(body.decode()))) == [
+            "'=HYPERLINK(\"x\")", "'+91", "'-2+3", "'@SUM(A1)", "'\tx", "'\rx", "Asha", "-5",
+        ]
@@ -0,0 +1,112 @@
+"""Tests for the streaming AA FI data parser."""
+
+import json
+
+import httpx
+import ijson
+import pytest
+
+from app.config import get_settings
+from app.integrations.http_client import HTTPClientRegistry, get_http_registry, set_http_registry
+from app.services import setu_aa_service
+from app.services.setu_aa_service import FIStreamParser, parse_fi_to_debt_accounts
+
+
+def _parse(body: bytes, chunk_size: int) -> list:
+    parser = FIStreamParser()
+    accounts = []
+    for i in range(0, len(body), chunk_size):
+        accounts.extend(parser.feed(body[i:i + chunk_size]))
+    return accounts + parser.close()
+
+
+def _deposit(transactions, fi_type_last=False):
+    item = {"maskedAccNumber": "XXXX1234", "fiType": "DEPOSIT",
+            "account": {"transactions": {"transaction": transactions}}}
+    if fi_type_last:
+        item["fiType"] = item.pop("fiType")
+    return item
+
+
+def _txn(narration, amount="100.00", type_="DEBIT"):
+    return {"type": type_, "amount": amount, "narration": narration, "mode": "UPI"}
+
+
+class TestFIStreamParser:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+    def test_matches_in_memory_parser(self, chunk_size):
+        fi_data = setu_aa_service._mock_fetch_fi_data("consent-1")
+        body = json.dumps(fi_data).encode()
+        assert _parse(body, chunk_size) == parse_fi_to_debt_accounts(fi_data)
+
+    def test_fi_type_after_transactions(self):
+        fi_data = {"fi_data": [{"data": [
+            _deposit([_txn("EMI - HDFC"), _txn("Groceries")], fi_type_last=True),
+            {"account": {"transactions": {"transaction": [_txn("EMI - Not a deposit")]}},
+             "fiType": "TERM_DEPOSIT"},
+        ]}]}
+        accounts = _parse(json.dumps(fi_data).encode(), 5)
+        assert accounts == parse_fi_to_debt_accounts(fi_data)
+        assert [a["lender"] for a in accounts] == ["HDFC"]
+
+    def test_numeric_amounts_and_fip_count(self):
+        fi_data = {"fi_data": [
+            {"data": [_deposit([_txn("EMI - Bajaj", amount=8400.5)])]},
+            {"data": []},
+        ]}
+        parser = FIStreamParser()
+        accounts = parser.feed(json.dumps(fi_data).encode()) + parser.close()
+        assert accounts[0]["emi"] == 8400.5
+        assert parser.fip_count == 2
+
+    def test_accounts_yielded_before_body_ends(self):
+        transactions = [_txn("UPI payment") for _ in range(2000)]
+        transactions[10] = _txn("EMI - HDFC")
+        body = json.dumps({"fi_data": [{"data": [_deposit(transactions)]}]}).encode()
+
+        parser = FIStreamParser()
+        first = parser.feed(body[:len(body) // 2])
+        assert [a["lender"] for a in first] == ["HDFC"]
+        assert parser.feed(body[len(body) // 2:]) + parser.close() == []
+
+    def test_truncated_body_raises(self):
+        body = json.dumps(setu_aa_service._mock_fetch_fi_data("consent-1")).encode()
+        parser = FIStreamParser()
+        parser.feed(body[:-10])
+        with pytest.raises(ijson.IncompleteJSONError):
+            parser.close()
+
+
+class TestSetuFetchAccounts:
+    @pytest.fixture
+    def setu_session(self, monkeypatch):
+        """Serve the mock FI payload from a chunked Setu session endpoint."""
+        body = json.dumps(setu_aa_service._mock_fetch_fi_data("consent-1")).encode()
+        requests = []
+
+        async def chunks():
+            for i in range(0, len(body), 64):
+                yield body[i:i + 64]
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, content=chunks())
+
+        async def token():
+            return "token"
+
+        monkeypatch.setattr(setu_aa_service, "_get_setu_token", token)
+        monkeypatch.setattr(get_settings(), "SETU_AA_PROVIDER", "setu")
+        monkeypatch.setattr(get_settings(), "SETU_AA_CLIENT_ID", "client")
+        previous = get_http_registry()
+        set_http_registry(HTTPClientRegistry(transport_factory=lambda config: httpx.MockTransport(handler)))
+        yield requests
+        set_http_registry(previous)
+
+    @pytest.mark.asyncio
+    async def test_streams_session_body(self, setu_session):
+        accounts, fip_count = await setu_aa_service.fetch_session_accounts("consent-1", "session-1")
+
+        assert setu_session[0].url.path.endswith("/sessions/session-1")
+        assert accounts == parse_fi_to_debt_accounts(setu_aa_service._mock_fetch_fi_data("consent-1"))
+        assert fip_count == 1
@@ -1,7 +1,14 @@
 """Unit tests for the health score calculation engine."""
 
+import random
+
+import numpy as np
 import pytest
-from app.services.health_score import calculate_health_score
+from app.services.health_score import (
+    AccountBatch,
+    calculate_health_score,
+    calculate_health_scores_batch,
+)
 
 
 class TestHealthScoreAlgorithm:
@@ -191,3 +198,66 @@ class TestHealthScoreAlgorithm:
         ] * 10  # Extreme case
         result = calculate_health_score(accounts, monthly_income=10000)
         assert 0 <= result.score <= 100
+
+
+class TestBatchHealthScore:
+    """The vectorised batch scorer must match the scalar calculator exactly."""
+
+    @staticmethod
+    def _random_account(rng: random.Random) -> dict:
+        return {
+            "lender_name": rng.choice(["HDFC", "ICICI", "SBI", "Bajaj"]),
+            "account_type": rng.choice(["personal_loan", "credit_card", "home_loan"]),
+            "outstanding": rng.choice([0, 100000, round(rng.uniform(1000, 5000000), 2)]),
+            "interest_rate": rng.choice([12, 24, 30, round(rng.uniform(5, 45), 2)]),
+            "emi_amount": round(rng.uniform(0, 60000), 2),
+            "status": rng.choice(["active", "overdue", "closed", "written_off"]),
+            "utilization": rng.choice([0.0, 0.75, round(rng.uniform(0, 1), 2)]),
+            "payment_history": round(rng.uniform(0, 1), 2),
+        }
+
+    def test_matches_scalar_on_random_portfolio(self):
+        rng = random.Random(42)
+        users = [
+            [self._random_account(rng) for _ in range(rng.randint(0, 12))]
+            for _ in range(500)
+        ]
+        incomes = [rng.choice([None, 0, round(rng.uniform(10000, 200000), 2)]) for _ in users]
+
+        expected = [calculate_health_score(accs, inc) for accs, inc in zip(users, incomes)]
+        batch = AccountBatch.from_accounts(users)
+        income_arr = np.array([np.nan if inc is None else inc for inc in incomes])
+        assert calculate_health_scores_batch(batch, income_arr) == expected
+
+    def test_matches_scalar_without_incomes(self):
+        rng = random.Random(7)
+        users = [[self._random_account(rng) for _ in range(5)] for _ in range(50)]
+        expected = [calculate_health_score(accs) for accs in users]
+        assert calculate_health_scores_batch(AccountBatch.from_accounts(users)) == expected
+
+    def test_user_without_accounts_is_healthy(self):
+        accounts = [{
+            "lender_name": "Overdue Bank",
+            "account_type": "personal_loan",
+            "outstanding": 100000,
+            "interest_rate": 30,
+            "emi_amount": 5000,
+            "status": "overdue",
+            "payment_history": 0.5,
+        }]
+        results = calculate_health_scores_batch(AccountBatch.from_accounts([[], accounts, []]))
+
+        assert len(results) == 3
+        assert results[0] == calculate_health_score([])
+        assert results[2] == calculate_health_score([])
+        assert results[1] == calculate_health_score(accounts)
+        assert "High interest rate (30%)" in results[1].flagged_accounts[0]["reason"]
+
+    def test_none_values_use_defaults(self):
+        """DB rows carry NULLs for optional columns; they score like absent keys."""
+        with_nulls = [{"lender_name": "X", "account_type": "personal_loan", "outstanding": 50000,
+                       "interest_rate": None, "emi_amount": None, "status": "active"}]
+        without = [{"lender_name": "X", "account_type": "personal_loan", "outstanding": 50000,
+                    "status": "active"}]
+        [result] = calculate_health_scores_batch(AccountBatch.from_accounts([with_nulls]))
+        assert result == calculate_health_score(without)
@@ -0,0 +1,102 @@
+"""Tests for the shared pooled HTTP client registry."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.integrations.http_client import HTTPClientRegistry, PoolConfig
+
+
+def _registry(handler, **pools):
+    return HTTPClientRegistry(
+        pools=pools or {"test": PoolConfig(max_connections=2)},
+        transport_factory=lambda config: httpx.MockTransport(handler),
+    )
+
+
+class TestHTTPClientRegistry:
+    @pytest.mark.asyncio
+    async def test_client_is_reused_per_provider(self):
+        registry = _registry(lambda request: httpx.Response(200))
+        assert registry.get("test") is registry.get("test")
+        assert registry.get("test") is not registry.get("other")
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_closed_client_is_recreated(self):
+        registry = _registry(lambda request: httpx.Response(200))
+        first = registry.get("test")
+        await registry.aclose()
+        assert first.is_closed
+        assert registry.get("test") is not first
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_pool_limits_and_timeouts_come_from_provider_config(self):
+        registry = _registry(
+            lambda request: httpx.Response(200),
+            slow=PoolConfig(max_connections=3, timeout=42.0, connect_timeout=2.0),
+        )
+        client = registry.get("slow")
+        assert client.timeout.read == 42.0
+        assert client.timeout.connect == 2.0
+        assert registry.stats()["slow"]["max_connections"] == 3
+        await registry.aclose()
+
+
+class TestPoolMetrics:
+    @pytest.mark.asyncio
+    async def test_counts_requests_and_releases_slots(self):
+        registry = _registry(lambda request: httpx.Response(200, json={"ok": True}))
+        client = registry.get("test")
+
+        for _ in range(3):
+            resp = await client.get("https://example.test/")
+            assert resp.json() == {"ok": True}
+
+        stats = registry.stats()["test"]
+        assert stats["requests_total"] == 3
+        assert stats["in_flight"] == 0
+        assert stats["peak_in_flight"] == 1
+        assert stats["saturated_total"] == 0
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_saturation_recorded_when_pool_is_full(self):
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200)
+
+        registry = _registry(handler)
+        client = registry.get("test")
+
+        tasks = [asyncio.create_task(client.get("https://example.test/")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        stats = registry.stats()["test"]
+        assert stats["in_flight"] == 3
+        assert stats["saturated_total"] == 1  # third request found 2/2 in use
+        assert stats["utilization"] == 1.5
+
+        release.set()
+        await asyncio.gather(*tasks)
+        stats = registry.stats()["test"]
+        assert stats["in_flight"] == 0
+        assert stats["peak_in_flight"] == 3
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_transport_error_releases_slot(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        registry = _registry(handler)
+        with pytest.raises(httpx.ConnectError):
+            await registry.get("test").get("https://example.test/")
+
+        stats = registry.stats()["test"]
+        assert stats["in_flight"] == 0
+        assert stats["errors_total"] == 1
+        await registry.aclose()
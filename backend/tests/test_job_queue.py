@@ -0,0 +1,203 @@
+"""Tests for the background job queue and the health check job."""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.services import health_check_service
+from app.utils.job_queue import (
+    FAILED,
+    SUCCEEDED,
+    InMemoryJobStore,
+    InProcessJobQueue,
+    JobFailed,
+    RedisJobQueue,
+    RedisJobStore,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.lists = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    async def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop() if src == "RIGHT" else items.pop(0)
+        target = self.lists.setdefault(destination, [])
+        target.append(value) if dest == "RIGHT" else target.insert(0, value)
+        return value
+
+    async def blmove(self, source, destination, timeout, src="LEFT", dest="RIGHT"):
+        value = await self.lmove(source, destination, src=src, dest=dest)
+        if value is None:
+            await asyncio.sleep(0)
+        return value
+
+    async def lrem(self, key, count, value):
+        self.lists[key].remove(value)
+
+
+async def _wait_done(store, job_id, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await store.get(job_id)
+        if job.done or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.01)
+
+
+class TestJobQueue:
+    @pytest.fixture
+    def queue(self):
+        queue = InProcessJobQueue(InMemoryJobStore(ttl=60), workers=2)
+
+        async def echo(payload):
+            return {"echo": payload["value"]}
+
+        async def rejected(payload):
+            raise JobFailed("nope", status_code=429)
+
+        async def crashes(payload):
+            raise RuntimeError("boom")
+
+        queue.register("echo", echo)
+        queue.register("rejected", rejected)
+        queue.register("crashes", crashes)
+        return queue
+
+    @pytest.mark.asyncio
+    async def test_outcomes_recorded(self, queue):
+        await queue.start()
+        ok = await queue.submit("echo", {"value": 1})
+        bad = await queue.submit("rejected", {})
+        crash = await queue.submit("crashes", {})
+
+        ok, bad, crash = [await _wait_done(queue.store, j.id) for j in (ok, bad, crash)]
+        await queue.stop()
+
+        assert (ok.status, ok.result) == (SUCCEEDED, {"echo": 1})
+        assert (bad.status, bad.error) == (FAILED, {"status_code": 429, "detail": "nope"})
+        assert (crash.status, crash.error["status_code"]) == (FAILED, 500)
+
+    @pytest.mark.asyncio
+    async def test_unknown_kind_rejected(self, queue):
+        with pytest.raises(ValueError):
+            await queue.submit("missing", {})
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_encrypts_payload(self):
+        redis = FakeRedis()
+        queue = RedisJobQueue(redis, RedisJobStore(redis, ttl=60), workers=1)
+
+        async def echo(payload):
+            return {"pan": payload["pan"]}
+
+        queue.register("echo", echo)
+        await queue.start()
+        job = await queue.submit("echo", {"pan": "ABCDE1234F"})
+        assert "ABCDE1234F" not in json.dumps(redis.lists)
+
+        job = await _wait_done(queue.store, job.id)
+        await queue.stop()
+        assert job.result == {"pan": "ABCDE1234F"}
+        assert redis.lists["exitdebt:jobs:processing"] == []
+
+    @pytest.mark.asyncio
+    async def test_stop_fails_running_job(self, queue):
+        started = asyncio.Event()
+
+        async def hangs(payload):
+            started.set()
+            await asyncio.sleep(60)
+
+        queue.register("hangs", hangs)
+        await queue.start()
+        job = await queue.submit("hangs", {})
+        await started.wait()
+        await queue.stop()
+
+        job = await queue.store.get(job.id)
+        assert (job.status, job.error["status_code"]) == (FAILED, 503)
+
+    @pytest.mark.asyncio
+    async def test_redis_job_of_dead_worker_requeued(self):
+        redis = FakeRedis()
+        store = RedisJobStore(redis, ttl=60)
+        dead = RedisJobQueue(redis, store, workers=1)
+
+        async def echo(payload):
+            return {"echo": payload["value"]}
+
+        dead.register("echo", echo)
+        job = await dead.submit("echo", {"value": 1})
+        assert await dead._get() is not None  # claimed, then the worker process is killed
+        assert redis.lists["exitdebt:jobs"] == []
+
+        queue = RedisJobQueue(redis, store, workers=1)
+        queue.register("echo", echo)
+        assert await queue.requeue_unfinished() == 1
+        await queue.start()
+        job = await _wait_done(store, job.id)
+        await queue.stop()
+        assert (job.status, job.result) == (SUCCEEDED, {"echo": 1})
+        assert redis.lists["exitdebt:jobs:processing"] == []
+
+
+class TestHealthCheckJob:
+    PAYLOAD = {"pan": "ABCDE1234F", "phone": "9876543210", "name": "Test User", "consent": True}
+
+    @pytest.fixture(autouse=True)
+    def _reset_rate_limiter(self):
+        from app.utils.rate_limiter import InMemoryRateLimitBackend, rate_limiter
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+        yield
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+
+    @pytest.fixture
+    def queue(self, async_sqlite_engine):
+        queue = InProcessJobQueue(InMemoryJobStore(ttl=60), workers=1)
+        health_check_service.register_jobs(
+            queue, async_sessionmaker(async_sqlite_engine, autoflush=False, expire_on_commit=False),
+        )
+        return queue
+
+    @pytest.mark.asyncio
+    async def test_pipeline_runs_in_worker(self, queue):
+        await queue.start()
+        job = await queue.submit(health_check_service.HEALTH_CHECK_JOB,
+                                 {"request": self.PAYLOAD, "client_ip": "127.0.0.1"})
+        job = await _wait_done(queue.store, job.id)
+        await queue.stop()
+
+        assert job.status == SUCCEEDED
+        assert 0 <= job.result["score"] <= 100
+        assert job.result["id"]
+
+    @pytest.mark.asyncio
+    async def test_bureau_failure_reported_as_502(self, queue, monkeypatch):
+        async def _fail(**kwargs):
+            raise RuntimeError("bureau down")
+
+        monkeypatch.setattr(health_check_service._cibil_service, "pull_report", _fail)
+        await queue.start()
+        job = await queue.submit(health_check_service.HEALTH_CHECK_JOB,
+                                 {"request": self.PAYLOAD, "client_ip": "127.0.0.1"})
+        job = await _wait_done(queue.store, job.id)
+        await queue.stop()
+
+        assert job.status == FAILED
+        assert job.error["status_code"] == 502
@@ -0,0 +1,49 @@
+"""Unit tests for the QPS pacer."""
+
+import asyncio
+
+from app.utils.pacer import Pacer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+
+
+class TestPacer:
+    def test_spaces_calls_by_rate(self):
+        clock = FakeClock()
+        pacer = Pacer(rate=4, clock=clock, sleep=clock.sleep)
+
+        async def burst():
+            for _ in range(4):
+                await pacer.wait()
+
+        asyncio.new_event_loop().run_until_complete(burst())
+        assert clock.sleeps == [0.25, 0.5, 0.75]
+
+    def test_idle_time_is_not_banked(self):
+        clock = FakeClock()
+        pacer = Pacer(rate=2, clock=clock, sleep=clock.sleep)
+        loop = asyncio.new_event_loop()
+
+        loop.run_until_complete(pacer.wait())
+        clock.now += 10
+        loop.run_until_complete(pacer.wait())
+        loop.run_until_complete(pacer.wait())
+        assert clock.sleeps == [0.5]
+
+    def test_zero_rate_disables_pacing(self):
+        clock = FakeClock()
+        pacer = Pacer(rate=0, clock=clock, sleep=clock.sleep)
+        loop = asyncio.new_event_loop()
+        for _ in range(3):
+            loop.run_until_complete(pacer.wait())
+        assert clock.sleeps == []
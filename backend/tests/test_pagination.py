@@ -0,0 +1,95 @@
+"""Tests for page-number and keyset pagination."""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User
+from app.utils.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+
+
+class TestCursor:
+    def test_round_trip(self):
+        ts, row_id = datetime(2026, 10, 1, 12, 30, 5, 123456), uuid4()
+        assert decode_cursor(encode_cursor(ts, row_id)) == (ts, row_id)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(datetime(2026, 1, 1), uuid4())
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "eyJ0IjoxfQ"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+
+class TestPaginate:
+    @pytest.fixture
+    def users(self, sqlite_engine):
+        """25 users; pairs share a created_at so the id tiebreak matters."""
+        base = datetime(2026, 10, 1)
+        db = sessionmaker(bind=sqlite_engine)()
+        for i in range(25):
+            db.add(User(pan_hash="h" * 64, phone=f"98765{i:05d}", name=f"User {i}",
+                        consent_ts=base, consent_ip="127.0.0.1",
+                        created_at=base + timedelta(minutes=i // 2)))
+        db.commit()
+        db.close()
+
+    @pytest.fixture
+    def session_factory(self, async_sqlite_engine):
+        return async_sessionmaker(async_sqlite_engine, expire_on_commit=False)
+
+    @pytest.mark.asyncio
+    async def test_cursor_walk_matches_full_order(self, users, session_factory):
+        async with session_factory() as db:
+            expected = (await db.scalars(
+                select(User.id).order_by(User.created_at.desc(), User.id.desc())
+            )).all()
+
+            seen, cursor = [], None
+            while True:
+                result = await paginate(db, select(User), User.created_at, User.id,
+                                        page_size=10, mode="cursor", cursor=cursor)
+                seen.extend(u.id for u in result.rows)
+                cursor = result.next_cursor
+                if cursor is None:
+                    break
+
+        assert seen == list(expected)
+        assert result.total is None and result.page is None
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self, users, session_factory):
+        async with session_factory() as db:
+            result = await paginate(db, select(User), User.created_at, User.id,
+                                    page_size=25, mode="cursor")
+        assert len(result.rows) == 25
+        assert result.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_page_mode_keeps_exact_total(self, users, session_factory):
+        async with session_factory() as db:
+            result = await paginate(db, select(User), User.created_at, User.id,
+                                    page_size=10, page=3)
+        response = result.response([])
+        assert len(result.rows) == 5
+        assert (response.total, response.page, response.total_pages) == (25, 3, 3)
+        assert response.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_estimate_unavailable_off_postgres(self, users, session_factory):
+        async with session_factory() as db:
+            result = await paginate(db, select(User), User.created_at, User.id,
+                                    page_size=10, mode="cursor", estimate_table="users")
+        assert result.total is None
+        assert result.total_estimated is False
@@ -0,0 +1,142 @@
+"""Tests for the PAN verification result cache."""
+
+import json
+
+import pytest
+
+from app.services import setu_pan_service
+from app.services.pan_cache import (
+    InMemoryPanCacheStore,
+    PanVerificationCache,
+    RedisPanCacheStore,
+    set_pan_cache,
+)
+from app.utils.security import hash_pan
+
+SUCCESS = {"verification": "success", "message": "PAN is valid", "data": {"full_name": "John Doe"}}
+INVALID = {"verification": "failed", "message": "PAN is invalid", "data": {"full_name": ""}}
+NOT_FOUND = {
+    "verification": "failed",
+    "message": "PAN not found",
+    "error": {"code": "NOT_FOUND", "detail": "No PAN record found"},
+}
+TIMEOUT = {
+    "verification": "error",
+    "message": "Setu API timeout",
+    "error": {"code": "TIMEOUT", "detail": "Request timed out after 30s"},
+}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+
+def make_cache(store=None):
+    return PanVerificationCache(
+        store or InMemoryPanCacheStore(maxsize=100),
+        success_ttl=86400, failure_ttl=3600, not_found_ttl=600,
+    )
+
+
+class TestTTLSelection:
+    def test_ttl_per_outcome(self):
+        cache = make_cache()
+        assert cache.ttl_for(SUCCESS) == 86400
+        assert cache.ttl_for(INVALID) == 3600
+        assert cache.ttl_for(NOT_FOUND) == 600
+
+    def test_errors_not_cached(self):
+        assert make_cache().ttl_for(TIMEOUT) is None
+
+
+class TestRedisStore:
+    @pytest.mark.asyncio
+    async def test_keyed_by_hash_and_encrypted(self):
+        redis = FakeRedis()
+        cache = make_cache(RedisPanCacheStore(redis))
+        await cache.put("abcde1234a", SUCCESS)
+
+        key = "exitdebt:pan:" + hash_pan("ABCDE1234A")
+        assert list(redis.data) == [key]
+        assert redis.expiry[key] == 86400
+        assert "John Doe" not in redis.data[key]
+        assert await cache.get("ABCDE1234A") == SUCCESS
+
+    @pytest.mark.asyncio
+    async def test_negative_entry_uses_not_found_ttl(self):
+        redis = FakeRedis()
+        await make_cache(RedisPanCacheStore(redis)).put("ABCDE1234Z", NOT_FOUND)
+        assert list(redis.expiry.values()) == [600]
+
+    @pytest.mark.asyncio
+    async def test_store_failure_is_a_miss(self):
+        class BrokenRedis:
+            async def get(self, key):
+                raise ConnectionError("down")
+
+            async def set(self, key, value, ex=None):
+                raise ConnectionError("down")
+
+        cache = make_cache(RedisPanCacheStore(BrokenRedis()))
+        await cache.put("ABCDE1234A", SUCCESS)
+        assert await cache.get("ABCDE1234A") is None
+
+
+class TestVerifyPanCaching:
+    @pytest.fixture
+    def upstream(self, monkeypatch):
+        """Mock provider that answers from ``responses`` and counts calls."""
+        state = {"calls": 0, "responses": {}}
+
+        def fake(pan, consent, reason):
+            state["calls"] += 1
+            return json.loads(json.dumps(state["responses"][pan]))
+
+        monkeypatch.setattr(setu_pan_service, "_mock_verify_pan", fake)
+        set_pan_cache(make_cache())
+        yield state
+        set_pan_cache(None)
+
+    @pytest.mark.asyncio
+    async def test_repeat_verification_served_from_cache(self, upstream):
+        upstream["responses"]["ABCDE1234A"] = SUCCESS
+        first = await setu_pan_service.verify_pan("ABCDE1234A")
+        second = await setu_pan_service.verify_pan("abcde1234a")
+        assert first == second == SUCCESS
+        assert upstream["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_not_found_cached(self, upstream):
+        upstream["responses"]["ABCDE1234Z"] = NOT_FOUND
+        await setu_pan_service.verify_pan("ABCDE1234Z")
+        await setu_pan_service.verify_pan("ABCDE1234Z")
+        assert upstream["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_transient_error_retried(self, upstream):
+        upstream["responses"]["ABCDE1234A"] = TIMEOUT
+        await setu_pan_service.verify_pan("ABCDE1234A")
+        upstream["responses"]["ABCDE1234A"] = SUCCESS
+        assert (await setu_pan_service.verify_pan("ABCDE1234A")) == SUCCESS
+        assert upstream["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_result_still_requires_consent(self, upstream):
+        upstream["responses"]["ABCDE1234A"] = SUCCESS
+        await setu_pan_service.verify_pan("ABCDE1234A")
+
+        denied = await setu_pan_service.verify_pan("ABCDE1234A", consent="N")
+        assert denied["verification"] == "error"
+        assert "data" not in denied
+        short = await setu_pan_service.verify_pan("ABCDE1234A", reason="too short")
+        assert short["error"]["code"] == "BAD_REQUEST"
+        assert upstream["calls"] == 1
@@ -1,12 +1,28 @@
 """Unit tests for Setu PAN verification service."""
 
+import asyncio
+
 import pytest
+from app.services import setu_pan_service
 from app.services.setu_pan_service import (
     verify_pan,
+    verify_pans,
     is_pan_valid,
     get_verified_name,
+    set_pacer,
     _mock_verify_pan,
 )
+from app.services.pan_cache import InMemoryPanCacheStore, PanVerificationCache, set_pan_cache
+from app.utils.pacer import Pacer
+
+
+@pytest.fixture(autouse=True)
+def fresh_pan_cache():
+    set_pan_cache(PanVerificationCache(
+        InMemoryPanCacheStore(maxsize=100), success_ttl=60, failure_ttl=60, not_found_ttl=60,
+    ))
+    yield
+    set_pan_cache(None)
 
 
 class TestMockPANVerification:
@@ -103,3 +119,127 @@ class TestAsyncPANVerification:
         result = await verify_pan("ABCDE1234F")
         assert isinstance(result, dict)
         assert "verification" in result
+
+
+class TestBulkPANVerification:
+    @pytest.fixture(autouse=True)
+    def unpaced(self):
+        set_pacer(Pacer(rate=0))
+        yield
+        set_pacer(None)
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        """Record upstream verify calls and track how many run at once."""
+        record = {"pans": [], "in_flight": 0, "peak": 0}
+
+        async def fake_verify(pan, consent, reason):
+            record["pans"].append(pan)
+            record["in_flight"] += 1
+            record["peak"] = max(record["peak"], record["in_flight"])
+            await asyncio.sleep(0.01)
+            record["in_flight"] -= 1
+            return _mock_verify_pan(pan, consent, reason)
+
+        monkeypatch.setattr(setu_pan_service, "_call_provider", fake_verify)
+        return record
+
+    @staticmethod
+    async def collect(pans, **kwargs):
+        return [line async for line in verify_pans(pans, **kwargs)]
+
+    @pytest.mark.asyncio
+    async def test_one_line_per_input(self, calls):
+        lines = await self.collect(["ABCDE1234A", "ABCDE1234B", "ZZZZZ9999Z"])
+        by_index = {line["index"]: line for line in lines}
+        assert sorted(by_index) == [0, 1, 2]
+        assert by_index[0]["verification"] == "success"
+        assert by_index[0]["pan"] == "A****1234A"
+        assert by_index[0]["data"]["full_name"] == "John Doe"
+        assert by_index[1]["verification"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_duplicates_verified_once(self, calls):
+        lines = await self.collect(["ABCDE1234A", "abcde1234a ", "ABCDE1234A", "ABCDE1234F"])
+        assert sorted(calls["pans"]) == ["ABCDE1234A", "ABCDE1234F"]
+        assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_malformed_pan_skips_upstream(self, calls):
+        lines = await self.collect(["BAD", "ABCDE1234A"])
+        assert calls["pans"] == ["ABCDE1234A"]
+        assert lines[0] == {
+            "index": 0,
+            "pan": "****",
+            "verification": "error",
+            "message": "Invalid PAN format",
+            "error": {"code": "BAD_REQUEST", "detail": "PAN format must be ABCDE1234F"},
+        }
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self, calls):
+        pans = [f"ABCDE{n:04d}Z" for n in range(20)]
+        lines = await self.collect(pans, concurrency=5)
+        assert len(lines) == 20
+        assert calls["peak"] == 5
+
+    @pytest.mark.asyncio
+    async def test_upstream_exception_reported_per_pan(self, monkeypatch):
+        async def failing(pan, consent, reason):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(setu_pan_service, "_call_provider", failing)
+        [line] = await self.collect(["ABCDE1234A"])
+        assert line["verification"] == "error"
+        assert line["error"]["code"] == "INTERNAL_ERROR"
+
+    @pytest.mark.asyncio
+    async def test_requests_paced(self, calls):
+        clock_sleeps = []
+
+        async def fake_sleep(seconds):
+            clock_sleeps.append(seconds)
+
+        set_pacer(Pacer(rate=10, clock=lambda: 0.0, sleep=fake_sleep))
+        await self.collect(["ABCDE1234A", "ABCDE1234B", "ABCDE1234F"])
+        assert [round(s, 3) for s in clock_sleeps] == [0.1, 0.2]
+
+    @pytest.mark.asyncio
+    async def test_single_verifications_share_budget(self, calls):
+        clock_sleeps = []
+
+        async def fake_sleep(seconds):
+            clock_sleeps.append(seconds)
+
+        set_pacer(Pacer(rate=10, clock=lambda: 0.0, sleep=fake_sleep))
+        await verify_pan("ABCDE1234A")
+        await self.collect(["ABCDE1234B", "ABCDE1234F"])
+        assert [round(s, 3) for s in clock_sleeps] == [0.1, 0.2]
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_not_paced(self, calls):
+        from app.services.pan_cache import get_pan_cache
+
+        await get_pan_cache().put("ABCDE1234A", _mock_verify_pan("ABCDE1234A", "Y", "Debt health check for ExitDebt user"))
+        clock_sleeps = []
+
+        async def fake_sleep(seconds):
+            clock_sleeps.append(seconds)
+
+        set_pacer(Pacer(rate=10, clock=lambda: 0.0, sleep=fake_sleep))
+        lines = await self.collect(["ABCDE1234A", "ABCDE1234B", "ABCDE1234F"])
+
+        assert sorted(calls["pans"]) == ["ABCDE1234B", "ABCDE1234F"]
+        assert [round(s, 3) for s in clock_sleeps] == [0.1]
+        assert {line["verification"] for line in lines} == {"success", "failed"}
+
+    @pytest.mark.asyncio
+    async def test_mock_latency(self, monkeypatch):
+        from app.config import get_settings
+
+        monkeypatch.setattr(get_settings(), "SETU_PAN_MOCK_LATENCY_SECONDS", 0.05)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await self.collect(["ABCDE1234A", "ABCDE1234B", "ABCDE1234F"], concurrency=3)
+        elapsed = loop.time() - started
+        assert 0.05 <= elapsed < 0.15  # three calls overlapped
@@ -0,0 +1,26 @@
+"""Tests for phone normalization."""
+
+import pytest
+
+from app.models.user import User
+from app.utils.phone import normalize_phone
+
+
+@pytest.mark.parametrize("raw,expected", [
+    ("9876543210", "9876543210"),
+    ("+91 98765-43210", "9876543210"),
+    ("919876543210", "9876543210"),
+    ("098765 43210", "9876543210"),
+    ("98765", "98765"),
+    ("DELETED", ""),
+    (None, ""),
+])
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+def test_user_phone_sets_normalized():
+    user = User(phone="+91 98765 43210")
+    assert user.phone_normalized == "9876543210"
+    user.phone = "DELETED"
+    assert user.phone_normalized == ""
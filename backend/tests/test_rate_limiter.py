@@ -0,0 +1,157 @@
+"""Tests for the CIBIL pull rate limiter and its backends."""
+
+import asyncio
+
+import pytest
+
+from app.utils import rate_limiter as rl
+from app.utils.rate_limiter import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    RedisRateLimitBackend,
+)
+
+WINDOW = 86400.0
+
+
+class FakeRedis:
+    """Minimal async stand-in for redis.asyncio.Redis counters."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value)
+
+    async def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    async def decr(self, key):
+        self.data[key] = self.data.get(key, 0) - 1
+        return self.data[key]
+
+    async def expire(self, key, seconds):
+        self.expiry[key] = seconds
+
+
+class Clock:
+    def __init__(self, start=1_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(rl.time, "time", c)
+    return c
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryRateLimitBackend()
+    return RedisRateLimitBackend(FakeRedis())
+
+
+class TestBackends:
+    @pytest.mark.asyncio
+    async def test_allows_up_to_limit(self, backend, clock):
+        results = [await backend.check_and_record("k", 3, WINDOW) for _ in range(5)]
+        assert results == [True, True, True, False, False]
+        assert await backend.remaining("k", 3, WINDOW) == 0
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent(self, backend, clock):
+        for _ in range(3):
+            await backend.check_and_record("a", 3, WINDOW)
+        assert await backend.check_and_record("b", 3, WINDOW) is True
+        assert await backend.remaining("b", 3, WINDOW) == 2
+
+    @pytest.mark.asyncio
+    async def test_refund_frees_a_slot(self, backend, clock):
+        for _ in range(3):
+            await backend.check_and_record("k", 3, WINDOW)
+        await backend.refund("k", WINDOW)
+        assert await backend.remaining("k", 3, WINDOW) == 1
+        assert await backend.check_and_record("k", 3, WINDOW) is True
+
+    @pytest.mark.asyncio
+    async def test_slots_free_up_after_window(self, backend, clock):
+        for _ in range(3):
+            await backend.check_and_record("k", 3, WINDOW)
+        clock.now += 2 * WINDOW
+        assert await backend.remaining("k", 3, WINDOW) == 3
+        assert await backend.check_and_record("k", 3, WINDOW) is True
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_never_over_admit(self, backend, clock):
+        results = await asyncio.gather(
+            *(backend.check_and_record("k", 3, WINDOW) for _ in range(20))
+        )
+        assert sum(results) == 3
+
+
+class TestInMemoryBackend:
+    @pytest.mark.asyncio
+    async def test_deque_bounded_by_limit(self, clock):
+        backend = InMemoryRateLimitBackend()
+        for _ in range(10):
+            await backend.check_and_record("k", 3, WINDOW)
+        assert len(backend._attempts["k"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_lazy_sweep_drops_stale_keys(self, clock):
+        backend = InMemoryRateLimitBackend(sweep_interval=0)
+        for i in range(100):
+            await backend.check_and_record(f"phone-{i}", 3, WINDOW)
+        clock.now += WINDOW + 1
+        await backend.check_and_record("fresh", 3, WINDOW)
+        assert list(backend._attempts) == ["fresh"]
+
+
+class TestRedisSlidingWindow:
+    @pytest.mark.asyncio
+    async def test_previous_window_weighted_by_overlap(self, clock):
+        redis = FakeRedis()
+        backend = RedisRateLimitBackend(redis)
+        clock.now = 10 * WINDOW + WINDOW * 0.9  # late in a window
+        for _ in range(3):
+            await backend.check_and_record("k", 3, WINDOW)
+
+        # Just into the next window the old attempts still weigh ~full
+        clock.now = 11 * WINDOW + WINDOW * 0.1
+        assert await backend.check_and_record("k", 3, WINDOW) is False
+
+        # Two thirds through, one third of 3 remains → 2 slots free
+        clock.now = 11 * WINDOW + WINDOW * (2 / 3) + 1
+        assert await backend.remaining("k", 3, WINDOW) == 2
+
+    @pytest.mark.asyncio
+    async def test_denied_attempt_is_compensated(self, clock):
+        redis = FakeRedis()
+        backend = RedisRateLimitBackend(redis)
+        for _ in range(5):
+            await backend.check_and_record("k", 3, WINDOW)
+        assert sum(redis.data.values()) == 3
+
+    @pytest.mark.asyncio
+    async def test_counter_expires_after_two_windows(self, clock):
+        redis = FakeRedis()
+        await RedisRateLimitBackend(redis).check_and_record("k", 3, WINDOW)
+        assert list(redis.expiry.values()) == [int(2 * WINDOW)]
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_uses_settings_limit_per_phone_and_action(self, clock):
+        limiter = RateLimiter(backend=InMemoryRateLimitBackend())
+        assert all([await limiter.check_and_record("9876543210") for _ in range(3)])
+        assert await limiter.check_and_record("9876543210") is False
+        assert await limiter.check_and_record("9876543210", action="other") is True
+        assert await limiter.remaining("9999999999") == 3
@@ -0,0 +1,208 @@
+"""Tests for the portfolio re-scoring job.
+
+Covers report grouping, checkpoint persistence, and an end-to-end run
+against an in-memory SQLite database.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User
+from app.models.cibil_report import CibilReport
+from app.models.debt_account import DebtAccount
+from app.models.health_score import HealthScore
+from app.jobs import rescore_portfolio as job
+from app.services.health_score import calculate_health_score
+
+
+def _account_row(report_id, user_id, lender="HDFC", status="active"):
+    return (report_id, user_id, lender, "personal_loan", 100000.0, 18.0, 5000.0, status, 0.0, 0.9)
+
+
+class TestGroupReports:
+    def test_rows_of_one_report_stay_together(self):
+        rows = [
+            _account_row("r1", "u1"),
+            _account_row("r1", "u1", lender="ICICI"),
+            _account_row("r2", "u2"),
+            _account_row("r3", "u3"),
+        ]
+        chunks = list(job._group_reports(rows, chunk_size=2))
+
+        assert [c.report_ids for c in chunks] == [["r1", "r2"], ["r3"]]
+        assert [a["lender_name"] for a in chunks[0].accounts[0]] == ["HDFC", "ICICI"]
+
+    def test_report_without_accounts_scores_as_empty(self):
+        rows = [(str(uuid.uuid4()), str(uuid.uuid4())) + (None,) * len(job._ACCOUNT_FIELDS)]
+        [chunk] = job._group_reports(rows, chunk_size=10)
+        assert chunk.accounts == [[]]
+
+        [row] = job.score_chunk(chunk)
+        assert row["score"] == 100
+
+
+class TestCheckpoint:
+    def test_roundtrip(self, tmp_path):
+        path = str(tmp_path / "ckpt.json")
+        ckpt = job.Checkpoint.load(path)
+        assert ckpt.last_report_id is None
+
+        ckpt.advance("abc", 10)
+        ckpt.advance("def", 5)
+
+        loaded = job.Checkpoint.load(path)
+        assert loaded.last_report_id == "def"
+        assert loaded.reports_done == 15
+
+        loaded.clear()
+        assert job.Checkpoint.load(path).last_report_id is None
+
+
+@pytest.fixture
+def sqlite_sessionmaker(sqlite_engine, monkeypatch):
+    factory = sessionmaker(bind=sqlite_engine, autoflush=False)
+    monkeypatch.setattr(job, "SessionLocal", factory)
+    return factory
+
+
+def _seed(db, n_users=5):
+    """Each user gets an old report (ignored) and a latest report with 3 accounts."""
+    expected = {}
+    for i in range(n_users):
+        user = User(pan_hash=f"hash{i}", phone=f"98765432{i:02d}", name=f"User {i}",
+                    consent_ts=datetime.utcnow(), consent_ip="127.0.0.1")
+        db.add(user)
+        db.flush()
+        old = CibilReport(user_id=user.id, pulled_at=datetime.utcnow() - timedelta(days=60))
+        latest = CibilReport(user_id=user.id, pulled_at=datetime.utcnow())
+        db.add_all([old, latest])
+        db.flush()
+        accounts = [
+            {"lender_name": "HDFC", "account_type": "personal_loan", "outstanding": 200000.0 + i,
+             "interest_rate": 20.0, "emi_amount": 9000.0, "status": "active",
+             "utilization": 0.0, "payment_history": 0.8},
+            {"lender_name": "ICICI", "account_type": "credit_card", "outstanding": 50000.0,
+             "interest_rate": 36.0, "emi_amount": 2500.0, "status": "overdue",
+             "utilization": 0.9, "payment_history": 0.5},
+            {"lender_name": "SBI", "account_type": "home_loan", "outstanding": 1500000.0,
+             "interest_rate": 9.0, "emi_amount": 15000.0, "status": "closed",
+             "utilization": 0.0, "payment_history": 1.0},
+        ]
+        db.add(DebtAccount(report_id=old.id, lender_name="Old", account_type="personal_loan",
+                           outstanding=1.0, status="active"))
+        for acc in accounts:
+            db.add(DebtAccount(report_id=latest.id, **acc))
+        expected[user.id] = calculate_health_score(accounts).score
+    db.commit()
+    return expected
+
+
+class TestRescorePortfolio:
+    def test_rescores_latest_report_per_user(self, sqlite_sessionmaker, tmp_path):
+        db = sqlite_sessionmaker()
+        expected = _seed(db)
+
+        processed = job.rescore_portfolio(
+            workers=0, chunk_size=2, checkpoint_path=str(tmp_path / "ckpt.json"),
+        )
+
+        assert processed == len(expected)
+        scores = {s.user_id: s.score for s in db.query(HealthScore).all()}
+        assert scores == expected
+        assert not (tmp_path / "ckpt.json").exists()  # cleared on completion
+
+    def test_process_pool_matches_inline(self, sqlite_sessionmaker, tmp_path):
+        db = sqlite_sessionmaker()
+        expected = _seed(db, n_users=7)
+
+        job.rescore_portfolio(workers=2, chunk_size=2, checkpoint_path=str(tmp_path / "ckpt.json"))
+
+        scores = {s.user_id: s.score for s in db.query(HealthScore).all()}
+        assert scores == expected
+
+    def test_resumes_from_checkpoint(self, sqlite_sessionmaker, tmp_path):
+        db = sqlite_sessionmaker()
+        _seed(db, n_users=4)
+        path = str(tmp_path / "ckpt.json")
+
+        # Pretend a previous run committed the first two reports in ID order.
+        rows = db.execute(job._latest_reports_stmt()).all()
+        first_two = sorted({str(r[0]) for r in rows})[:2]
+        job.Checkpoint(path=path).advance(first_two[-1], 2)
+
+        processed = job.rescore_portfolio(workers=0, chunk_size=10, checkpoint_path=path)
+
+        assert processed == 2
+        assert db.query(HealthScore).count() == 2
+
+    def test_tied_latest_reports_score_once(self, sqlite_sessionmaker, tmp_path):
+        db = sqlite_sessionmaker()
+        expected = _seed(db, n_users=2)
+        pulled_at = datetime.utcnow() + timedelta(days=1)
+        for user_id in expected:
+            db.add_all([CibilReport(user_id=user_id, pulled_at=pulled_at) for _ in range(2)])
+        db.commit()
+
+        processed = job.rescore_portfolio(workers=0, chunk_size=10, checkpoint_path=str(tmp_path / "ckpt.json"))
+
+        assert processed == 2
+        assert sorted(s.user_id for s in db.query(HealthScore).all()) == sorted(expected)
+
+    def test_interrupted_run_resumes_without_duplicates(self, sqlite_sessionmaker, tmp_path, monkeypatch):
+        db = sqlite_sessionmaker()
+        expected = _seed(db, n_users=5)
+        path = str(tmp_path / "ckpt.json")
+
+        write_chunk = job._write_chunk
+        calls = []
+
+        def crash_after_first_chunk(*args):
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("worker killed")
+            write_chunk(*args)
+
+        monkeypatch.setattr(job, "_write_chunk", crash_after_first_chunk)
+        with pytest.raises(RuntimeError):
+            job.rescore_portfolio(workers=0, chunk_size=2, checkpoint_path=path)
+        assert job.Checkpoint.load(path).reports_done == 2
+        assert db.query(HealthScore).count() == 2
+
+        monkeypatch.setattr(job, "_write_chunk", write_chunk)
+        processed = job.rescore_portfolio(workers=0, chunk_size=2, checkpoint_path=path)
+
+        assert processed == 3
+        db.expire_all()
+        scores = {}
+        for s in db.query(HealthScore).all():
+            assert s.user_id not in scores  # one row per user across both runs
+            scores[s.user_id] = s.score
+        assert scores == expected
+        assert not (tmp_path / "ckpt.json").exists()
+
+    def test_crash_between_commit_and_checkpoint_not_rescored(self, sqlite_sessionmaker, tmp_path, monkeypatch):
+        db = sqlite_sessionmaker()
+        expected = _seed(db, n_users=5)
+        path = str(tmp_path / "ckpt.json")
+
+        advance = job.Checkpoint.advance
+
+        def crash_before_second_checkpoint(self, last_report_id, reports):
+            if self.reports_done:
+                raise RuntimeError("worker killed")  # the second chunk is committed, not checkpointed
+            advance(self, last_report_id, reports)
+
+        monkeypatch.setattr(job.Checkpoint, "advance", crash_before_second_checkpoint)
+        with pytest.raises(RuntimeError):
+            job.rescore_portfolio(workers=0, chunk_size=2, checkpoint_path=path)
+        assert db.query(HealthScore).count() == 4
+
+        monkeypatch.setattr(job.Checkpoint, "advance", advance)
+        assert job.rescore_portfolio(workers=0, chunk_size=2, checkpoint_path=path) == 1
+
+        db.expire_all()
+        user_ids = [s.user_id for s in db.query(HealthScore).all()]
+        assert sorted(user_ids) == sorted(expected)
@@ -31,6 +31,29 @@ else:
     client = None  # type: ignore
 
 
+@pytest.fixture
+def db_session(sqlite_engine, async_sqlite_engine):
+    """Route the app's async DB dependency to SQLite.
+
+    Yields a sync session on the same database for seeding and assertions.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlalchemy.orm import sessionmaker
+    from app.database import get_async_db
+
+    async_factory = async_sessionmaker(async_sqlite_engine, autoflush=False, expire_on_commit=False)
+
+    async def _override():
+        async with async_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = _override
+    db = sessionmaker(bind=sqlite_engine, autoflush=False)()
+    yield db
+    db.close()
+    app.dependency_overrides.pop(get_async_db, None)
+
+
 class TestRootEndpoints:
     """Test the root and health endpoints."""
 
@@ -75,3 +98,697 @@ class TestOpenAPISpec:
     def test_docs_page_available(self):
         response = client.get("/docs")
         assert response.status_code == 200
+
+
+def _seed_health_check(db, n_accounts, link_report=True):
+    """Create a user, a report with n accounts and a score; return the score ID."""
+    from datetime import datetime
+    from app.models.user import User
+    from app.models.cibil_report import CibilReport
+    from app.models.debt_account import DebtAccount
+    from app.models.health_score import HealthScore
+
+    user = User(pan_hash="h" * 64, phone="9876543210", name="Test User",
+                consent_ts=datetime.utcnow(), consent_ip="127.0.0.1")
+    db.add(user)
+    db.flush()
+    report = CibilReport(user_id=user.id, credit_score=720)
+    db.add(report)
+    db.flush()
+    for i in range(n_accounts):
+        db.add(DebtAccount(report_id=report.id, lender_name=f"Lender {i}",
+                           account_type="personal_loan", outstanding=10000.0,
+                           interest_rate=18.0, emi_amount=1000.0, status="active"))
+    score = HealthScore(
+        user_id=user.id,
+        report_id=report.id if link_report else None,
+        score=72, dti_ratio=0.3, avg_rate=18.0, savings_est=600.0,
+        total_outstanding=10000.0 * n_accounts if link_report else None,
+        total_emi=1000.0 * n_accounts if link_report else None,
+    )
+    db.add(score)
+    db.commit()
+    return str(score.id)
+
+
+class TestHealthCheckReadPath:
+    """GET /api/health-check/{id} must use a constant number of statements."""
+
+    def test_statement_count_independent_of_account_count(self, db_session, statement_counter):
+        few_id = _seed_health_check(db_session, n_accounts=1)
+        many_id = _seed_health_check(db_session, n_accounts=25)
+
+        statement_counter.clear()
+        few = client.get(f"/api/health-check/{few_id}")
+        few_statements = len(statement_counter)
+
+        statement_counter.clear()
+        many = client.get(f"/api/health-check/{many_id}")
+        many_statements = len(statement_counter)
+
+        assert few.status_code == many.status_code == 200
+        assert len(many.json()["debt_accounts"]) == 25
+        assert many.json()["total_outstanding"] == 250000.0
+        assert many.json()["total_emi"] == 25000.0
+        assert few_statements == many_statements <= 2
+
+    def test_legacy_score_without_report_link(self, db_session, statement_counter):
+        check_id = _seed_health_check(db_session, n_accounts=3, link_report=False)
+
+        statement_counter.clear()
+        response = client.get(f"/api/health-check/{check_id}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["debt_accounts"]) == 3
+        assert data["total_outstanding"] == 30000.0
+        assert data["credit_score"] == 720
+        assert len(statement_counter) <= 4
+
+    def test_unknown_id_returns_404(self, db_session):
+        import uuid
+        response = client.get(f"/api/health-check/{uuid.uuid4()}")
+        assert response.status_code == 404
+
+
+class TestHealthCheckWritePath:
+    """POST /api/health-check persists everything in a single transaction."""
+
+    PAYLOAD = {"pan": "ABCDE1234F", "phone": "9876543210", "name": "Test User", "consent": True}
+
+    @pytest.fixture(autouse=True)
+    def _reset_rate_limiter(self):
+        from app.utils.rate_limiter import InMemoryRateLimitBackend, rate_limiter
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+        yield
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+
+    def test_single_commit_and_batched_account_insert(self, db_session, async_sqlite_engine):
+        from sqlalchemy import event
+
+        commits = []
+        statements = []
+        target = async_sqlite_engine.sync_engine
+        event.listen(target, "commit", lambda conn: commits.append(1))
+        event.listen(
+            target, "before_cursor_execute",
+            lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt),
+        )
+
+        response = client.post("/api/health-check", json=self.PAYLOAD)
+
+        assert response.status_code == 200
+        assert len(commits) == 1
+        account_inserts = [s for s in statements if s.startswith("INSERT INTO debt_accounts")]
+        assert len(account_inserts) == 1
+        assert not any(s.startswith("SELECT") and "FROM debt_accounts" in s for s in statements)
+
+    def test_response_matches_persisted_rows(self, db_session):
+        from app.models.audit_log import AuditLog
+        from app.models.debt_account import DebtAccount
+        from app.models.health_score import HealthScore
+
+        response = client.post("/api/health-check", json=self.PAYLOAD)
+        data = response.json()
+
+        score = db_session.query(HealthScore).one()
+        assert data["id"] == str(score.id)
+        assert score.report_id is not None
+        persisted_ids = {str(a.id) for a in db_session.query(DebtAccount).all()}
+        assert {a["id"] for a in data["debt_accounts"]} == persisted_ids
+        audit = db_session.query(AuditLog).one()
+        assert audit.event_type == "cibil_pull"
+        assert audit.user_id == score.user_id
+
+    def test_cibil_failure_writes_only_audit_event(self, db_session, monkeypatch):
+        from app.services import health_check_service
+        from app.models.audit_log import AuditLog
+        from app.models.user import User
+
+        async def _fail(**kwargs):
+            raise RuntimeError("bureau down")
+
+        monkeypatch.setattr(health_check_service._cibil_service, "pull_report", _fail)
+        response = client.post("/api/health-check", json=self.PAYLOAD)
+
+        assert response.status_code == 502
+        assert db_session.query(User).count() == 0
+        assert db_session.query(AuditLog).one().metadata_json["status"] == "error"
+
+    def test_rate_limit_slot_refunded_when_pull_fails(self, db_session, monkeypatch, event_loop):
+        from app.services import health_check_service
+        from app.utils.rate_limiter import rate_limiter
+
+        async def _fail(**kwargs):
+            raise RuntimeError("bureau down")
+
+        monkeypatch.setattr(health_check_service._cibil_service, "pull_report", _fail)
+        for _ in range(4):
+            assert client.post("/api/health-check", json=self.PAYLOAD).status_code == 502
+
+        assert event_loop.run_until_complete(rate_limiter.remaining(self.PAYLOAD["phone"])) == 3
+
+
+class TestAuditLogQuery:
+    """GET /api/internal/audit-logs requires a bounded time range."""
+
+    HEADERS = {"X-API-Key": "change-me-in-production"}
+
+    def _seed(self, db):
+        from datetime import datetime
+        from app.models.audit_log import AuditLog
+
+        for month, event_type in [(1, "otp_send"), (2, "otp_send"), (2, "cibil_pull"), (3, "otp_send")]:
+            db.add(AuditLog(event_type=event_type, phone="9876543210",
+                            created_at=datetime(2026, month, 15), metadata_json={}))
+        db.commit()
+
+    def test_filters_by_range_and_event_type(self, db_session):
+        self._seed(db_session)
+        response = client.get(
+            "/api/internal/audit-logs",
+            params={"start": "2026-02-01T00:00:00", "end": "2026-03-01T00:00:00", "event_type": "otp_send"},
+            headers=self.HEADERS,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["created_at"].startswith("2026-02-15")
+
+    def test_range_is_required(self, db_session):
+        response = client.get("/api/internal/audit-logs", headers=self.HEADERS)
+        assert response.status_code == 422
+
+    def test_range_is_capped(self, db_session):
+        response = client.get(
+            "/api/internal/audit-logs",
+            params={"start": "2025-01-01T00:00:00", "end": "2026-01-01T00:00:00"},
+            headers=self.HEADERS,
+        )
+        assert response.status_code == 400
+
+
+class TestStatsOverview:
+    """GET /api/internal/stats/overview reads the daily_stats view in one query."""
+
+    HEADERS = {"X-API-Key": "change-me-in-production"}
+
+    @pytest.fixture
+    def daily_stats(self, db_session, sqlite_engine):
+        from datetime import date
+        from app.services.stats_service import daily_stats
+
+        daily_stats.metadata.create_all(sqlite_engine)
+        rows = [
+            # day, users, checks, score_sum, savings, callbacks, pending, confirmed, completed, cancelled
+            (date(2026, 10, 1), 2, 2, 140, 10000.0, 1, 1, 0, 0, 0),
+            (date(2026, 10, 2), 1, 3, 210, 5000.0, 2, 0, 1, 1, 0),
+            (date(2026, 10, 3), 0, 1, 50, None, 1, 0, 0, 0, 1),
+        ]
+        with sqlite_engine.begin() as conn:
+            conn.execute(daily_stats.insert(), [dict(zip(daily_stats.c.keys(), r)) for r in rows])
+
+    def test_totals_in_one_statement(self, daily_stats, statement_counter):
+        statement_counter.clear()
+        response = client.get("/api/internal/stats/overview", headers=self.HEADERS)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_users"] == 3
+        assert data["total_health_checks"] == 6
+        assert data["avg_health_score"] == 66.7
+        assert data["total_savings_found"] == 15000
+        assert (data["callbacks_pending"], data["callbacks_confirmed"],
+                data["callbacks_completed"], data["callbacks_cancelled"]) == (1, 1, 1, 1)
+        assert len([s for s in statement_counter if s.startswith("SELECT")]) == 1
+
+    def test_date_range(self, daily_stats):
+        response = client.get(
+            "/api/internal/stats/overview",
+            params={"start": "2026-10-02", "end": "2026-10-03"},
+            headers=self.HEADERS,
+        )
+        data = response.json()
+        assert data["total_users"] == 1
+        assert data["total_health_checks"] == 4
+        assert data["total_callbacks"] == 3
+
+    def test_empty_range(self, daily_stats):
+        response = client.get(
+            "/api/internal/stats/overview",
+            params={"start": "2027-01-01"},
+            headers=self.HEADERS,
+        )
+        data = response.json()
+        assert data["total_users"] == 0
+        assert data["avg_health_score"] is None
+
+
+class TestCursorPagination:
+    """Admin list endpoints in pagination=cursor mode."""
+
+    HEADERS = {"X-API-Key": "change-me-in-production"}
+
+    def test_health_checks_cursor_walk(self, db_session):
+        ids = {_seed_health_check(db_session, n_accounts=1) for _ in range(5)}
+
+        seen, params = [], {"pagination": "cursor", "page_size": 2}
+        while True:
+            data = client.get("/api/internal/health-checks", params=params, headers=self.HEADERS).json()
+            seen.extend(item["id"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            params["cursor"] = data["next_cursor"]
+
+        assert len(seen) == 5 and set(seen) == ids
+        assert data["total"] is None and data["total_pages"] is None
+
+    def test_page_mode_unchanged(self, db_session):
+        for _ in range(3):
+            _seed_health_check(db_session, n_accounts=1)
+        data = client.get("/api/internal/health-checks", params={"page_size": 2},
+                          headers=self.HEADERS).json()
+        assert (data["total"], data["page"], data["total_pages"]) == (3, 1, 2)
+
+    def test_invalid_cursor_rejected(self, db_session):
+        response = client.get("/api/internal/users", params={"cursor": "garbage"}, headers=self.HEADERS)
+        assert response.status_code == 400
+
+
+class TestAdminListStatementCount:
+    """Admin lists load related users in one query, not one per row."""
+
+    HEADERS = {"X-API-Key": "change-me-in-production"}
+
+    @pytest.fixture(autouse=True)
+    def fresh_user_cache(self, monkeypatch):
+        from app.services import user_summary_service
+        from app.utils.cache import TTLCache
+
+        monkeypatch.setattr(user_summary_service, "user_summary_cache", TTLCache(maxsize=100, ttl=30))
+
+    def _seed_callbacks(self, db, n):
+        from datetime import datetime
+        from app.models.callback import Callback
+        from app.models.user import User
+
+        for i in range(n):
+            user = User(pan_hash="h" * 64, phone=f"98765{i:05d}", name=f"User {i}",
+                        consent_ts=datetime.utcnow(), consent_ip="127.0.0.1")
+            db.add(user)
+            db.flush()
+            db.add(Callback(user_id=user.id, preferred_time=datetime.utcnow()))
+        db.commit()
+
+    @pytest.mark.parametrize("n", [2, 20])
+    def test_callbacks_constant_statements(self, db_session, statement_counter, n):
+        self._seed_callbacks(db_session, n)
+
+        statement_counter.clear()
+        response = client.get("/api/internal/callbacks", params={"page_size": 100}, headers=self.HEADERS)
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == n
+        assert {item["user_name"] for item in response.json()["items"]} == {f"User {i}" for i in range(n)}
+        assert len(statement_counter) == 3  # count, page, users IN (...)
+
+        # Second load is served from the user-summary cache
+        statement_counter.clear()
+        client.get("/api/internal/callbacks", params={"page_size": 100}, headers=self.HEADERS)
+        assert len(statement_counter) == 2
+
+    def test_health_checks_constant_statements(self, db_session, statement_counter):
+        for _ in range(10):
+            _seed_health_check(db_session, n_accounts=1)
+
+        statement_counter.clear()
+        response = client.get("/api/internal/health-checks", params={"page_size": 100}, headers=self.HEADERS)
+        assert len(response.json()["items"]) == 10
+        assert response.json()["items"][0]["user_name"] == "Test User"
+        assert len(statement_counter) == 3
+
+
+class TestUserPhoneSearch:
+    """GET /api/internal/users?search= matches on the normalized phone."""
+
+    HEADERS = {"X-API-Key": "change-me-in-production"}
+
+    @pytest.fixture
+    def users(self, db_session):
+        from datetime import datetime
+        from app.models.user import User
+
+        for phone in ["9876543210", "+91 98111 22233", "9123498765"]:
+            db_session.add(User(pan_hash="h" * 64, phone=phone, name=phone,
+                                consent_ts=datetime.utcnow(), consent_ip="127.0.0.1"))
+        db_session.commit()
+
+    def _search(self, **params):
+        response = client.get("/api/internal/users", params=params, headers=self.HEADERS)
+        assert response.status_code == 200
+        return sorted(item["phone"] for item in response.json()["items"])
+
+    def test_substring(self, users):
+        assert self._search(search="98765") == ["9123498765", "9876543210"]
+
+    def test_prefix(self, users):
+        assert self._search(search="98765", match="prefix") == ["9876543210"]
+
+    def test_formatted_full_number_matches_exactly(self, users):
+        assert self._search(search="+91 98111-22233") == ["+91 98111 22233"]
+
+    def test_search_without_digits_rejected(self, users):
+        response = client.get("/api/internal/users", params={"search": "abc"}, headers=self.HEADERS)
+        assert response.status_code == 400
+
+
+class TestExports:
+    HEADERS = {"X-API-Key": "change-me-in-production"}
+
+    @pytest.fixture
+    def export_engine(self, async_sqlite_engine):
+        from app.database import get_async_engine
+
+        app.dependency_overrides[get_async_engine] = lambda: async_sqlite_engine
+        yield
+        app.dependency_overrides.pop(get_async_engine, None)
+
+    def test_gzip_csv_download(self, db_session, export_engine):
+        import gzip
+
+        _seed_health_check(db_session, n_accounts=1)
+        response = client.get("/api/internal/exports/health-checks",
+                              params={"gzip": True}, headers=self.HEADERS)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["content-disposition"].endswith('.csv.gz"')
+        lines = gzip.decompress(response.content).decode().splitlines()
+        assert len(lines) == 2
+
+    def test_export_is_audited(self, db_session, export_engine):
+        from app.models.audit_log import AuditLog
+
+        client.get("/api/internal/exports/users", params={"format": "ndjson"}, headers=self.HEADERS)
+        event = db_session.query(AuditLog).filter_by(event_type="admin_export").one()
+        assert event.metadata_json == {"dataset": "users", "format": "ndjson", "gzip": False}
+
+    def test_unknown_dataset(self, db_session):
+        response = client.get("/api/internal/exports/otp-codes", headers=self.HEADERS)
+        assert response.status_code == 422
+
+
+class TestHealthCheckFlaggedAccounts:
+    def test_get_returns_flagged_accounts(self, db_session):
+        from uuid import UUID
+        from app.models.debt_account import DebtAccount
+        from app.models.health_score import HealthScore
+
+        check_id = _seed_health_check(db_session, n_accounts=1)
+        score = db_session.get(HealthScore, UUID(check_id))
+        db_session.add(DebtAccount(report_id=score.report_id, lender_name="Card Co",
+                                   account_type="credit_card", outstanding=5000.0,
+                                   interest_rate=36.0, emi_amount=500.0, status="overdue"))
+        db_session.commit()
+
+        flagged = client.get(f"/api/health-check/{check_id}").json()["flagged_accounts"]
+        assert [f["lender_name"] for f in flagged] == ["Card Co"]
+        assert "Account is overdue" in flagged[0]["reason"]
+
+
+class TestCibilReportReuse:
+    """POST /api/health-check re-scores an unexpired report instead of pulling."""
+
+    PAYLOAD = TestHealthCheckWritePath.PAYLOAD
+
+    @pytest.fixture(autouse=True)
+    def _reset_rate_limiter(self):
+        from app.utils.rate_limiter import InMemoryRateLimitBackend, rate_limiter
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+        yield
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+
+    @pytest.fixture
+    def pulls(self, monkeypatch):
+        from app.services import health_check_service
+
+        calls = []
+        real = health_check_service._cibil_service.pull_report
+
+        async def _counting(**kwargs):
+            calls.append(kwargs)
+            return await real(**kwargs)
+
+        monkeypatch.setattr(health_check_service._cibil_service, "pull_report", _counting)
+        return calls
+
+    def test_second_check_reuses_report(self, db_session, pulls, event_loop):
+        from app.models.audit_log import AuditLog
+        from app.models.cibil_report import CibilReport
+        from app.models.health_score import HealthScore
+        from app.utils.rate_limiter import rate_limiter
+
+        first = client.post("/api/health-check", json=self.PAYLOAD).json()
+        second = client.post("/api/health-check", json=self.PAYLOAD).json()
+
+        assert len(pulls) == 1
+        assert db_session.query(CibilReport).count() == 1
+        scores = db_session.query(HealthScore).all()
+        assert len(scores) == 2 and scores[0].report_id == scores[1].report_id
+        assert second["id"] != first["id"]
+        assert second["score"] == first["score"]
+        assert [a["id"] for a in second["debt_accounts"]] == [a["id"] for a in first["debt_accounts"]]
+        assert event_loop.run_until_complete(rate_limiter.remaining(self.PAYLOAD["phone"])) == 2
+        reused = db_session.query(AuditLog).filter_by(event_type="cibil_report_reused").one()
+        assert reused.metadata_json["report_id"] == str(scores[0].report_id)
+
+    def test_force_refresh_pulls(self, db_session, pulls):
+        client.post("/api/health-check", json=self.PAYLOAD)
+        client.post("/api/health-check", json={**self.PAYLOAD, "force_refresh": True})
+        assert len(pulls) == 2
+
+    def test_expired_report_pulls(self, db_session, pulls):
+        from datetime import datetime, timedelta
+        from app.models.cibil_report import CibilReport
+
+        client.post("/api/health-check", json=self.PAYLOAD)
+        report = db_session.query(CibilReport).one()
+        report.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+
+        client.post("/api/health-check", json=self.PAYLOAD)
+        assert len(pulls) == 2
+
+    def test_report_without_rows_decrypted(self, db_session, pulls):
+        from app.models.debt_account import DebtAccount
+
+        first = client.post("/api/health-check", json=self.PAYLOAD).json()
+        db_session.query(DebtAccount).delete()
+        db_session.commit()
+
+        second = client.post("/api/health-check", json=self.PAYLOAD).json()
+        assert len(pulls) == 1
+        assert second["score"] == first["score"]
+        assert second["total_outstanding"] == first["total_outstanding"]
+
+
+class TestHealthCheckJobMode:
+    """POST /api/health-check?mode=job returns 202 and a job to follow."""
+
+    PAYLOAD = TestHealthCheckWritePath.PAYLOAD
+
+    @pytest.fixture(autouse=True)
+    def _reset_rate_limiter(self):
+        from app.utils.rate_limiter import InMemoryRateLimitBackend, rate_limiter
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+        yield
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+
+    @pytest.fixture
+    def queue(self, db_session, async_sqlite_engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        from app.services import health_check_service
+        from app.utils.job_queue import InMemoryJobStore, InProcessJobQueue, set_job_queue
+
+        queue = InProcessJobQueue(InMemoryJobStore(ttl=60), workers=1)
+        health_check_service.register_jobs(
+            queue, async_sessionmaker(async_sqlite_engine, autoflush=False, expire_on_commit=False),
+        )
+        set_job_queue(queue)
+        yield queue
+        set_job_queue(None)
+
+    def _run_queued(self, queue, event_loop):
+        """Stand in for a worker: run the job waiting in the in-process queue."""
+        event_loop.run_until_complete(queue.run(*queue.queue.get_nowait()))
+
+    def test_accepted_then_succeeded(self, queue, event_loop):
+        from app.models.health_score import HealthScore
+
+        response = client.post("/api/health-check", params={"mode": "job"}, json=self.PAYLOAD)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.headers["location"] == f"/api/health-check/jobs/{job_id}"
+        assert client.get(f"/api/health-check/jobs/{job_id}").json()["status"] == "queued"
+
+        self._run_queued(queue, event_loop)
+
+        job = client.get(f"/api/health-check/jobs/{job_id}").json()
+        assert job["status"] == "succeeded"
+        assert client.get(f"/api/health-check/{job['result']['id']}").status_code == 200
+
+    def test_validation_still_synchronous(self, queue):
+        response = client.post("/api/health-check", params={"mode": "job"},
+                               json={**self.PAYLOAD, "pan": "bad"})
+        assert response.status_code == 400
+
+    def test_events_stream_ends_with_terminal_status(self, queue, event_loop):
+        job_id = client.post("/api/health-check", params={"mode": "job"}, json=self.PAYLOAD).json()["job_id"]
+        self._run_queued(queue, event_loop)
+
+        response = client.get(f"/api/health-check/jobs/{job_id}/events")
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.startswith("event: succeeded\ndata: ")
+
+    def test_unknown_job(self, queue):
+        assert client.get("/api/health-check/jobs/does-not-exist").status_code == 404
+
+
+class TestBulkPANVerify:
+    HEADERS = {"X-API-Key": "change-me-in-production"}
+
+    def test_streams_ndjson_per_input(self):
+        import json
+
+        response = client.post("/api/pan/verify/bulk", headers=self.HEADERS,
+                               json={"pans": ["ABCDE1234A", "ABCDE1234B", "ABCDE1234A", "nope"]})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        by_index = {line["index"]: line["verification"] for line in lines}
+        assert by_index == {0: "success", 1: "failed", 2: "success", 3: "error"}
+        assert all("ABCDE1234" not in line["pan"] for line in lines)
+
+    def test_requires_api_key(self):
+        response = client.post("/api/pan/verify/bulk", json={"pans": ["ABCDE1234A"]})
+        assert response.status_code == 401
+
+    def test_batch_size_limit(self, monkeypatch):
+        from app.config import get_settings
+
+        monkeypatch.setattr(get_settings(), "PAN_BULK_MAX_ITEMS", 2)
+        response = client.post("/api/pan/verify/bulk", headers=self.HEADERS,
+                               json={"pans": ["ABCDE1234A"] * 3})
+        assert response.status_code == 422
+
+
+class TestAAConsentState:
+    HEADERS = {"X-Webhook-Secret": "webhook-secret"}
+
+    @pytest.fixture(autouse=True)
+    def webhook_secret(self, monkeypatch):
+        from app.config import get_settings
+        monkeypatch.setattr(get_settings(), "SETU_AA_WEBHOOK_SECRET", "webhook-secret")
+
+    def test_webhook_drives_stored_status(self, db_session):
+        consent_id = client.post("/aa/consent", json={"phone": "9876543210"}).json()["id"]
+        assert client.get(f"/aa/consent/{consent_id}").json()["status"] == "PENDING"
+        assert client.get(f"/aa/data/{consent_id}").status_code == 400
+
+        client.post("/aa/webhook", headers=self.HEADERS, json={
+            "type": "CONSENT_STATUS_UPDATE",
+            "consentId": consent_id,
+            "data": {"status": "ACTIVE"},
+        })
+
+        body = client.get(f"/aa/consent/{consent_id}").json()
+        assert body["status"] == "ACTIVE"
+        assert body["approved_at"] is not None
+
+    def test_unknown_consent(self, db_session):
+        assert client.get("/aa/consent/does-not-exist").status_code == 404
+        response = client.post("/aa/webhook", headers=self.HEADERS, json={
+            "type": "CONSENT_STATUS_UPDATE",
+            "consentId": "does-not-exist",
+            "data": {"status": "ACTIVE"},
+        })
+        assert response.status_code == 200  # acknowledged so Setu does not retry
+
+    @pytest.mark.parametrize("headers,status_code", [
+        ({}, 401),
+        ({"X-Webhook-Secret": "guessed"}, 403),
+    ])
+    def test_forged_webhook_rejected(self, db_session, headers, status_code):
+        consent_id = client.post("/aa/consent", json={"phone": "9876543210"}).json()["id"]
+        response = client.post("/aa/webhook", headers=headers, json={
+            "type": "CONSENT_STATUS_UPDATE",
+            "consentId": consent_id,
+            "data": {"status": "ACTIVE"},
+        })
+        assert response.status_code == status_code
+        assert client.get(f"/aa/consent/{consent_id}").json()["status"] == "PENDING"
+
+    def test_real_provider_requires_secret(self, db_session, monkeypatch):
+        from app.config import get_settings
+        monkeypatch.setattr(get_settings(), "SETU_AA_WEBHOOK_SECRET", "")
+        monkeypatch.setattr(get_settings(), "SETU_AA_PROVIDER", "setu")
+        response = client.post("/aa/webhook", json={"type": "FI_DATA_READY", "consentId": "c"})
+        assert response.status_code == 503
+
+
+class TestAAFinancialData:
+    """GET /aa/data/{id} queues the fetch, then serves the cached result."""
+
+    @pytest.fixture
+    def queue(self, db_session, async_sqlite_engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        from app.services import aa_data_service
+        from app.utils.job_queue import InMemoryJobStore, InProcessJobQueue, set_job_queue
+
+        queue = InProcessJobQueue(InMemoryJobStore(ttl=60), workers=1)
+        aa_data_service.register_jobs(
+            queue, async_sessionmaker(async_sqlite_engine, autoflush=False, expire_on_commit=False),
+        )
+        set_job_queue(queue)
+        yield queue
+        set_job_queue(None)
+
+    def test_accepted_then_cached(self, queue, event_loop):
+        consent_id = client.post("/aa/consent", json={"phone": "9876543210"}).json()["id"]
+        client.post(f"/aa/consent/{consent_id}/approve")
+
+        response = client.get(f"/aa/data/{consent_id}")
+        assert response.status_code == 202
+        assert response.json()["status"] == "REQUESTED"
+        # Polling while the fetch is pending does not queue another one
+        assert client.get(f"/aa/data/{consent_id}").status_code == 202
+        assert queue.queue.qsize() == 1
+
+        event_loop.run_until_complete(queue.run(*queue.queue.get_nowait()))
+
+        response = client.get(f"/aa/data/{consent_id}")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "COMPLETED"
+        assert len(body["accounts"]) == 3
+        assert body["health_score"]["total_outstanding"] > 0
+        assert queue.queue.empty()
+
+    def test_aa_score_read_back_from_aa_accounts(self, db_session, queue, event_loop):
+        from app.models.health_score import HealthScore
+
+        _seed_health_check(db_session, n_accounts=2)  # CIBIL report for the same phone
+        consent_id = client.post("/aa/consent", json={"phone": "9876543210"}).json()["id"]
+        client.post(f"/aa/consent/{consent_id}/approve")
+        client.get(f"/aa/data/{consent_id}")
+        event_loop.run_until_complete(queue.run(*queue.queue.get_nowait()))
+        aa_data = client.get(f"/aa/data/{consent_id}").json()
+
+        score = db_session.query(HealthScore).filter(HealthScore.consent_id.isnot(None)).one()
+        body = client.get(f"/api/health-check/{score.id}").json()
+
+        assert body["credit_score"] is None
+        assert sorted(a["lender_name"] for a in body["debt_accounts"]) == sorted(
+            a["lender"] for a in aa_data["accounts"]
+        )
+        assert body["total_outstanding"] == aa_data["health_score"]["total_outstanding"]
@@ -0,0 +1,89 @@
+"""Tests for the content-addressed health score cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import health_score, score_cache
+from app.services.score_cache import (
+    InMemoryScoreCacheStore,
+    RedisScoreCacheStore,
+    account_dicts,
+    result_key,
+    score_cached,
+    set_score_cache_store,
+)
+
+ACCOUNTS = [
+    {"lender_name": "HDFC Bank", "account_type": "credit_card", "outstanding": 50000,
+     "interest_rate": 36, "emi_amount": 5000, "status": "active", "utilization": 0.9},
+    {"lender_name": "SBI", "account_type": "personal_loan", "outstanding": 200000,
+     "interest_rate": 11.5, "emi_amount": 8000, "status": "overdue", "payment_history": 0.6},
+]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    set_score_cache_store(InMemoryScoreCacheStore(maxsize=100, ttl=60))
+    yield
+    set_score_cache_store(None)
+
+
+class TestResultKey:
+    def test_stored_rows_hash_like_cibil_payload(self):
+        rows = [SimpleNamespace(**{f: a.get(f) for f in score_cache.SCORED_FIELDS}) for a in ACCOUNTS]
+        assert result_key(account_dicts(rows)) == result_key(ACCOUNTS)
+
+    def test_ignores_unscored_fields_and_int_float(self):
+        noisy = [dict(a, account_number="XXXX1234") for a in ACCOUNTS]
+        noisy[0]["outstanding"] = 50000.0
+        assert result_key(noisy) == result_key(ACCOUNTS)
+
+    def test_sensitive_to_content_order_and_income(self):
+        key = result_key(ACCOUNTS)
+        assert result_key(list(reversed(ACCOUNTS))) != key
+        assert result_key([dict(ACCOUNTS[0], outstanding=1)] + ACCOUNTS[1:]) != key
+        assert result_key(ACCOUNTS, monthly_income=50000) != key
+
+    def test_includes_model_version(self, monkeypatch):
+        key = result_key(ACCOUNTS)
+        monkeypatch.setattr(score_cache, "SCORING_MODEL_VERSION", "2")
+        assert result_key(ACCOUNTS) != key
+
+
+class TestScoreCached:
+    @pytest.mark.asyncio
+    async def test_computes_once(self, monkeypatch):
+        calls = []
+        real = health_score.calculate_health_score
+
+        def counting(accounts, monthly_income=None):
+            calls.append(1)
+            return real(accounts, monthly_income)
+
+        monkeypatch.setattr(score_cache, "calculate_health_score", counting)
+        first = await score_cached(ACCOUNTS)
+        second = await score_cached([dict(a) for a in ACCOUNTS])
+
+        assert len(calls) == 1
+        assert second == first
+        assert len(first.flagged_accounts) == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_store_round_trip(self):
+        store = RedisScoreCacheStore(FakeRedis(), ttl=60)
+        result = health_score.calculate_health_score(ACCOUNTS)
+        await store.set("k", result)
+        assert await store.get("k") == result
+        assert await store.get("missing") is None
@@ -1,7 +1,22 @@
 """Unit tests for security utilities."""
 
+import base64
+import os
+
 import pytest
-from app.utils.security import hash_pan, mask_pan, encrypt_data, decrypt_data
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from app.config import get_settings
+from app.utils import crypto
+from app.utils.security import (
+    hash_pan,
+    mask_pan,
+    encrypt_data,
+    decrypt_data,
+    encrypt_data_async,
+    decrypt_data_async,
+)
 
 
 class TestPANHashing:
@@ -76,3 +91,100 @@ class TestAESEncryption:
         encrypted = encrypt_data(original)
         decrypted = decrypt_data(encrypted)
         assert decrypted == original
+
+
+class TestVersionedEncryption:
+    def test_token_carries_key_version(self):
+        assert encrypt_data("data").startswith("g1.1.")
+
+    def test_tampered_ciphertext_rejected(self):
+        token = encrypt_data("score 750")
+        raw = bytearray(base64.b64decode(token.split(".", 2)[2]))
+        raw[-1] ^= 1
+        with pytest.raises(crypto.DecryptionError):
+            decrypt_data("g1.1." + base64.b64encode(bytes(raw)).decode())
+
+    def test_legacy_cbc_still_decrypts(self):
+        key = crypto.keyring().key(1)
+        iv = os.urandom(16)
+        padder = padding.PKCS7(128).padder()
+        padded = padder.update("legacy report".encode()) + padder.finalize()
+        encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+        legacy = base64.b64encode(iv + encryptor.update(padded) + encryptor.finalize()).decode()
+        assert decrypt_data(legacy) == "legacy report"
+
+    def test_rotation_keeps_old_tokens_readable(self, monkeypatch):
+        old_token = encrypt_data("before rotation")
+
+        # Key 2 becomes current; the original key is retired as version 1
+        settings = get_settings()
+        monkeypatch.setattr(settings, "AES_RETIRED_KEYS", f"1:{settings.AES_ENCRYPTION_KEY}")
+        monkeypatch.setattr(settings, "AES_ENCRYPTION_KEY", "ab" * 32)
+        monkeypatch.setattr(settings, "AES_KEY_VERSION", 2)
+        crypto.reset_keyring()
+        try:
+            new_token = encrypt_data("after rotation")
+            assert new_token.startswith("g1.2.")
+            assert decrypt_data(old_token) == "before rotation"
+            assert decrypt_data(new_token) == "after rotation"
+        finally:
+            monkeypatch.undo()
+            crypto.reset_keyring()
+
+    def test_unknown_key_version_rejected(self):
+        token = encrypt_data("data").replace("g1.1.", "g1.9.", 1)
+        with pytest.raises(crypto.DecryptionError):
+            decrypt_data(token)
+
+
+class TestChunkedEncryption:
+    def test_roundtrip(self):
+        data = b"x" * 10 + b"y" * 10 + b"z" * 5
+        token = "".join(crypto.encrypt_chunks(crypto.iter_chunks(data, 10)))
+        assert token.startswith("s1.1.")
+        assert token.count(".") == 2 + 3  # header + three segments
+        assert b"".join(crypto.decrypt_chunks(token)) == data
+        assert decrypt_data(token) == data.decode()
+
+    def test_empty_input(self):
+        token = "".join(crypto.encrypt_chunks([]))
+        assert decrypt_data(token) == ""
+
+    def test_truncated_stream_rejected(self):
+        token = "".join(crypto.encrypt_chunks([b"a", b"b", b"c"]))
+        with pytest.raises(crypto.DecryptionError):
+            decrypt_data(token.rsplit(".", 1)[0])
+
+    def test_reordered_segments_rejected(self):
+        header_fields = "".join(crypto.encrypt_chunks([b"a", b"b", b"c"])).split(".")
+        header, segments = header_fields[:3], header_fields[3:]
+        swapped = ".".join(header + [segments[1], segments[0], segments[2]])
+        with pytest.raises(crypto.DecryptionError):
+            decrypt_data(swapped)
+
+
+class TestAsyncEncryption:
+    @pytest.fixture
+    def small_limits(self, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "CRYPTO_OFFLOAD_THRESHOLD_BYTES", 100)
+        monkeypatch.setattr(settings, "CRYPTO_CHUNK_BYTES", 1000)
+
+    def test_small_payload_inline(self, event_loop, small_limits):
+        token = event_loop.run_until_complete(encrypt_data_async("short"))
+        assert token.startswith("g1.")
+        assert event_loop.run_until_complete(decrypt_data_async(token)) == "short"
+
+    def test_medium_payload_on_pool(self, event_loop, small_limits):
+        original = "m" * 500
+        token = event_loop.run_until_complete(encrypt_data_async(original))
+        assert token.startswith("g1.")
+        assert event_loop.run_until_complete(decrypt_data_async(token)) == original
+
+    def test_large_payload_chunked(self, event_loop, small_limits):
+        original = "₹" * 1500  # 4500 bytes → 5 segments
+        token = event_loop.run_until_complete(encrypt_data_async(original))
+        assert token.startswith("s1.")
+        assert token.count(".") == 2 + 5
+        assert event_loop.run_until_complete(decrypt_data_async(token)) == original
+        assert decrypt_data(token) == original
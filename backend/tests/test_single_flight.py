@@ -0,0 +1,186 @@
+"""Tests for request coalescing of concurrent identical calls."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.schemas.health_check import HealthCheckRequest
+from app.services import health_check_service
+from app.utils.single_flight import RedisFlightBackend, SingleFlight
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, token):
+        # The only script in use: app.utils.redis_client.release_lock
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+def _slow_call(calls, result="report", delay=0.05, error=None):
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+    return call
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        flight, calls = SingleFlight(), []
+        results = await asyncio.gather(*(flight.do("k", _slow_call(calls)) for _ in range(3)))
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True]
+        assert {value for value, _ in results} == {"report"}
+
+    @pytest.mark.asyncio
+    async def test_failure_shared_then_forgotten(self):
+        flight, calls = SingleFlight(), []
+        results = await asyncio.gather(
+            *(flight.do("k", _slow_call(calls, error=RuntimeError("down"))) for _ in range(2)),
+            return_exceptions=True,
+        )
+        assert len(calls) == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        assert await flight.do("k", _slow_call(calls)) == ("report", False)
+
+    @pytest.mark.asyncio
+    async def test_different_keys_not_coalesced(self):
+        flight, calls = SingleFlight(), []
+        await asyncio.gather(flight.do("a", _slow_call(calls)), flight.do("b", _slow_call(calls)))
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_over_to_a_waiter(self):
+        flight, calls = SingleFlight(), []
+        leader = asyncio.create_task(flight.do("k", _slow_call(calls)))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(flight.do("k", _slow_call(calls))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+
+        assert leader.cancelled()
+        assert len(calls) == 2  # the cancelled call and one takeover
+        assert sorted(shared for _, shared in results) == [False, True]
+        assert {value for value, _ in results} == {"report"}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_leader_running(self):
+        flight, calls = SingleFlight(), []
+        leader = asyncio.create_task(flight.do("k", _slow_call(calls)))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do("k", _slow_call(calls)))
+        await asyncio.sleep(0.01)
+
+        follower.cancel()
+        assert await leader == ("report", False)
+        assert follower.cancelled()
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_distributed_across_workers(self):
+        redis, calls = FakeRedis(), []
+        workers = [
+            SingleFlight(RedisFlightBackend(redis), poll_interval=0.01,
+                         encode=lambda v: v.upper(), decode=lambda v: v.lower())
+            for _ in range(2)
+        ]
+        leader = asyncio.create_task(workers[0].do("k", _slow_call(calls)))
+        await asyncio.sleep(0.01)
+        follower = await workers[1].do("k", _slow_call(calls))
+
+        assert await leader == ("report", False)
+        assert follower == ("report", True)
+        assert len(calls) == 1
+        assert "exitdebt:flight:k:lock" not in redis.data
+
+    @pytest.mark.asyncio
+    async def test_follower_runs_itself_when_leader_fails(self):
+        redis, calls = FakeRedis(), []
+        workers = [SingleFlight(RedisFlightBackend(redis), poll_interval=0.01) for _ in range(2)]
+        leader = asyncio.create_task(workers[0].do("k", _slow_call(calls, error=RuntimeError("down"))))
+        await asyncio.sleep(0.01)
+        follower = await workers[1].do("k", _slow_call(calls))
+
+        with pytest.raises(RuntimeError):
+            await leader
+        assert follower == ("report", False)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_leader_keeps_successors_lock(self):
+        redis, calls = FakeRedis(), []
+        flight = SingleFlight(RedisFlightBackend(redis), wait_timeout=1.0)
+
+        async def outlives_lock():
+            calls.append(1)
+            redis.data.pop("exitdebt:flight:k:lock")  # TTL expired mid-call...
+            redis.data["exitdebt:flight:k:lock"] = "other-leader"  # ...and another worker took over
+            return "report"
+
+        assert await flight.do("k", outlives_lock) == ("report", False)
+        assert redis.data["exitdebt:flight:k:lock"] == "other-leader"
+
+
+class TestCoalescedHealthChecks:
+    PAYLOAD = {"pan": "ABCDE1234F", "phone": "9876543210", "name": "Test User", "consent": True}
+
+    @pytest.fixture(autouse=True)
+    def _fresh_state(self):
+        from app.utils.rate_limiter import InMemoryRateLimitBackend, rate_limiter
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+        health_check_service.set_report_pulls(SingleFlight())
+        yield
+        rate_limiter.set_backend(InMemoryRateLimitBackend())
+        health_check_service.set_report_pulls(None)
+
+    @pytest.mark.asyncio
+    async def test_double_submit_pulls_once_and_refunds(self, async_sqlite_engine, monkeypatch):
+        from app.utils.rate_limiter import rate_limiter
+
+        calls = []
+        real = health_check_service._cibil_service.pull_report
+
+        async def slow_pull(**kwargs):
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return await real(**kwargs)
+
+        monkeypatch.setattr(health_check_service._cibil_service, "pull_report", slow_pull)
+        factory = async_sessionmaker(async_sqlite_engine, autoflush=False, expire_on_commit=False)
+
+        async def submit():
+            async with factory() as db:
+                return await health_check_service.run_health_check(
+                    db, HealthCheckRequest(**self.PAYLOAD), "127.0.0.1",
+                )
+
+        first, second = await asyncio.gather(submit(), submit())
+
+        assert len(calls) == 1
+        assert first.score == second.score
+        assert await rate_limiter.remaining(self.PAYLOAD["phone"]) == 2
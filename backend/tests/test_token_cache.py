@@ -0,0 +1,166 @@
+"""Tests for the single-flight access token cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils.token_cache import (
+    CachedToken,
+    InMemoryTokenStore,
+    RedisTokenStore,
+    TokenCache,
+)
+
+
+class FakeRedis:
+    """Minimal async stand-in for redis.asyncio.Redis (get/set/delete, compare-and-delete eval)."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, token):
+        # The only script in use: app.utils.redis_client.release_lock
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class CountingFetcher:
+    def __init__(self, ttl=300.0, delay=0.01):
+        self.calls = 0
+        self.ttl = ttl
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"token-{self.calls}", self.ttl
+
+
+class TestTokenCache:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_refresh(self):
+        fetch = CountingFetcher()
+        cache = TokenCache("t", fetch=fetch, store=InMemoryTokenStore())
+
+        tokens = await asyncio.gather(*(cache.get() for _ in range(50)))
+
+        assert fetch.calls == 1
+        assert set(tokens) == {"token-1"}
+
+    @pytest.mark.asyncio
+    async def test_cached_token_reused_until_refresh_margin(self):
+        fetch = CountingFetcher()
+        store = InMemoryTokenStore()
+        cache = TokenCache("t", fetch=fetch, store=store, refresh_margin=20, proactive_margin=60)
+
+        assert await cache.get() == "token-1"
+        assert await cache.get() == "token-1"
+        assert fetch.calls == 1
+
+        # Inside the hard margin: callers block on a fresh token
+        await store.set("t", CachedToken("stale", time.time() + 10))
+        assert await cache.get() == "token-2"
+
+    @pytest.mark.asyncio
+    async def test_proactive_refresh_serves_current_token(self):
+        fetch = CountingFetcher()
+        store = InMemoryTokenStore()
+        cache = TokenCache("t", fetch=fetch, store=store, refresh_margin=20, proactive_margin=60)
+        await store.set("t", CachedToken("current", time.time() + 45))
+
+        results = await asyncio.gather(*(cache.get() for _ in range(10)))
+        assert set(results) == {"current"}  # nobody waited on the refresh
+
+        await cache._background
+        assert fetch.calls == 1
+        assert await cache.get() == "token-1"
+
+    @pytest.mark.asyncio
+    async def test_background_failure_keeps_current_token(self):
+        async def failing():
+            raise RuntimeError("auth down")
+
+        store = InMemoryTokenStore()
+        cache = TokenCache("t", fetch=failing, store=store, refresh_margin=20, proactive_margin=60)
+        await store.set("t", CachedToken("current", time.time() + 45))
+
+        assert await cache.get() == "current"
+        await cache._background
+        assert await cache.get() == "current"
+        await cache.aclose()
+
+    @pytest.mark.asyncio
+    async def test_foreground_failure_propagates(self):
+        async def failing():
+            raise RuntimeError("auth down")
+
+        cache = TokenCache("t", fetch=failing, store=InMemoryTokenStore())
+        with pytest.raises(RuntimeError):
+            await cache.get()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_refresh(self):
+        fetch = CountingFetcher()
+        cache = TokenCache("t", fetch=fetch, store=InMemoryTokenStore())
+        await cache.get()
+        await cache.invalidate()
+        assert await cache.get() == "token-2"
+
+
+class TestRedisTokenStore:
+    @pytest.mark.asyncio
+    async def test_token_shared_between_workers(self):
+        redis = FakeRedis()
+        fetch_a, fetch_b = CountingFetcher(), CountingFetcher()
+        worker_a = TokenCache("setu", fetch=fetch_a, store=RedisTokenStore(redis))
+        worker_b = TokenCache("setu", fetch=fetch_b, store=RedisTokenStore(redis))
+
+        assert await worker_a.get() == "token-1"
+        assert await worker_b.get() == "token-1"
+        assert (fetch_a.calls, fetch_b.calls) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_worker_waits_for_refresh_in_progress_elsewhere(self):
+        redis = FakeRedis()
+        slow = CountingFetcher(delay=0.2)
+        fast = CountingFetcher()
+        worker_a = TokenCache("setu", fetch=slow, store=RedisTokenStore(redis))
+        worker_b = TokenCache("setu", fetch=fast, store=RedisTokenStore(redis))
+
+        task_a = asyncio.create_task(worker_a.get())
+        await asyncio.sleep(0.05)  # worker A holds the refresh lock
+        token_b = await worker_b.get()
+
+        assert await task_a == token_b == "token-1"
+        assert fast.calls == 0
+        assert "exitdebt:token:setu:lock" not in redis.data
+
+    @pytest.mark.asyncio
+    async def test_expired_lock_holder_does_not_release_successor(self):
+        redis = FakeRedis()
+        store = RedisTokenStore(redis)
+        first = await store.acquire_refresh_lock("setu", ttl=5)
+        assert await store.acquire_refresh_lock("setu", ttl=5) is None
+
+        del redis.data["exitdebt:token:setu:lock"]  # the first login outlived the TTL
+        second = await store.acquire_refresh_lock("setu", ttl=5)
+        await store.release_refresh_lock("setu", first)
+        assert redis.data["exitdebt:token:setu:lock"] == second
+
+        await store.release_refresh_lock("setu", second)
+        assert "exitdebt:token:setu:lock" not in redis.data